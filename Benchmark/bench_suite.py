@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+from generate_retail import generate_retail, parse_scale
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import find_table, read_table, table_path
+
+# Benchmark pipeline per skala data (1M / 10M / 100M baris transaksi):
+# 1. data sintetis dibuat sekali per skala (generate_retail.py, deterministik)
+# 2. tiap tahap dijalankan sebagai proses terpisah lewat market_pulse.py, jadi
+#    waktu & memori satu tahap tidak tercampur tahap lain
+# 3. dicatat: wall time, waktu CPU, peak RSS (dilaporkan tahap sendiri, termasuk
+#    proses worker) dan throughput (baris transaksi mentah / pelanggan per detik)
+# 4. hasil dibandingkan dengan baseline.json; tahap yang lebih lambat dari
+#    baseline x (1 + toleransi) ditandai REGRESI (exit code 1)
+# 5. tahap yang gagal dicatat (exit code + ekor log) dan suite jalan terus;
+#    hasil tahap yang berhasil tetap dibandingkan/disimpan (exit code 1)
+# Mulai BATAS_STREAMING baris, clean & rfm dijalankan dalam mode streaming /
+# out-of-core (seperti di produksi untuk data sebesar itu), bukan in-memory.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CLI = os.path.join(ROOT, 'market_pulse.py')
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+WORKDIR_DEFAULT = '.bench'
+
+# Tahap -> (argumen market_pulse, satuan throughput, tabel output). Grafik
+# dilewati supaya yang diukur adalah komputasinya. Script tahap mencetak
+# ERROR lalu keluar normal jika input tidak ada, jadi tahap dianggap gagal
+# juga jika tabel output-nya tidak (baru) ditulis.
+TAHAP = {
+    'clean': (['clean'], 'baris', 'online_retail_clean_2'),
+    'rfm': (['rfm'], 'baris', 'rfm_data'),
+    'features': (['features', '--no-charts'], 'pelanggan', 'rfm_siap_model'),
+    'model': (['model', '--no-charts'], 'pelanggan', 'hasil_segmentasi_final'),
+    'score': (['score', 'rfm_data'], 'pelanggan', 'hasil_scoring'),
+}
+# Argumen tambahan untuk skala >= BATAS_STREAMING
+TAHAP_STREAMING = {
+    'clean': ['--streaming'],
+    'rfm': ['--out-of-core'],
+}
+BATAS_STREAMING = 10_000_000
+TOLERANSI_DEFAULT = 0.20
+EKOR_LOG = 5
+
+
+def uses_streaming(stage, rows, fmt=None, streaming_from=BATAS_STREAMING):
+    # Feather tidak bisa ditulis per chunk: tahap tetap in-memory
+    return stage in TAHAP_STREAMING and rows >= streaming_from and fmt != 'feather'
+
+
+def stage_command(stage, workdir, rows, fmt=None, streaming_from=BATAS_STREAMING):
+    command = list(TAHAP[stage][0])
+    if stage == 'score':
+        # Nama output mengikuti format tabel benchmark (bukan selalu .csv)
+        command.append(os.path.join(workdir, table_path('hasil_scoring', fmt)))
+    if uses_streaming(stage, rows, fmt, streaming_from):
+        command += TAHAP_STREAMING[stage]
+    return command
+
+
+def output_written(stage, workdir, since):
+    try:
+        path = find_table(os.path.join(workdir, TAHAP[stage][2]))
+    except FileNotFoundError:
+        return False
+    return os.path.getmtime(path) >= since
+
+
+def _log_tail(path, lines=EKOR_LOG):
+    try:
+        with open(path, errors='replace') as f:
+            return [line.rstrip() for line in f.readlines()[-lines:]]
+    except FileNotFoundError:
+        return []
+
+
+def prepare_data(workdir, rows, seed):
+    # Data per skala disimpan di workdir/<rows>; dibuat ulang hanya jika
+    # parameter generator berbeda
+    os.makedirs(workdir, exist_ok=True)
+    marker = os.path.join(workdir, 'data.json')
+    params = {'rows': rows, 'seed': seed}
+    data_file = os.path.join(workdir, 'online_retail_II.csv')
+    if os.path.exists(data_file) and os.path.exists(marker):
+        with open(marker) as f:
+            if json.load(f) == params:
+                print(f"   - data {rows:,} baris sudah ada, dipakai ulang")
+                return
+    generate_retail(data_file, rows, seed)
+    with open(marker, 'w') as f:
+        json.dump(params, f)
+
+
+def count_customers(workdir):
+    # Jumlah pelanggan = jumlah baris rfm_data (format apapun)
+    try:
+        return len(read_table(os.path.join(workdir, 'rfm_data'), columns=['Customer ID']))
+    except FileNotFoundError:
+        return None
+
+
+def run_stage(stage, workdir, fmt=None, rows=0, streaming_from=BATAS_STREAMING):
+    # Tahap gagal -> {'error': ..., 'exit_code': ..., 'log_tail': [...]}, bukan exception
+    metrics_file = os.path.join(workdir, f'metrics_{stage}.json')
+    log_file = os.path.join(workdir, f'log_{stage}.txt')
+    if os.path.exists(metrics_file):
+        os.remove(metrics_file)
+    command = [sys.executable, CLI, '--workdir', workdir, '--no-timing', '--metrics', metrics_file]
+    if fmt:
+        command += ['--format', fmt]
+    command += stage_command(stage, workdir, rows, fmt, streaming_from)
+    started_at = time.time()
+    with open(log_file, 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        # wait4: waktu CPU proses tahap + worker-nya. Puncak RSS TIDAK diambil
+        # dari sini karena ru_maxrss ikut mewarisi RSS proses benchmark saat
+        # fork; tahap melaporkan VmHWM-nya sendiri lewat --metrics
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    mode = 'streaming' if uses_streaming(stage, rows, fmt, streaming_from) else 'in-memory'
+    if process.returncode != 0 or not os.path.exists(metrics_file):
+        error = f"exit {process.returncode}, lihat {log_file}"
+    elif not output_written(stage, workdir, started_at):
+        error = f"'{TAHAP[stage][2]}' tidak ditulis, lihat {log_file}"
+    else:
+        error = None
+    if error:
+        return {'error': error, 'exit_code': process.returncode, 'wall_s': round(wall, 3),
+                'mode': mode, 'log_tail': _log_tail(log_file)}
+    with open(metrics_file) as f:
+        metrics = json.load(f)
+    return {'wall_s': round(wall, 3), 'cpu_s': round(usage.ru_utime + usage.ru_stime, 3),
+            'import_s': round(metrics['import_s'], 3),
+            'peak_rss_mb': round(metrics['peak_rss_mb'], 1), 'mode': mode}
+
+
+def run_suite(scales=('1M',), stages=None, workdir=WORKDIR_DEFAULT, seed=42, fmt=None,
+              streaming_from=BATAS_STREAMING):
+    stages = list(stages or TAHAP)
+    results = {}
+    for scale in scales:
+        rows = parse_scale(scale)
+        scale_dir = os.path.abspath(os.path.join(workdir, str(rows)))
+        print(f"\n=== Skala {scale} ({rows:,} baris) ===")
+        prepare_data(scale_dir, rows, seed)
+
+        results[scale] = {}
+        for stage in stages:
+            result = run_stage(stage, scale_dir, fmt, rows, streaming_from)
+            results[scale][stage] = result
+            if 'error' in result:
+                # Tahap berikutnya tetap dicoba (bisa jadi ikut gagal karena
+                # input tidak ada, itu juga tercatat)
+                print(f"   > {stage:<9} GAGAL ({result['error']})")
+                for line in result['log_tail']:
+                    print(f"     | {line}")
+                continue
+            unit = TAHAP[stage][1]
+            n_items = rows if unit == 'baris' else count_customers(scale_dir)
+            if n_items:
+                result['throughput'] = round(n_items / max(result['wall_s'], 1e-9), 1)
+                result['satuan'] = f'{unit}/s'
+            print(f"   > {stage:<9} {result['wall_s']:9.3f} s  {result['peak_rss_mb']:9.1f} MB  "
+                  f"{result.get('throughput', 0):>14,.0f} {result.get('satuan', '')}  [{result['mode']}]")
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANSI_DEFAULT):
+    # Bandingkan wall time & peak RSS dengan baseline. Kembalikan daftar regresi.
+    regressions = []
+    print(f"\n{'Skala':>6} {'Tahap':>9} {'Wall (s)':>9} {'Baseline':>9} {'Rasio':>6} "
+          f"{'RSS (MB)':>9} {'Baseline':>9} {'Rasio':>6}")
+    print("-" * 72)
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            if 'error' in result:
+                print(f"{scale:>6} {stage:>9} {'GAGAL':>9}")
+                continue
+            base = baseline.get('results', {}).get(scale, {}).get(stage)
+            # Mode berbeda (in-memory vs streaming) tidak sebanding
+            if base is not None and base.get('mode', result['mode']) != result['mode']:
+                base = None
+            if base is None:
+                print(f"{scale:>6} {stage:>9} {result['wall_s']:>9.3f} {'-':>9} {'-':>6} "
+                      f"{result['peak_rss_mb']:>9.1f} {'-':>9} {'-':>6}")
+                continue
+            wall_ratio = result['wall_s'] / max(base['wall_s'], 1e-9)
+            rss_ratio = result['peak_rss_mb'] / max(base['peak_rss_mb'], 1e-9)
+            flag = ''
+            if wall_ratio > 1 + tolerance or rss_ratio > 1 + tolerance:
+                flag = '  REGRESI'
+                regressions.append((scale, stage))
+            print(f"{scale:>6} {stage:>9} {result['wall_s']:>9.3f} {base['wall_s']:>9.3f} {wall_ratio:>6.2f} "
+                  f"{result['peak_rss_mb']:>9.1f} {base['peak_rss_mb']:>9.1f} {rss_ratio:>6.2f}{flag}")
+    return regressions
+
+
+def machine_info():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    # Skala/tahap yang tidak dijalankan kali ini tetap disimpan dari baseline lama
+    baseline = load_baseline(path) or {'results': {}}
+    # Tahap yang gagal tidak menimpa baseline lama
+    for scale, stages in results.items():
+        baseline['results'].setdefault(scale, {}).update(
+            {stage: result for stage, result in stages.items() if 'error' not in result})
+    baseline['machine'] = machine_info()
+    baseline['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+    print(f"\nBaseline disimpan ke '{path}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tahap pipeline per skala data sintetis")
+    parser.add_argument('--scale', nargs='+', default=['1M'], help="Skala data: 1M 10M 100M (atau angka, mis. 250k)")
+    parser.add_argument('--stages', nargs='+', choices=list(TAHAP), default=None,
+                        help="Tahap yang diukur (default: semua)")
+    parser.add_argument('--workdir', default=WORKDIR_DEFAULT, help="Folder data & hasil antara benchmark")
+    parser.add_argument('--seed', type=int, default=42, help="Seed generator data")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default=None,
+                        help="Format tabel antar tahap")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="File baseline (JSON)")
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil sebagai baseline baru")
+    parser.add_argument('--tolerance', type=float, default=TOLERANSI_DEFAULT,
+                        help="Batas regresi relatif terhadap baseline (0.2 = 20%% lebih lambat/boros)")
+    parser.add_argument('--output', default=None, help="Simpan hasil mentah ke file JSON")
+    parser.add_argument('--streaming-from', type=parse_scale, default=BATAS_STREAMING,
+                        help="Skala mulai clean --streaming & rfm --out-of-core (default: 10M)")
+    args = parser.parse_args()
+
+    results = run_suite(args.scale, args.stages, args.workdir, args.seed, args.format,
+                        args.streaming_from)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results, 'machine': machine_info()}, f, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.tolerance) if baseline else []
+    if baseline is None:
+        print(f"\nBaseline '{args.baseline}' belum ada. Jalankan dengan --save-baseline untuk membuatnya.")
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+    failures = [(scale, stage) for scale, stages in results.items()
+                for stage, result in stages.items() if 'error' in result]
+    if regressions:
+        print(f"\n{len(regressions)} tahap lebih lambat/boros dari baseline (> {args.tolerance:.0%}).")
+    if failures:
+        print(f"\n{len(failures)} tahap gagal: {', '.join(f'{scale}/{stage}' for scale, stage in failures)}")
+    if regressions or failures:
+        sys.exit(1)
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from clustering import BACKENDS, fit_clusters
+
+# Benchmark: KMeans penuh vs MiniBatchKMeans vs coreset streaming.
+# Inertia semua backend dihitung terhadap SELURUH data, lalu dibandingkan
+# dengan KMeans penuh (rasio 1.000 = sama bagusnya).
+JUMLAH_PELANGGAN = [50_000, 200_000, 1_000_000]
+JUMLAH_CLUSTER = 3
+
+
+def make_scaled_rfm(n_customers, seed=42):
+    # Data mirip rfm_siap_model: 3 fitur ter-standardisasi, beberapa kelompok
+    rng = np.random.default_rng(seed)
+    centers = np.array([[-1.0, 1.2, 1.1], [0.2, -0.3, -0.2], [1.4, -1.0, -1.1], [-0.5, 0.4, 2.0]])
+    group = rng.choice(len(centers), size=n_customers, p=[0.25, 0.4, 0.3, 0.05])
+    return centers[group] + rng.normal(scale=0.6, size=(n_customers, 3))
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark():
+    print(f"{'Pelanggan':>10} {'Backend':>10} {'Waktu (s)':>10} {'Inertia':>14} {'Rasio':>7} {'Speedup':>8}")
+    print("-" * 64)
+    for n_customers in JUMLAH_PELANGGAN:
+        X = make_scaled_rfm(n_customers)
+        baseline = None
+        for backend in BACKENDS:
+            model, elapsed = _timed(fit_clusters, X, JUMLAH_CLUSTER, backend=backend)
+            if baseline is None:
+                baseline = (model.inertia_, elapsed)
+            print(f"{n_customers:>10} {backend:>10} {elapsed:>10.3f} {model.inertia_:>14.1f} "
+                  f"{model.inertia_ / baseline[0]:>7.3f} {baseline[1] / elapsed:>7.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Exploration'))
+from rfm_engine import compute_rfm
+
+# Benchmark: RFM lama (lambda per pelanggan) vs rfm_engine (reduksi vektor)
+JUMLAH_PELANGGAN = [1_000, 10_000, 50_000, 100_000]
+BARIS_PER_PELANGGAN = 20
+
+
+def make_transactions(n_customers, rows_per_customer=BARIS_PER_PELANGGAN, seed=42):
+    rng = np.random.default_rng(seed)
+    n = n_customers * rows_per_customer
+    start = np.datetime64('2009-12-01')
+    return pd.DataFrame({
+        'Customer ID': rng.integers(0, n_customers, n).astype('int32'),
+        'Invoice': rng.integers(0, n // 4, n).astype('int32'),
+        'InvoiceDate': start + rng.integers(0, 740 * 24 * 60, n).astype('timedelta64[m]'),
+        'TotalAmount': rng.gamma(2.0, 15.0, n),
+    })
+
+
+def rfm_lambda(df, target_date):
+    # Versi lama di create_file_rfm.py / data_exploration.py
+    rfm = df.groupby('Customer ID').agg({
+        'InvoiceDate': lambda x: (target_date - x.max()).days,
+        'Invoice': 'nunique',
+        'TotalAmount': 'sum'
+    })
+    return rfm.rename(columns={'InvoiceDate': 'Recency', 'Invoice': 'Frequency',
+                               'TotalAmount': 'Monetary'})
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark():
+    print(f"{'Pelanggan':>10} {'Baris':>10} {'Lambda (s)':>11} {'Engine (s)':>11} {'Speedup':>8}  Sama?")
+    print("-" * 62)
+    for n_customers in JUMLAH_PELANGGAN:
+        df = make_transactions(n_customers)
+        target_date = df['InvoiceDate'].max() + dt.timedelta(days=1)
+
+        old, t_old = _timed(rfm_lambda, df, target_date)
+        new, t_new = _timed(compute_rfm, df, target_date)
+        same = old.equals(new[old.columns])
+
+        print(f"{n_customers:>10} {len(df):>10} {t_old:>11.3f} {t_new:>11.3f} {t_old / t_new:>7.1f}x  {same}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,64 @@
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+# Uji: cleaning mode streaming harus tetap di bawah --memory-budget-mb.
+# Data sintetis dibuat dengan generate_retail.py, lalu cleaning_data_2.py
+# --streaming dijalankan sebagai proses terpisah per budget; puncak RSS
+# diambil dari os.wait4 (ru_maxrss proses anak). Exit code 1 jika ada budget
+# yang terlampaui.
+# Catatan: ru_maxrss anak ikut mewarisi RSS induk saat fork, jadi script ini
+# sengaja tidak meng-import pandas/numpy (induk tetap kecil).
+HERE = os.path.dirname(os.path.abspath(__file__))
+GENERATOR = os.path.join(HERE, 'generate_retail.py')
+CLEANER = os.path.join(HERE, '..', 'Data Cleaning', 'cleaning_data_2.py')
+BUDGET_DEFAULT = [150, 300]
+
+
+def peak_rss_mb(command, cwd):
+    with open(os.path.join(cwd, 'log.txt'), 'w') as log:
+        process = subprocess.Popen(command, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    exit_code = os.waitstatus_to_exitcode(status)
+    if exit_code != 0:
+        raise RuntimeError(f"{os.path.basename(command[1])} gagal (exit {exit_code}), lihat {cwd}/log.txt")
+    return usage.ru_maxrss / 1024
+
+
+def check_memory_budget(budgets=BUDGET_DEFAULT, scale='2M', seed=42, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix='market_pulse_budget_')
+    data_file = os.path.join(workdir, 'online_retail_II.csv')
+    print(f"1. Data sintetis {scale} baris di '{workdir}'...")
+    if not os.path.exists(data_file):
+        subprocess.run([sys.executable, GENERATOR, '--scale', scale, '--output', data_file,
+                        '--seed', str(seed)], check=True, stdout=subprocess.DEVNULL)
+    else:
+        print("   - file sudah ada, dipakai ulang")
+    print(f"   - {os.path.getsize(data_file) / 1024 ** 2:.0f} MB")
+
+    print("2. Cleaning streaming per budget:")
+    failures = []
+    for budget in budgets:
+        peak = peak_rss_mb([sys.executable, CLEANER, '--streaming', '--memory-budget-mb', str(budget)],
+                           workdir)
+        status = 'OK' if peak <= budget else 'MELEBIHI BUDGET'
+        print(f"   - budget {budget:>5} MB -> puncak RSS {peak:7.1f} MB  {status}")
+        if peak > budget:
+            failures.append(budget)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji puncak RSS cleaning streaming terhadap memory budget")
+    parser.add_argument('--budgets', type=int, nargs='+', default=BUDGET_DEFAULT, help="Budget (MB) yang diuji")
+    parser.add_argument('--scale', default='2M', help="Jumlah baris data sintetis (mis. 2M, 500k)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed generator data")
+    parser.add_argument('--workdir', default=None, help="Folder data (default: folder sementara baru)")
+    args = parser.parse_args()
+    failures = check_memory_budget(args.budgets, args.scale, args.seed, args.workdir)
+    if failures:
+        print(f"\nGAGAL: puncak RSS melebihi budget {failures} MB")
+        sys.exit(1)
+    print("\nSUKSES: semua budget terpenuhi")
@@ -0,0 +1,199 @@
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Generator transaksi sintetis berbentuk online_retail_II.csv untuk uji skala
+# (1M / 10M / 100M baris). Deterministik: seed + jumlah baris yang sama selalu
+# menghasilkan file yang sama persis (byte demi byte).
+# Struktur yang ditiru dari data asli:
+# - invoice berisi beberapa baris produk (rata-rata ~BARIS_PER_INVOICE),
+#   nomor invoice naik dan tanggal naik seiring nomor invoice
+# - aktivitas pelanggan & popularitas produk heavy-tailed (Pareto/Zipf),
+#   Quantity heavy-tailed (sesekali pesanan grosir)
+# - invoice pembatalan 'C...' dengan Quantity negatif
+# - baris tanpa Customer ID, Price 0, baris duplikat persis
+# - StockCode operasional (POST, M, DOT, ...) seperti di cleaning_core
+# File ditulis per blok BARIS_PER_BLOK baris, jadi memori tetap kecil
+# berapapun jumlah barisnya.
+SKALA = {'1M': 1_000_000, '10M': 10_000_000, '100M': 100_000_000}
+BARIS_PER_BLOK = 1_000_000
+BARIS_PER_INVOICE = 20
+BARIS_PER_PELANGGAN = 180          # data asli: ~1.07 juta baris / ~5.9 ribu pelanggan
+JUMLAH_PRODUK = 4000
+TANGGAL_AWAL = np.datetime64('2009-12-01T07:00')
+RENTANG_HARI = 739                 # s.d. 2011-12-09, seperti data asli
+INVOICE_AWAL = 489434
+
+PROPORSI_TANPA_CUSTOMER = 0.22
+PROPORSI_PEMBATALAN = 0.02
+PROPORSI_OPERASIONAL = 0.005
+PROPORSI_DUPLIKAT = 0.01
+PROPORSI_HARGA_NOL = 0.001
+
+KODE_OPERASIONAL = {
+    'POST': ('POSTAGE', 18.0),
+    'M': ('Manual', 2.5),
+    'DOT': ('DOTCOM POSTAGE', 11.0),
+    'BANK CHARGES': ('Bank Charges', 15.0),
+    'PADS': ('PADS TO MATCH ALL CUSHIONS', 0.001),
+    'D': ('Discount', 8.0),
+    'CRUK': ('CRUK Commission', 13.0),
+}
+NEGARA = ['United Kingdom', 'Germany', 'France', 'EIRE', 'Netherlands', 'Spain',
+          'Belgium', 'Switzerland', 'Portugal', 'Australia', 'Norway', 'Italy']
+PELUANG_NEGARA = [0.9, 0.02, 0.02, 0.02, 0.008, 0.006, 0.005, 0.005, 0.004, 0.004, 0.004, 0.004]
+WARNA = ['WHITE', 'RED', 'PINK', 'BLUE', 'GREEN', 'IVORY', 'BLACK', 'VINTAGE', 'RETRO', 'SET OF 3']
+BARANG = ['HANGING HEART T-LIGHT HOLDER', 'REGENCY CAKESTAND', 'JUMBO BAG', 'LUNCH BOX',
+          'PARTY BUNTING', 'METAL LANTERN', 'CERAMIC MUG', 'PAPER CHAIN KIT', 'DOORMAT',
+          'WATER BOTTLE', 'ALARM CLOCK', 'CAKE CASES', 'GIFT WRAP', 'PHOTO FRAME']
+KOLOM = ['Invoice', 'StockCode', 'Description', 'Quantity', 'InvoiceDate', 'Price',
+         'Customer ID', 'Country']
+
+
+def parse_scale(text):
+    # '1M', '10M', '100M', '250k', atau angka biasa -> jumlah baris
+    text = str(text).strip()
+    if text.upper() in SKALA:
+        return SKALA[text.upper()]
+    factor = {'K': 1_000, 'M': 1_000_000}.get(text[-1:].upper(), 1)
+    number = text[:-1] if factor > 1 else text
+    return int(float(number) * factor)
+
+
+def make_catalog(rng):
+    # Katalog produk: StockCode 5 digit (sebagian dengan huruf varian),
+    # deskripsi, harga satuan (lognormal) & ukuran kemasan
+    codes = rng.choice(np.arange(10_000, 90_000), JUMLAH_PRODUK, replace=False).astype(str)
+    variant = rng.random(JUMLAH_PRODUK) < 0.15
+    codes[variant] = np.char.add(codes[variant], rng.choice(list('ABCDEF'), variant.sum()))
+    descriptions = np.char.add(np.char.add(rng.choice(WARNA, JUMLAH_PRODUK), ' '),
+                               rng.choice(BARANG, JUMLAH_PRODUK))
+    prices = np.round(rng.lognormal(mean=1.0, sigma=0.8, size=JUMLAH_PRODUK) + 0.01, 2)
+    packs = rng.choice([1, 2, 6, 12, 24], JUMLAH_PRODUK, p=[0.4, 0.1, 0.25, 0.2, 0.05])
+    popularity = 1.0 / np.arange(1, JUMLAH_PRODUK + 1) ** 0.9
+    return {'code': codes, 'description': descriptions, 'price': prices, 'pack': packs,
+            'p': popularity / popularity.sum()}
+
+
+def make_customers(rng, n_customers):
+    # Aktivitas pelanggan heavy-tailed: sedikit pelanggan grosir sangat aktif
+    activity = rng.pareto(1.5, n_customers) + 1.0
+    country = rng.choice(len(NEGARA), n_customers, p=PELUANG_NEGARA)
+    return {'id': 12346 + np.arange(n_customers), 'country': country,
+            'p': activity / activity.sum()}
+
+
+def _invoice_lines(rng, n_rows):
+    # Jumlah baris per invoice (geometrik); invoice terakhir dipotong agar
+    # total baris blok = n_rows
+    lines = rng.geometric(1 / BARIS_PER_INVOICE, n_rows // BARIS_PER_INVOICE * 2 + 16)
+    total = np.cumsum(lines)
+    while total[-1] < n_rows:
+        extra = rng.geometric(1 / BARIS_PER_INVOICE, len(lines))
+        lines = np.concatenate([lines, extra])
+        total = np.cumsum(lines)
+    n_invoices = int(np.searchsorted(total, n_rows)) + 1
+    lines = lines[:n_invoices]
+    lines[-1] -= total[n_invoices - 1] - n_rows
+    return lines
+
+
+def generate_block(rng, n_rows, first_invoice, expected_invoices, catalog, customers):
+    # --- Level invoice ---
+    lines = _invoice_lines(rng, n_rows)
+    n_invoices = len(lines)
+    invoice_no = first_invoice + np.arange(n_invoices)
+
+    # Tanggal naik seiring nomor invoice, jam kerja 07:00-20:00
+    position = np.minimum((invoice_no - INVOICE_AWAL) / expected_invoices, 1.0)
+    day = (position * RENTANG_HARI).astype('int64')
+    minute = rng.integers(0, 13 * 60, n_invoices)
+    invoice_date = TANGGAL_AWAL + (day * 24 * 60 + minute).astype('timedelta64[m]')
+
+    customer = rng.choice(len(customers['p']), n_invoices, p=customers['p'])
+    customer_id = customers['id'][customer].astype('float64')
+    country = customers['country'][customer]
+    anonymous = rng.random(n_invoices) < PROPORSI_TANPA_CUSTOMER
+    customer_id[anonymous] = np.nan
+    country[anonymous] = rng.choice(len(NEGARA), anonymous.sum(), p=PELUANG_NEGARA)
+    cancelled = rng.random(n_invoices) < PROPORSI_PEMBATALAN
+
+    invoice_text = invoice_no.astype(str)
+    invoice_text[cancelled] = np.char.add('C', invoice_text[cancelled])
+
+    # --- Level baris (setiap atribut invoice diulang sebanyak baris) ---
+    product = rng.choice(JUMLAH_PRODUK, n_rows, p=catalog['p'])
+    stock_code = catalog['code'][product].astype(object)
+    description = catalog['description'][product].astype(object)
+    price = catalog['price'][product].copy()
+    # Quantity heavy-tailed: kemasan x Zipf (dipotong agar tidak absurd)
+    quantity = catalog['pack'][product] * np.minimum(rng.zipf(2.2, n_rows), 500)
+    quantity = np.where(np.repeat(cancelled, lines), -quantity, quantity)
+
+    operational = rng.random(n_rows) < PROPORSI_OPERASIONAL
+    codes = list(KODE_OPERASIONAL)
+    chosen = rng.integers(0, len(codes), operational.sum())
+    stock_code[operational] = np.array(codes, dtype=object)[chosen]
+    description[operational] = np.array([KODE_OPERASIONAL[c][0] for c in codes], dtype=object)[chosen]
+    price[operational] = np.round(np.array([KODE_OPERASIONAL[c][1] for c in codes])[chosen]
+                                  * rng.lognormal(0, 0.3, operational.sum()), 2)
+    quantity[operational] = np.sign(quantity[operational])
+    price[rng.random(n_rows) < PROPORSI_HARGA_NOL] = 0.0
+
+    block = pd.DataFrame({
+        'Invoice': np.repeat(invoice_text, lines),
+        'StockCode': stock_code,
+        'Description': description,
+        'Quantity': quantity,
+        'InvoiceDate': np.repeat(invoice_date, lines),
+        'Price': price,
+        'Customer ID': np.repeat(customer_id, lines),
+        'Country': np.array(NEGARA, dtype=object)[np.repeat(country, lines)],
+    }, columns=KOLOM)
+
+    # Duplikat persis (baris yang sama tercatat dua kali, tepat di bawahnya)
+    repeat = 1 + (rng.random(n_rows) < PROPORSI_DUPLIKAT)
+    block = block.iloc[np.repeat(np.arange(n_rows), repeat)]
+    return block, n_invoices
+
+
+def generate_retail(output_file='online_retail_II.csv', rows=SKALA['1M'], seed=42, n_customers=None):
+    # rows = jumlah baris sebelum duplikat (file akhir ~1% lebih banyak)
+    n_customers = n_customers or max(rows // BARIS_PER_PELANGGAN, 1)
+    expected_invoices = max(rows / BARIS_PER_INVOICE, 1)
+    base = np.random.default_rng([seed, 0])
+    catalog = make_catalog(base)
+    customers = make_customers(base, n_customers)
+
+    print(f"Membuat {rows:,} baris transaksi, {n_customers:,} pelanggan -> '{output_file}'")
+    start = time.perf_counter()
+    written = 0
+    next_invoice = INVOICE_AWAL
+    for block_no, block_start in enumerate(range(0, rows, BARIS_PER_BLOK)):
+        # RNG per blok: hasil tidak tergantung urutan/jumlah blok sebelumnya
+        rng = np.random.default_rng([seed, 1, block_no])
+        n_rows = min(BARIS_PER_BLOK, rows - block_start)
+        block, n_invoices = generate_block(rng, n_rows, next_invoice, expected_invoices,
+                                           catalog, customers)
+        next_invoice += n_invoices
+        block.to_csv(output_file, mode='w' if block_no == 0 else 'a', header=block_no == 0,
+                     index=False, date_format='%Y-%m-%d %H:%M:%S')
+        written += len(block)
+        print(f"   - blok {block_no + 1}: {written:,} baris ({time.perf_counter() - start:.1f} s)")
+
+    print(f"SELESAI! {written:,} baris, {next_invoice - INVOICE_AWAL:,} invoice "
+          f"dalam {time.perf_counter() - start:.1f} s")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generator transaksi sintetis berbentuk online_retail_II.csv")
+    parser.add_argument('--scale', default='1M', help="Jumlah baris: 1M, 10M, 100M, atau angka (mis. 250k)")
+    parser.add_argument('--output', default='online_retail_II.csv', help="File CSV tujuan")
+    parser.add_argument('--seed', type=int, default=42, help="Seed (hasil sama untuk seed & skala sama)")
+    parser.add_argument('--customers', type=int, default=None,
+                        help=f"Jumlah pelanggan (default: baris / {BARIS_PER_PELANGGAN})")
+    args = parser.parse_args()
+    generate_retail(args.output, parse_scale(args.scale), args.seed, args.customers)
@@ -0,0 +1,241 @@
+import codecs
+import ctypes
+import itertools
+import os
+import sys
+import shutil
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import TableWriter, write_table
+from schema import RAW_DTYPES, apply_schema, print_memory_report
+from dates import InvoiceDateParser, to_epoch
+from dedup import RowDeduplicator
+from instrument import process_peak_kb, step
+
+# Kode StockCode yang bukan produk (Ongkir, Manual, Diskon, dll)
+SAMPAH_OPERASIONAL = ['POST', 'M', 'BANK CHARGES', 'PADS', 'D', 'DOT', 'CRUK']
+
+# Perkiraan AWAL pengali memori per chunk (chunk mentah + mask filter + hasil
+# filter + kolom tanggal/TotalAmount baru + buffer to_csv). Hanya dipakai untuk
+# chunk pertama (setengah ukuran); setelah itu ukuran chunk dihitung dari
+# puncak RSS yang benar-benar terukur per baris (lihat ChunkSizer).
+FAKTOR_OVERHEAD_CHUNK = 4
+BARIS_SAMPEL = 10000
+BARIS_MINIMUM = 1000
+# Bagian sisa budget (budget - RSS sebelum chunk) yang boleh dipakai satu chunk
+BATAS_AMAN = 0.6
+# Bagian budget untuk run fingerprint dedup di RAM sebelum di-spill ke disk
+PORSI_FINGERPRINT = 0.03
+UKURAN_BLOK_ENCODING = 1 << 20
+
+
+def detect_encoding(input_file):
+    # Cek sekali di awal apakah seluruh file valid UTF-8 (hanya decode byte,
+    # tanpa parsing CSV). Jika tidak, pakai ISO-8859-1 yang selalu bisa dibaca.
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(UKURAN_BLOK_ENCODING), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'ISO-8859-1'
+    return 'utf-8'
+
+
+def _current_rss_bytes():
+    # RSS proses saat ini (Linux). Di OS lain dianggap 0 agar tetap jalan.
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _release_free_memory():
+    # Kembalikan heap yang sudah dibebaskan ke OS (glibc malloc_trim), supaya
+    # RSS setelah chunk = memori yang benar-benar masih dipakai. Di luar
+    # glibc tidak melakukan apa-apa.
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def estimate_chunksize(input_file, memory_budget_mb, encoding=None):
+    # Ukur memori per baris dari sampel kecil, lalu hitung berapa baris
+    # yang muat dalam sisa budget (budget - RSS yang sudah terpakai).
+    sample = pd.read_csv(input_file, nrows=BARIS_SAMPEL, encoding=encoding, dtype=RAW_DTYPES)
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+
+    budget_bytes = memory_budget_mb * 1024 * 1024 - _current_rss_bytes()
+    if budget_bytes <= 0:
+        print(f"   - PERINGATAN: Proses sudah memakai memori di atas budget {memory_budget_mb} MB.")
+        return 1000
+
+    return max(BARIS_MINIMUM, int(budget_bytes / (bytes_per_row * FAKTOR_OVERHEAD_CHUNK)))
+
+
+class ChunkSizer:
+    # Ukuran chunk adaptif agar puncak RSS tetap <= budget. Model:
+    #     puncak chunk ~ RSS sebelum chunk + byte_per_baris x baris
+    # Setelah tiap chunk heap yang bebas dikembalikan ke OS (malloc_trim), jadi
+    # RSS sebelum chunk = memori yang masih hidup (modul, fingerprint dedup, ...).
+    # - chunk pertama = setengah perkiraan awal (faktor overhead masih tebakan)
+    # - setiap chunk yang menaikkan puncak RSS proses (VmHWM) memberi ukuran
+    #   nyata byte_per_baris; yang dipakai = nilai terbesar yang pernah terukur
+    # - selama belum ada ukuran, chunk naik paling banyak 2x (puncak tidak naik
+    #   berarti chunk itu masih di bawah puncak lama)
+    def __init__(self, memory_budget_mb, initial_chunksize):
+        self.budget = memory_budget_mb * 1024 * 1024
+        self.chunksize = max(BARIS_MINIMUM, initial_chunksize // 2)
+        # Tebakan awal = yang dipakai estimate_chunksize (sampel x FAKTOR)
+        self.bytes_per_row = max(self.budget - _current_rss_bytes(), 1) / initial_chunksize
+        self.measured = False
+        self._rss_before = 0
+        self._peak_before = 0
+        self._reserve = 0
+
+    def before_chunk(self, reserve_bytes=0):
+        # reserve_bytes: lonjakan di luar chunk yang mungkin terjadi selama
+        # chunk ini (salinan run fingerprint saat dedup merge), tidak dihitung
+        # sebagai memori per baris
+        _release_free_memory()
+        self._rss_before = _current_rss_bytes()
+        self._peak_before = process_peak_kb() * 1024
+        self._reserve = reserve_bytes
+        return self.chunksize
+
+    def after_chunk(self, rows):
+        peak = process_peak_kb() * 1024
+        if peak > self._peak_before and rows:
+            observed = max(peak - self._rss_before - self._reserve, 0) / rows
+            self.bytes_per_row = max(self.bytes_per_row, observed) if self.measured else observed
+            self.measured = True
+        _release_free_memory()
+        available = (self.budget - _current_rss_bytes() - self._reserve) * BATAS_AMAN
+        fit = int(available / self.bytes_per_row) if available > 0 else BARIS_MINIMUM
+        if not self.measured:
+            fit = min(fit, 2 * self.chunksize)
+        self.chunksize = max(BARIS_MINIMUM, fit)
+        return self.chunksize
+
+
+def clean_chunk(df, exclude_codes=None, dedup=None, date_parser=None):
+    # Semua aturan pembersihan dalam satu mask boolean (tanpa .copy() berlapis):
+    # Customer ID wajib ada, Quantity > 0 dan Price > 0 (membuang pembatalan 'C'
+    # dan error input), serta opsional membuang kode non-produk.
+    with step('filter', rows_in=len(df)) as s:
+        mask = df['Customer ID'].notna() & (df['Quantity'] > 0) & (df['Price'] > 0)
+        if exclude_codes:
+            mask &= ~df['StockCode'].isin(exclude_codes)
+        df_clean = df[mask]
+        s.rows_out = len(df_clean)
+
+    # Hapus Duplikat. Dengan RowDeduplicator, duplikat lintas chunk juga terbuang
+    # (dibandingkan lewat fingerprint 64-bit, bukan isi semua kolom)
+    with step('dedup', rows_in=len(df_clean)) as s:
+        if dedup is None:
+            df_clean = df_clean.drop_duplicates()
+        else:
+            df_clean = dedup.drop_duplicates(df_clean)
+        s.rows_out = len(df_clean)
+
+    # Feature Engineering: Tambah kolom Total Belanja
+    df_clean = df_clean.assign(TotalAmount=df_clean['Quantity'] * df_clean['Price'])
+
+    # Ubah Tipe Data sesuai skema transaksi (category, int32, datetime);
+    # termasuk parsing InvoiceDate (to_datetime)
+    with step('schema', rows_in=len(df_clean)) as s:
+        df_clean = apply_schema(df_clean, date_parser)
+        s.rows_out = len(df_clean)
+    return df_clean
+
+
+def _for_output(df_clean, epoch_dates):
+    # Opsional: simpan InvoiceDate sebagai epoch detik (int64) supaya pembaca
+    # CSV berikutnya tidak perlu parsing teks tanggal
+    if not epoch_dates:
+        return df_clean
+    return df_clean.assign(InvoiceDate=to_epoch(df_clean['InvoiceDate']))
+
+
+def clean_file(input_file, output_file, exclude_codes=None, streaming=False,
+               memory_budget_mb=512, preview_cols=None, spill_dir=None, epoch_dates=False):
+    # Satu kali baca file mentah -> satu kali tulis file bersih.
+    # Mengembalikan (jumlah baris awal, jumlah baris bersih, preview).
+    encoding = detect_encoding(input_file)
+    print(f"   - Encoding terdeteksi: {encoding}")
+    date_parser = InvoiceDateParser()
+
+    if not streaming:
+        dedup = RowDeduplicator(spill_dir=spill_dir)
+        with step('read') as s:
+            df = pd.read_csv(input_file, encoding=encoding, dtype=RAW_DTYPES)
+            s.rows_out = len(df)
+        print(f"   Data Awal: {df.shape[0]} baris, {df.shape[1]} kolom")
+
+        df_clean = clean_chunk(df, exclude_codes, dedup, date_parser)
+        dedup.report()
+        dedup.close()
+        print_memory_report(df_clean, "Memori data bersih per kolom")
+        with step('write', rows_in=len(df_clean)):
+            write_table(_for_output(df_clean, epoch_dates), output_file)
+        return df.shape[0], df_clean.shape[0], df_clean[preview_cols].head()
+
+    # Mode streaming: file dibaca per chunk lalu di-append ke output, sehingga
+    # memori puncak dibatasi ukuran chunk, bukan ukuran file.
+    # Ukuran chunk disesuaikan setelah tiap chunk dari puncak RSS terukur
+    sizer = ChunkSizer(memory_budget_mb, estimate_chunksize(input_file, memory_budget_mb, encoding))
+    print(f"   - Mode streaming: budget {memory_budget_mb} MB -> chunk pertama {sizer.chunksize} baris")
+    # Fingerprint dedup ikut budget: di atas PORSI_FINGERPRINT dari budget,
+    # run di-spill ke disk (folder sementara jika --spill-dir tidak diisi)
+    temp_spill = tempfile.mkdtemp(prefix='market_pulse_dedup_') if spill_dir is None else None
+    dedup = RowDeduplicator(spill_dir=spill_dir or temp_spill,
+                            spill_threshold_mb=memory_budget_mb * PORSI_FINGERPRINT)
+    try:
+        return _clean_streaming(input_file, output_file, encoding, sizer, dedup, date_parser,
+                                exclude_codes, preview_cols, epoch_dates)
+    finally:
+        dedup.close()
+        if temp_spill is not None:
+            shutil.rmtree(temp_spill, ignore_errors=True)
+
+
+def _clean_streaming(input_file, output_file, encoding, sizer, dedup, date_parser,
+                     exclude_codes, preview_cols, epoch_dates):
+    # Chunk dibaca dengan get_chunk supaya ukurannya bisa berubah per chunk
+    rows_initial = 0
+    rows_final = 0
+    preview = None
+    reader = pd.read_csv(input_file, iterator=True, encoding=encoding, dtype=RAW_DTYPES)
+    with reader, TableWriter(output_file) as writer:
+        for n_chunk in itertools.count(1):
+            # Merge run fingerprint di RAM butuh satu salinan seukuran run
+            chunksize = sizer.before_chunk(reserve_bytes=dedup.memory_bytes)
+            try:
+                chunk = reader.get_chunk(chunksize)
+            except StopIteration:
+                break
+            rows_initial += chunk.shape[0]
+
+            with step(f'chunk_{n_chunk}', rows_in=len(chunk)) as s:
+                df_clean = clean_chunk(chunk, exclude_codes, dedup, date_parser)
+                rows_final += df_clean.shape[0]
+                if preview is None:
+                    preview = df_clean[preview_cols].head()
+
+                with step('write', rows_in=len(df_clean)):
+                    writer.write(_for_output(df_clean, epoch_dates))
+                s.rows_out = len(df_clean)
+            print(f"   - Chunk {n_chunk}: {chunk.shape[0]} baris -> {df_clean.shape[0]} baris bersih")
+            n_rows = chunk.shape[0]
+            del chunk, df_clean
+            sizer.after_chunk(n_rows)
+
+    dedup.report()
+    return rows_initial, rows_final, preview
@@ -1,9 +1,16 @@
-import pandas as pd
 import os
+import sys
+import argparse
 
-def clean_retail_data():
-    input_file = 'online_retail_II.csv'
-    output_file = 'online_retail_clean.csv'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_path
+from cleaning_core import clean_file
+from instrument import stage
+
+
+def clean_retail_data(streaming=False, memory_budget_mb=512, spill_dir=None, epoch_dates=False,
+                      input_file='online_retail_II.csv', output_file=None):
+    output_file = output_file or table_path('online_retail_clean')
 
     # Cek apakah file ada
     if not os.path.exists(input_file):
@@ -11,45 +18,39 @@ def clean_retail_data():
         return
 
     print("1. Sedang membaca data... (Mungkin butuh waktu beberapa detik)")
-    try:
-        df = pd.read_csv(input_file)
-    except UnicodeDecodeError:
-        print("   - Mendeteksi encoding berbeda, mencoba ISO-8859-1...")
-        df = pd.read_csv(input_file, encoding='ISO-8859-1')
-    
-    print(f"   Data Awal: {df.shape[0]} baris, {df.shape[1]} kolom")
 
     # --- PROSES CLEANING ---
+    # Hapus baris tanpa Customer ID, hapus duplikat, ambil Quantity > 0 dan Price > 0,
+    # ubah tipe data, dan tambah kolom TotalAmount (lihat cleaning_core.clean_chunk)
     print("\n2. Memulai proses pembersihan...")
-    
-    # Hapus baris tanpa Customer ID
-    df_clean = df.dropna(subset=['Customer ID']).copy()
-    
-    # Hapus Duplikat
-    df_clean = df_clean.drop_duplicates()
-    
-    # Filter: Hanya Ambil Quantity > 0 dan Price > 0
-    # (Membuang pembatalan 'C' dan error input)
-    df_clean = df_clean[(df_clean['Quantity'] > 0) & (df_clean['Price'] > 0)]
-    
-    # Ubah Tipe Data
-    df_clean['InvoiceDate'] = pd.to_datetime(df_clean['InvoiceDate'])
-    df_clean['Customer ID'] = df_clean['Customer ID'].astype(int)
-    
-    # Feature Engineering: Tambah kolom Total Belanja
-    df_clean['TotalAmount'] = df_clean['Quantity'] * df_clean['Price']
-
-    print(f"   Data Bersih: {df_clean.shape[0]} baris")
-    print(f"   Dibuang: {df.shape[0] - df_clean.shape[0]} baris sampah/tidak valid.")
+    rows_initial, rows_final, preview = clean_file(
+        input_file, output_file,
+        streaming=streaming, memory_budget_mb=memory_budget_mb, spill_dir=spill_dir,
+        epoch_dates=epoch_dates,
+        preview_cols=['Invoice', 'Customer ID', 'TotalAmount', 'InvoiceDate'])
+
+    print(f"   Data Bersih: {rows_final} baris")
+    print(f"   Dibuang: {rows_initial - rows_final} baris sampah/tidak valid.")
 
     # --- SIMPAN HASIL ---
-    print(f"\n3. Menyimpan data bersih ke '{output_file}'...")
-    df_clean.to_csv(output_file, index=False)
+    print(f"\n3. Data bersih tersimpan di '{output_file}'")
     print("SELESAI! File siap digunakan untuk analisis selanjutnya.")
 
     # Tampilkan sedikit preview
     print("\nPreview Data:")
-    print(df_clean[['Invoice', 'Customer ID', 'TotalAmount', 'InvoiceDate']].head())
+    print(preview)
 
 if __name__ == "__main__":
-    clean_retail_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Membersihkan data mentah online_retail_II.csv")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Baca file per chunk (untuk file yang lebih besar dari RAM)")
+    parser.add_argument('--memory-budget-mb', type=int, default=512,
+                        help="Batas memori (RSS) untuk mode streaming, dalam MB")
+    parser.add_argument('--spill-dir', default=None,
+                        help="Folder untuk spill fingerprint deduplikasi ke disk (opsional)")
+    parser.add_argument('--epoch-dates', action='store_true',
+                        help="Simpan InvoiceDate sebagai epoch detik (lebih cepat dibaca tahap berikutnya)")
+    args = parser.parse_args()
+    with stage('clean'):
+        clean_retail_data(streaming=args.streaming, memory_budget_mb=args.memory_budget_mb,
+                          spill_dir=args.spill_dir, epoch_dates=args.epoch_dates)
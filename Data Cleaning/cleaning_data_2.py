@@ -1,10 +1,18 @@
-import pandas as pd
 import os
+import sys
+import argparse
 
-def clean_retail_data():
-    # Sesuaikan nama file input kamu
-    input_file = 'online_retail_clean.csv' 
-    output_file = 'online_retail_clean_2.csv'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_path
+from cleaning_core import SAMPAH_OPERASIONAL, clean_file
+from instrument import stage
+
+
+def clean_retail_data(streaming=False, memory_budget_mb=512, spill_dir=None, epoch_dates=False,
+                      input_file='online_retail_II.csv', output_file=None):
+    # Langsung dari file mentah: semua aturan (termasuk kode sampah operasional)
+    # dijalankan dalam satu kali baca, tanpa file perantara online_retail_clean.csv
+    output_file = output_file or table_path('online_retail_clean_2')
 
     # Cek apakah file ada
     if not os.path.exists(input_file):
@@ -12,57 +20,46 @@ def clean_retail_data():
         return
 
     print("1. Sedang membaca data... (Mungkin butuh waktu beberapa detik)")
-    try:
-        df = pd.read_csv(input_file)
-    except UnicodeDecodeError:
-        print("   - Mendeteksi encoding berbeda, mencoba ISO-8859-1...")
-        df = pd.read_csv(input_file, encoding='ISO-8859-1')
-    
-    rows_initial = df.shape[0]
-    print(f"   Data Awal: {rows_initial} baris, {df.shape[1]} kolom")
 
     # --- PROSES CLEANING ---
-    print("\n2. Memulai proses pembersihan...")
-    
     # 1. Hapus baris tanpa Customer ID
-    df_clean = df.dropna(subset=['Customer ID']).copy()
-    
     # 2. Hapus Duplikat
-    df_clean = df_clean.drop_duplicates()
-    
     # 3. Filter: Hanya Ambil Quantity > 0 dan Price > 0
-    # (Membuang pembatalan 'C' dan error input/minus)
-    df_clean = df_clean[(df_clean['Quantity'] > 0) & (df_clean['Price'] > 0)]
-
-    # --- [BARU] FILTER KODE SAMPAH OPERASIONAL ---
-    # Membuang baris yang bukan produk (Ongkir, Manual, Diskon, dll)
-    sampah_operasional = ['POST', 'M', 'BANK CHARGES', 'PADS', 'D', 'DOT', 'CRUK']
-    df_clean = df_clean[~df_clean['StockCode'].isin(sampah_operasional)]
-    print(f"   - Membersihkan kode non-produk: {', '.join(sampah_operasional)}")
-    # ---------------------------------------------
-    
-    # 4. Ubah Tipe Data
-    df_clean['InvoiceDate'] = pd.to_datetime(df_clean['InvoiceDate'])
-    df_clean['Customer ID'] = df_clean['Customer ID'].astype(int)
-    
-    # 5. Feature Engineering: Tambah kolom Total Belanja
-    df_clean['TotalAmount'] = df_clean['Quantity'] * df_clean['Price']
+    # 4. Filter kode sampah operasional (Ongkir, Manual, Diskon, dll)
+    # 5. Ubah Tipe Data + Tambah kolom TotalAmount
+    print("\n2. Memulai proses pembersihan...")
+    print(f"   - Membersihkan kode non-produk: {', '.join(SAMPAH_OPERASIONAL)}")
+    rows_initial, rows_final, preview = clean_file(
+        input_file, output_file, exclude_codes=SAMPAH_OPERASIONAL,
+        streaming=streaming, memory_budget_mb=memory_budget_mb, spill_dir=spill_dir,
+        epoch_dates=epoch_dates,
+        preview_cols=['Invoice', 'StockCode', 'TotalAmount', 'InvoiceDate'])
 
     # Hitung statistik pembersihan
-    rows_final = df_clean.shape[0]
     rows_deleted = rows_initial - rows_final
 
     print(f"   Data Bersih: {rows_final} baris")
     print(f"   Dibuang: {rows_deleted} baris (Data kosong, duplikat, retur, & kode sampah).")
 
     # --- SIMPAN HASIL ---
-    print(f"\n3. Menyimpan data bersih ke '{output_file}'...")
-    df_clean.to_csv(output_file, index=False)
+    print(f"\n3. Data bersih tersimpan di '{output_file}'")
     print("SELESAI! File siap digunakan untuk analisis Market Pulse.")
 
     # Tampilkan sedikit preview
     print("\nPreview Data Bersih:")
-    print(df_clean[['Invoice', 'StockCode', 'TotalAmount', 'InvoiceDate']].head())
+    print(preview)
 
 if __name__ == "__main__":
-    clean_retail_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Membersihkan online_retail_II.csv menjadi online_retail_clean_2.csv")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Baca file per chunk (untuk file yang lebih besar dari RAM)")
+    parser.add_argument('--memory-budget-mb', type=int, default=512,
+                        help="Batas memori (RSS) untuk mode streaming, dalam MB")
+    parser.add_argument('--spill-dir', default=None,
+                        help="Folder untuk spill fingerprint deduplikasi ke disk (opsional)")
+    parser.add_argument('--epoch-dates', action='store_true',
+                        help="Simpan InvoiceDate sebagai epoch detik (lebih cepat dibaca tahap berikutnya)")
+    args = parser.parse_args()
+    with stage('clean'):
+        clean_retail_data(streaming=args.streaming, memory_budget_mb=args.memory_budget_mb,
+                          spill_dir=args.spill_dir, epoch_dates=args.epoch_dates)
@@ -0,0 +1,133 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Deduplikasi streaming: tiap baris diringkas jadi fingerprint 64-bit (hash
+# semua kolom), dan hanya fingerprint yang disimpan -- bukan isi baris seperti
+# Description yang panjang. Duplikat lintas chunk tetap terbuang.
+#
+# Fingerprint disimpan sebagai beberapa "run" array uint64 terurut. Run baru
+# ditambah per chunk dan run di RAM digabung jika jumlahnya melewati MAX_RUNS.
+# Jika spill_dir diisi dan run gabungan melewati batas, run itu ditulis ke
+# file .npy dan sejak itu hanya dibaca lewat memory-map (probe searchsorted
+# langsung ke file, tidak pernah dimuat utuh lagi ke RAM). Jika jumlah run di
+# disk melewati MAX_DISK_RUNS, run-run itu digabung k-way di disk per blok
+# BLOK_MERGE elemen, jadi memori gabungan ~ k x blok, bukan seluruh fingerprint.
+MAX_RUNS = 8
+MAX_DISK_RUNS = 8
+BLOK_MERGE = 1 << 20
+
+
+def merge_runs_on_disk(runs, path, block=BLOK_MERGE):
+    # k-way merge run terurut (memmap) ke file .npy baru, per blok. Fingerprint
+    # di run berbeda tidak pernah sama (sudah dedup), jadi cukup diurutkan.
+    total = sum(len(run) for run in runs)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint64, shape=(total,))
+    pos = [0] * len(runs)
+    written = 0
+    while written < total:
+        active = [i for i, run in enumerate(runs) if pos[i] < len(run)]
+        # Batas blok: nilai terkecil di antara elemen terakhir blok tiap run;
+        # semua elemen <= batas itu dari semua run aman ditulis sekarang
+        bound = min(runs[i][min(pos[i] + block, len(runs[i])) - 1] for i in active)
+        parts = []
+        for i in active:
+            run = runs[i]
+            end = pos[i] + int(np.searchsorted(run[pos[i]:pos[i] + block], bound, side='right'))
+            parts.append(np.asarray(run[pos[i]:end]))
+            pos[i] = end
+        merged = np.sort(np.concatenate(parts))
+        out[written:written + len(merged)] = merged
+        written += len(merged)
+    out.flush()
+    del out
+    return np.load(path, mmap_mode='r')
+
+
+class RowDeduplicator:
+    def __init__(self, spill_dir=None, spill_threshold_mb=256):
+        self.spill_dir = spill_dir
+        self.spill_threshold = spill_threshold_mb * 1024 * 1024
+        self._runs = []
+        self._disk_runs = []
+        self._spill_files = []
+        self.rows_seen = 0
+        self.dropped = 0
+
+    @staticmethod
+    def fingerprint(df):
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    def _seen_before(self, keys):
+        seen = np.zeros(len(keys), dtype=bool)
+        for run in self._runs + self._disk_runs:
+            pos = np.searchsorted(run, keys)
+            inside = pos < len(run)
+            seen[inside] |= run[pos[inside]] == keys[inside]
+        return seen
+
+    def _add_run(self, keys):
+        self._runs.append(np.sort(keys))
+        if len(self._runs) > MAX_RUNS:
+            # Sort in-place: lonjakan memori saat merge = satu salinan run
+            merged = np.concatenate(self._runs)
+            self._runs = []
+            merged.sort()
+            if self.spill_dir is not None and merged.nbytes >= self.spill_threshold:
+                self._spill(merged)
+            else:
+                self._runs = [merged]
+
+    def _new_spill_path(self):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix='fingerprint_', suffix='.npy', dir=self.spill_dir)
+        os.close(fd)
+        return path
+
+    def _spill(self, run):
+        path = self._new_spill_path()
+        np.save(path, run)
+        self._spill_files.append(path)
+        self._disk_runs.append(np.load(path, mmap_mode='r'))
+        if len(self._disk_runs) > MAX_DISK_RUNS:
+            path = self._new_spill_path()
+            merged = merge_runs_on_disk(self._disk_runs, path)
+            old_files = self._spill_files
+            self._disk_runs = [merged]
+            self._spill_files = [path]
+            for old in old_files:
+                os.remove(old)
+
+    def drop_duplicates(self, df):
+        # Buang baris yang sudah pernah muncul (di chunk ini atau chunk sebelumnya)
+        keys = self.fingerprint(df)
+        keep = ~pd.Series(keys).duplicated().to_numpy() & ~self._seen_before(keys)
+
+        self.rows_seen += len(df)
+        self.dropped += int(len(df) - keep.sum())
+        if keep.any():
+            self._add_run(keys[keep])
+        return df[keep]
+
+    @property
+    def memory_bytes(self):
+        # Memori fingerprint di RAM (run di disk dibaca lewat memmap, lihat disk_bytes)
+        return sum(run.nbytes for run in self._runs)
+
+    @property
+    def disk_bytes(self):
+        return sum(os.path.getsize(path) for path in self._spill_files)
+
+    def report(self):
+        print(f"   - Duplikat dibuang: {self.dropped} baris dari {self.rows_seen} baris")
+        print(f"   - Memori fingerprint: {self.memory_bytes / 1024 ** 2:.2f} MB"
+              + (f" (+{self.disk_bytes / 1024 ** 2:.2f} MB di disk)" if self._spill_files else ""))
+
+    def close(self):
+        self._runs = []
+        self._disk_runs = []
+        for path in self._spill_files:
+            os.remove(path)
+        self._spill_files = []
@@ -1,42 +1,75 @@
-import pandas as pd
-import datetime as dt
+import os
+import sys
+import argparse
 
-def make_rfm_file():
-    print("1. Membaca Data Bersih (online_retail_clean_2.csv)...")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_columns, table_path, write_table
+from schema import print_memory_report, read_transactions
+from rfm_out_of_core import compute_rfm_out_of_core
+from rfm_engine import (compute_partial_rfm, compute_rfm_parallel, default_target_date,
+                        finalize_partial_rfm, save_partial_rfm)
+from instrument import stage, step
+
+def make_rfm_file(frequency='exact', hll_error=0.05, partial_file=None, n_jobs=1,
+                  out_of_core=False, n_buckets=16, chunksize=500_000,
+                  input_name='online_retail_clean_2', output_file=None):
+    if out_of_core:
+        make_rfm_file_out_of_core(n_buckets, chunksize, input_name, output_file)
+        return
+
+    print(f"1. Membaca Data Bersih ({input_name})...")
     try:
-        # Load data transaksi bersih
-        df = pd.read_csv('online_retail_clean_2.csv')
-        
-        # Pastikan kolom tanggal dikenali sebagai datetime
-        df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
-        
+        # Load data transaksi bersih, hanya kolom yang dipakai RFM
+        # (tanggal langsung dikenali sebagai datetime saat dibaca)
+        columns = ['Customer ID', 'Invoice', 'InvoiceDate', 'TotalAmount']
+
         # Pastikan kolom TotalAmount ada (Quantity * Price)
         # Jaga-jaga jika di file clean belum ada kolom ini
-        if 'TotalAmount' not in df.columns:
+        has_total = 'TotalAmount' in table_columns(input_name)
+        if not has_total:
+            columns = columns[:3] + ['Quantity', 'Price']
+
+        # Dibaca dengan skema ringkas (int32 untuk ID, datetime untuk tanggal)
+        with step('read') as s:
+            df = read_transactions(input_name, columns=columns)
+            s.rows_out = len(df)
+        if not has_total:
             df['TotalAmount'] = df['Quantity'] * df['Price']
+        print_memory_report(df)
             
     except FileNotFoundError:
-        print("ERROR: File 'online_retail_clean_2.csv' tidak ditemukan.")
+        print(f"ERROR: File '{input_name}' tidak ditemukan.")
         return
 
     print("2. Melakukan Agregasi ke Format RFM...")
     
     # Menentukan tanggal patokan (1 hari setelah transaksi terakhir di seluruh data)
-    target_date = df['InvoiceDate'].max() + dt.timedelta(days=1)
+    target_date = default_target_date(df)
     
     # TRANSFORMASI DATA: Dari Transaksi -> Menjadi Pelanggan
-    rfm = df.groupby('Customer ID').agg({
-        'InvoiceDate': lambda x: (target_date - x.max()).days, # Recency: Jarak hari beli terakhir
-        'Invoice': 'nunique',                                     # Frequency: Jumlah struk unik
-        'TotalAmount': 'sum'                                      # Monetary: Total belanja
-    })
-
-    # Ganti nama kolom agar standar
-    rfm.rename(columns={
-        'InvoiceDate': 'Recency',
-        'Invoice': 'Frequency',
-        'TotalAmount': 'Monetary'
-    }, inplace=True)
+    # Recency (jarak hari beli terakhir), Frequency (jumlah struk unik),
+    # Monetary (total belanja) -- lihat rfm_engine.compute_rfm
+    # Mode 'hll': Frequency diperkirakan dengan sketch HyperLogLog per pelanggan
+    with step('groupby', rows_in=len(df)) as s:
+        if frequency == 'hll' or partial_file:
+            partial, sketches = compute_partial_rfm(df, hll_error)
+        if frequency == 'hll':
+            rfm = finalize_partial_rfm(partial, sketches, target_date)
+            print(f"   - Frequency perkiraan (HyperLogLog, error ~{hll_error:.0%})")
+        else:
+            # n_jobs > 1: transaksi di-hash-partition per Customer ID ke beberapa proses
+            n_jobs = n_jobs or os.cpu_count() or 1
+            rfm = compute_rfm_parallel(df, target_date, n_jobs)
+            if n_jobs > 1:
+                print(f"   - Agregasi paralel dengan {n_jobs} proses")
+        s.rows_out = len(rfm)
+        s.note(frequency=frequency)
+
+    # Simpan RFM parsial (LastPurchase, Monetary, sketch) agar bisa digabung
+    # dengan hasil file/mesin lain lewat merge_rfm_partials.py
+    if partial_file:
+        save_partial_rfm(partial, sketches, partial_file)
+        print(f"   - RFM parsial disimpan ke '{partial_file}'")
 
     # Filter kecil: Memastikan Monetary > 0 (kadang ada retur yang lolos)
     rfm = rfm[rfm['Monetary'] > 0]
@@ -45,11 +78,52 @@ def make_rfm_file():
     print("   - Contoh data:")
     print(rfm.head())
 
+    save_rfm_file(rfm, output_file)
+
+
+def make_rfm_file_out_of_core(n_buckets=16, chunksize=500_000,
+                              input_name='online_retail_clean_2', output_file=None):
+    # Untuk file transaksi yang lebih besar dari RAM: stream + spill ke bucket
+    # di disk per hash(Customer ID), lalu reduksi per bucket (rfm_out_of_core.py)
+    print(f"1-2. Mode out-of-core: membaca {input_name} per {chunksize} baris...")
+    try:
+        with step('groupby_out_of_core') as s:
+            rfm = compute_rfm_out_of_core(input_name, n_buckets, chunksize)
+            s.rows_out = len(rfm)
+    except FileNotFoundError:
+        print(f"ERROR: File '{input_name}' tidak ditemukan.")
+        return
+
+    # Filter kecil: Memastikan Monetary > 0 (kadang ada retur yang lolos)
+    rfm = rfm[rfm['Monetary'] > 0]
+
+    print(f"   - Berhasil merangkum menjadi {rfm.shape[0]} pelanggan unik.")
+    save_rfm_file(rfm, output_file)
+
+
+def save_rfm_file(rfm, output_file=None):
     # 3. MENYIMPAN FILE (PENTING!)
-    output_file = 'rfm_data.csv'
-    rfm.to_csv(output_file)
+    output_file = output_file or table_path('rfm_data')
+    with step('write', rows_in=len(rfm)):
+        write_table(rfm, output_file, index=True)
     print(f"\n3. SUKSES! File '{output_file}' telah tersimpan.")
     print("   Sekarang Anda bisa lanjut ke tahap Feature Engineering.")
 
 if __name__ == "__main__":
-    make_rfm_file()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Membuat rfm_data dari online_retail_clean_2")
+    parser.add_argument('--frequency', choices=['exact', 'hll'], default='exact',
+                        help="Mode Frequency: exact (nunique) atau hll (perkiraan HyperLogLog)")
+    parser.add_argument('--hll-error', type=float, default=0.05,
+                        help="Batas error relatif sketch HLL (default 0.05)")
+    parser.add_argument('--partial-file', default=None,
+                        help="Simpan RFM parsial + sketch HLL (.npz) untuk digabung nanti")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Jumlah proses untuk agregasi paralel (0 = semua core)")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Stream file transaksi dan spill ke bucket di disk (file > RAM)")
+    parser.add_argument('--buckets', type=int, default=16, help="Jumlah bucket untuk mode out-of-core")
+    parser.add_argument('--chunksize', type=int, default=500_000, help="Baris per chunk untuk mode out-of-core")
+    args = parser.parse_args()
+    with stage('rfm'):
+        make_rfm_file(args.frequency, args.hll_error, args.partial_file, n_jobs=args.jobs,
+                      out_of_core=args.out_of_core, n_buckets=args.buckets, chunksize=args.chunksize)
\ No newline at end of file
@@ -1,7 +1,13 @@
-import pandas as pd
+import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
-import datetime as dt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from schema import read_transactions
+from rfm_engine import compute_rfm, default_target_date
+from distribution import CACHE_DIR_DEFAULT, DistributionCache, plot_distribution
+from instrument import stage, step
 
 # Mengatur gaya visualisasi agar terlihat akademis dan rapi
 sns.set(style="whitegrid")
@@ -12,27 +18,21 @@ def run_exploration():
     # ==========================================
     print("--- 1. MEMBACA & MENYIAPKAN DATA ---")
     try:
-        df = pd.read_csv('online_retail_clean_2.csv')
-        df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
+        with step('read') as s:
+            df = read_transactions('online_retail_clean_2',
+                                   columns=['Customer ID', 'Invoice', 'InvoiceDate', 'TotalAmount'])
+            s.rows_out = len(df)
     except FileNotFoundError:
         print("Error: File 'online_retail_clean_2.csv' tidak ditemukan.")
         return
 
     # Membuat RFM (Recency, Frequency, Monetary)
     # Patokan tanggal analisis = 1 hari setelah transaksi terakhir
-    analysis_date = df['InvoiceDate'].max() + dt.timedelta(days=1)
-    
-    rfm = df.groupby('Customer ID').agg({
-        'InvoiceDate': lambda x: (analysis_date - x.max()).days, # Recency
-        'Invoice': 'nunique',                                     # Frequency
-        'TotalAmount': 'sum'                                      # Monetary
-    })
+    analysis_date = default_target_date(df)
     
-    rfm.rename(columns={
-        'InvoiceDate': 'Recency',
-        'Invoice': 'Frequency',
-        'TotalAmount': 'Monetary'
-    }, inplace=True)
+    with step('groupby', rows_in=len(df)) as s:
+        rfm = compute_rfm(df, analysis_date)
+        s.rows_out = len(rfm)
     
     print(f"Data RFM Siap. Jumlah Pelanggan: {rfm.shape[0]}")
 
@@ -49,65 +49,71 @@ def run_exploration():
     # 3. VISUALISASI DISTRIBUSI (Untuk Bukti Data Miring)
     # ==========================================
     print("\n--- 3. MENYIMPAN GRAFIK DISTRIBUSI ---")
-    plt.figure(figsize=(15, 5))
-
-    # Grafik Recency
-    plt.subplot(1, 3, 1)
-    sns.histplot(rfm['Recency'], kde=True, color='skyblue')
-    plt.title('Distribusi Recency (Hari)')
-    plt.xlabel('Hari sejak pembelian terakhir')
-
-    # Grafik Frequency
-    plt.subplot(1, 3, 2)
-    sns.histplot(rfm['Frequency'], kde=True, color='orange')
-    plt.title('Distribusi Frequency (Kali)')
-    plt.xlabel('Jumlah Transaksi')
-    plt.xlim(0, 50) # Zoom in agar grafik terbaca (karena banyak yang cuma beli 1x)
-
-    # Grafik Monetary
-    plt.subplot(1, 3, 3)
-    sns.histplot(rfm['Monetary'], kde=True, color='green')
-    plt.title('Distribusi Monetary (Total Belanja)')
-    plt.xlabel('Total Belanja (Rupiah/Dollar)')
-    plt.xlim(0, 10000) # Zoom in
-
-    plt.tight_layout()
-    plt.savefig('grafik_1_distribusi.png')
+    with step('figure_distribusi'):
+        # Histogram + KDE dihitung sekali per kolom (KDE binned/FFT) dan di-cache
+        dist = DistributionCache(CACHE_DIR_DEFAULT)
+        plt.figure(figsize=(15, 5))
+
+        # Grafik Recency
+        plt.subplot(1, 3, 1)
+        plot_distribution(plt.gca(), dist.get(rfm['Recency']), 'skyblue', 'Recency')
+        plt.title('Distribusi Recency (Hari)')
+        plt.xlabel('Hari sejak pembelian terakhir')
+
+        # Grafik Frequency
+        plt.subplot(1, 3, 2)
+        plot_distribution(plt.gca(), dist.get(rfm['Frequency']), 'orange', 'Frequency')
+        plt.title('Distribusi Frequency (Kali)')
+        plt.xlabel('Jumlah Transaksi')
+        plt.xlim(0, 50) # Zoom in agar grafik terbaca (karena banyak yang cuma beli 1x)
+
+        # Grafik Monetary
+        plt.subplot(1, 3, 3)
+        plot_distribution(plt.gca(), dist.get(rfm['Monetary']), 'green', 'Monetary')
+        plt.title('Distribusi Monetary (Total Belanja)')
+        plt.xlabel('Total Belanja (Rupiah/Dollar)')
+        plt.xlim(0, 10000) # Zoom in
+
+        plt.tight_layout()
+        plt.savefig('grafik_1_distribusi.png')
     print("Berhasil: Grafik 'grafik_1_distribusi.png' disimpan.")
 
     # ==========================================
     # 4. VISUALISASI OUTLIERS (Untuk Deteksi "Sultan")
     # ==========================================
     print("\n--- 4. MENYIMPAN GRAFIK OUTLIERS (BOXPLOT) ---")
-    plt.figure(figsize=(15, 5))
+    with step('figure_outliers'):
+        plt.figure(figsize=(15, 5))
 
-    plt.subplot(1, 3, 1)
-    sns.boxplot(y=rfm['Recency'], color='skyblue')
-    plt.title('Outliers Recency')
+        plt.subplot(1, 3, 1)
+        sns.boxplot(y=rfm['Recency'], color='skyblue')
+        plt.title('Outliers Recency')
 
-    plt.subplot(1, 3, 2)
-    sns.boxplot(y=rfm['Frequency'], color='orange')
-    plt.title('Outliers Frequency')
+        plt.subplot(1, 3, 2)
+        sns.boxplot(y=rfm['Frequency'], color='orange')
+        plt.title('Outliers Frequency')
 
-    plt.subplot(1, 3, 3)
-    sns.boxplot(y=rfm['Monetary'], color='green')
-    plt.title('Outliers Monetary')
+        plt.subplot(1, 3, 3)
+        sns.boxplot(y=rfm['Monetary'], color='green')
+        plt.title('Outliers Monetary')
 
-    plt.tight_layout()
-    plt.savefig('grafik_2_outliers.png')
+        plt.tight_layout()
+        plt.savefig('grafik_2_outliers.png')
     print("Berhasil: Grafik 'grafik_2_outliers.png' disimpan.")
 
     # ==========================================
     # 5. CEK KORELASI (Opsional, tapi bagus untuk PPT)
     # ==========================================
     print("\n--- 5. MENYIMPAN GRAFIK KORELASI ---")
-    plt.figure(figsize=(6, 5))
-    sns.heatmap(rfm.corr(), annot=True, cmap='coolwarm', fmt=".2f")
-    plt.title('Korelasi Antar Variabel RFM')
-    plt.savefig('grafik_3_korelasi.png')
+    with step('figure_korelasi'):
+        plt.figure(figsize=(6, 5))
+        sns.heatmap(rfm.corr(), annot=True, cmap='coolwarm', fmt=".2f")
+        plt.title('Korelasi Antar Variabel RFM')
+        plt.savefig('grafik_3_korelasi.png')
     print("Berhasil: Grafik 'grafik_3_korelasi.png' disimpan.")
     
     print("\nSELESAI! Silakan cek 3 gambar PNG yang muncul di folder Anda.")
 
 if __name__ == "__main__":
-    run_exploration()
\ No newline at end of file
+    with stage('explore'):
+        run_exploration()
\ No newline at end of file
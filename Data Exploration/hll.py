@@ -0,0 +1,171 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# HyperLogLog per pelanggan untuk Frequency (jumlah invoice unik) versi
+# perkiraan, dalam bentuk hybrid supaya memori kecil untuk pelanggan biasa:
+# - sparse: pelanggan dengan sedikit invoice menyimpan set hash 64-bit invoice
+#   (8 byte per invoice, estimasi = jumlah hash unik, praktis exact)
+# - dense : di atas SPARSE_THRESHOLD hash (saat set hash lebih besar dari
+#   m = 2^p register uint8), pelanggan dipromosikan ke register HLL
+# Dua sketch bisa digabung: set hash di-union, register di-max, dan hash
+# sparse dimasukkan ke register jika salah satu sisi sudah dense.
+# Invoice di-hash dalam bentuk teks, jadi kolom int32 dan category (satu
+# invoice huruf membuat apply_schema memilih category) menghasilkan hash sama.
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+
+def precision_for_error(error):
+    # Standard error HLL ~ 1.04 / sqrt(m)
+    m = (1.04 / error) ** 2
+    return int(min(MAX_PRECISION, max(MIN_PRECISION, math.ceil(math.log2(m)))))
+
+
+def _alpha(m):
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
+
+
+def _leading_zeros(x):
+    # Jumlah bit 0 di depan untuk array uint64 (binary search, tanpa loop per elemen)
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_zero = (x >> np.uint64(64 - shift)) == 0
+        n[top_zero] += shift
+        x[top_zero] <<= np.uint64(shift)
+    n[x == 0] = 64
+    return n
+
+
+def sparse_threshold(precision):
+    # Batas promosi: set hash (8 byte/hash) lebih besar dari register dense (m byte)
+    return (1 << precision) // 8
+
+
+def hash_invoices(values):
+    # Hash kanonik: nilai unik di-hash sebagai teks, lalu disebar ke semua baris
+    codes, uniques = pd.factorize(values)
+    hashed = pd.util.hash_array(np.asarray(uniques.astype(str), dtype=object))
+    return hashed[codes]
+
+
+def _register_values(p, hashes):
+    bucket = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    rest = hashes << np.uint64(p)
+    rho = np.minimum(_leading_zeros(rest), 64 - p) + 1
+    return bucket, rho.astype(np.uint8)
+
+
+class HLLSketches:
+    def __init__(self, precision, sparse_index=None, offsets=None, hashes=None,
+                 dense_index=None, registers=None):
+        self.p = precision
+        self.m = 1 << precision
+        empty = pd.Index([], dtype='int32', name='Customer ID')
+        self.sparse_index = sparse_index if sparse_index is not None else empty
+        self.offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self.hashes = hashes if hashes is not None else np.empty(0, dtype=np.uint64)
+        self.dense_index = dense_index if dense_index is not None else empty
+        if registers is None:
+            registers = np.zeros((len(self.dense_index), self.m), dtype=np.uint8)
+        self.registers = registers
+
+    @property
+    def index(self):
+        return self.sparse_index.union(self.dense_index)
+
+    @classmethod
+    def from_transactions(cls, df, error=0.05, key='Customer ID', value='Invoice'):
+        p = precision_for_error(error)
+        return cls._build(p, df[key].to_numpy(), hash_invoices(df[value]))
+
+    @classmethod
+    def _build(cls, p, customers, hashes, dense_customers=None, dense_registers=None):
+        # customers/hashes: pasangan (pelanggan, hash invoice), boleh duplikat.
+        # dense_customers/dense_registers: baris register yang sudah ada (boleh duplikat)
+        m = 1 << p
+        order = np.lexsort((hashes, customers))
+        customers, hashes = customers[order], hashes[order]
+        keep = np.ones(len(customers), dtype=bool)
+        keep[1:] = (customers[1:] != customers[:-1]) | (hashes[1:] != hashes[:-1])
+        customers, hashes = customers[keep], hashes[keep]
+
+        ids, counts = np.unique(customers, return_counts=True)
+        dense_ids = ids[counts > sparse_threshold(p)]
+        if dense_customers is not None and len(dense_customers):
+            dense_ids = np.union1d(dense_ids, dense_customers)
+        is_dense = np.isin(customers, dense_ids)
+
+        # Sparse: CSR (offsets per pelanggan -> hash terurut)
+        sparse_customers, sparse_hashes = customers[~is_dense], hashes[~is_dense]
+        sparse_ids, sparse_counts = np.unique(sparse_customers, return_counts=True)
+        offsets = np.r_[0, np.cumsum(sparse_counts)].astype(np.int64)
+
+        # Dense: max rho per (pelanggan, bucket) + register yang sudah ada
+        registers = np.zeros((len(dense_ids), m), dtype=np.uint8)
+        if dense_customers is not None and len(dense_customers):
+            rows = np.searchsorted(dense_ids, dense_customers)
+            np.maximum.at(registers, rows, dense_registers)
+        rows = np.searchsorted(dense_ids, customers[is_dense])
+        bucket, rho = _register_values(p, hashes[is_dense])
+        np.maximum.at(registers, (rows, bucket), rho)
+
+        name = 'Customer ID'
+        return cls(p, pd.Index(sparse_ids, name=name), offsets, sparse_hashes,
+                   pd.Index(dense_ids, name=name), registers)
+
+    def _pairs(self):
+        counts = np.diff(self.offsets)
+        return np.repeat(self.sparse_index.to_numpy(), counts), self.hashes
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError(f"Presisi sketch berbeda: p={self.p} vs p={other.p}")
+        (cust_a, hash_a), (cust_b, hash_b) = self._pairs(), other._pairs()
+        dense_ids = np.concatenate([self.dense_index.to_numpy(), other.dense_index.to_numpy()])
+        return HLLSketches._build(self.p, np.concatenate([cust_a, cust_b]), np.concatenate([hash_a, hash_b]),
+                                  dense_ids, np.concatenate([self.registers, other.registers]))
+
+    def estimate(self):
+        m = self.m
+        harmonic = np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)), axis=1)
+        raw = _alpha(m) * m * m / harmonic
+
+        # Koreksi rentang kecil (linear counting) untuk pelanggan dense
+        zeros = np.count_nonzero(self.registers == 0, axis=1)
+        small = (raw <= 2.5 * m) & (zeros > 0)
+        raw[small] = m * np.log(m / zeros[small])
+        dense = pd.Series(np.rint(raw).astype(np.int64), index=self.dense_index)
+        sparse = pd.Series(np.diff(self.offsets), index=self.sparse_index)
+        return pd.concat([sparse, dense]).sort_index().rename('Frequency')
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes + self.hashes.nbytes + self.offsets.nbytes
+
+    def to_arrays(self):
+        return {'p': self.p, 'sparse_index': self.sparse_index.to_numpy(), 'offsets': self.offsets,
+                'hashes': self.hashes, 'dense_index': self.dense_index.to_numpy(),
+                'registers': self.registers}
+
+    @classmethod
+    def from_arrays(cls, data):
+        name = 'Customer ID'
+        return cls(int(data['p']), pd.Index(data['sparse_index'], name=name), data['offsets'],
+                   data['hashes'], pd.Index(data['dense_index'], name=name), data['registers'])
+
+    def save(self, path):
+        np.savez_compressed(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_arrays(data)
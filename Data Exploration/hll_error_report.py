@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from schema import read_transactions
+from hll import HLLSketches, precision_for_error
+
+# Laporan error Frequency mode HLL dibanding mode exact (nunique)
+BATAS_ERROR = [0.20, 0.10, 0.05, 0.02]
+
+
+def run_hll_error_report():
+    print("1. Membaca Data Bersih (online_retail_clean_2)...")
+    try:
+        df = read_transactions('online_retail_clean_2', columns=['Customer ID', 'Invoice'])
+    except FileNotFoundError:
+        print("ERROR: File 'online_retail_clean_2' tidak ditemukan.")
+        return
+
+    exact = df.groupby('Customer ID')['Invoice'].nunique()
+    # Perkiraan memori set invoice exact: 1 key int64 per pasangan (pelanggan, invoice)
+    exact_bytes = int(exact.sum()) * 8
+    print(f"   - {exact.shape[0]} pelanggan, {int(exact.sum())} pasangan (pelanggan, invoice)")
+
+    print("\n2. Error relatif Frequency (HLL vs exact):")
+    print(f"{'Target':>8} {'p':>3} {'Rata2':>8} {'P95':>8} {'Maks':>8} {'Tepat':>7} {'Memori HLL':>12} {'Memori exact':>13}")
+    for error in BATAS_ERROR:
+        sketches = HLLSketches.from_transactions(df, error=error)
+        approx = sketches.estimate().reindex(exact.index)
+        rel = (approx - exact).abs() / exact
+
+        print(f"{error:>8.0%} {precision_for_error(error):>3} {rel.mean():>8.2%} {rel.quantile(0.95):>8.2%} "
+              f"{rel.max():>8.2%} {(approx == exact).mean():>7.1%} "
+              f"{sketches.nbytes / 1024 ** 2:>9.2f} MB {exact_bytes / 1024 ** 2:>10.2f} MB")
+
+    # Cek sifat mergeable: sketch dari dua separuh data == sketch data penuh
+    half = np.arange(len(df)) % 2 == 0
+    merged = HLLSketches.from_transactions(df[half]).merge(HLLSketches.from_transactions(df[~half]))
+    full = HLLSketches.from_transactions(df)
+    same = (np.array_equal(merged.registers, full.registers) and np.array_equal(merged.hashes, full.hashes)
+            and merged.estimate().equals(full.estimate()))
+    print(f"\n3. Merge 2 partisi identik dengan sketch penuh: {same}")
+
+if __name__ == "__main__":
+    run_hll_error_report()
@@ -0,0 +1,41 @@
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_path, write_table
+from rfm_engine import finalize_partial_rfm, load_partial_rfm, merge_partial_rfm
+
+
+def merge_rfm_partials(partial_files, target_date=None):
+    # Gabungkan RFM parsial (dari create_file_rfm.py --partial-file) milik
+    # beberapa file/mesin menjadi satu rfm_data, tanpa membaca invoice lagi.
+    print(f"1. Menggabungkan {len(partial_files)} RFM parsial...")
+    try:
+        merged = load_partial_rfm(partial_files[0])
+        for path in partial_files[1:]:
+            merged = merge_partial_rfm(merged, load_partial_rfm(path))
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        return
+
+    if target_date is not None:
+        target_date = pd.Timestamp(target_date)
+    rfm = finalize_partial_rfm(*merged, target_date)
+
+    # Filter kecil: Memastikan Monetary > 0 (sama seperti create_file_rfm.py)
+    rfm = rfm[rfm['Monetary'] > 0]
+
+    output_file = table_path('rfm_data')
+    write_table(rfm, output_file, index=True)
+    print(f"2. SUKSES! {rfm.shape[0]} pelanggan disimpan ke '{output_file}'.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gabungkan beberapa RFM parsial (HLL) menjadi rfm_data")
+    parser.add_argument('partial_files', nargs='+', help="File .npz dari create_file_rfm.py --partial-file")
+    parser.add_argument('--target-date', default=None,
+                        help="Tanggal patokan Recency (default: 1 hari setelah transaksi terakhir)")
+    args = parser.parse_args()
+    merge_rfm_partials(args.partial_files, args.target_date)
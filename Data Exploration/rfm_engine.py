@@ -0,0 +1,121 @@
+import os
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hll import HLLSketches
+
+# Mesin RFM bersama untuk create_file_rfm.py dan data_exploration.py.
+# Semua agregasi memakai reduksi groupby bawaan pandas (max, nunique, sum)
+# yang berjalan di C, tanpa lambda Python per pelanggan.
+#
+# Frequency punya dua mode:
+# - 'exact' : nunique invoice per pelanggan (butuh set invoice lengkap)
+# - 'hll'   : perkiraan HyperLogLog (memori kecil, bisa di-merge antar partisi)
+FREQUENCY_MODES = ('exact', 'hll')
+
+
+def default_target_date(df):
+    # Tanggal patokan = 1 hari setelah transaksi terakhir di seluruh data
+    return df['InvoiceDate'].max() + dt.timedelta(days=1)
+
+
+def compute_rfm(df, target_date=None, frequency='exact', hll_error=0.05):
+    # Transaksi -> satu baris per pelanggan (index: Customer ID)
+    if frequency not in FREQUENCY_MODES:
+        raise ValueError(f"Mode frequency '{frequency}' tidak dikenal. Pilihan: {FREQUENCY_MODES}")
+    if frequency == 'hll':
+        partial, sketches = compute_partial_rfm(df, hll_error)
+        return finalize_partial_rfm(partial, sketches, target_date)
+
+    if target_date is None:
+        target_date = default_target_date(df)
+
+    grouped = df.groupby('Customer ID')
+    last_purchase = grouped['InvoiceDate'].max()
+
+    return pd.DataFrame({
+        'Recency': (target_date - last_purchase).dt.days,   # Jarak hari beli terakhir
+        'Frequency': grouped['Invoice'].nunique(),          # Jumlah struk unik
+        'Monetary': grouped['TotalAmount'].sum(),           # Total belanja
+    })
+
+
+def partition_by_customer(df, n_partitions):
+    # Hash-partition transaksi per Customer ID: satu pelanggan selalu jatuh ke
+    # partisi yang sama, urutan baris di dalam partisi tetap dipertahankan
+    bucket = pd.util.hash_array(df['Customer ID'].to_numpy()) % np.uint64(n_partitions)
+    return [df.iloc[rows] for rows in pd.Series(bucket).groupby(bucket).indices.values()]
+
+
+def compute_rfm_parallel(df, target_date=None, n_jobs=None):
+    # RFM multi-core: tiap partisi direduksi di proses terpisah dengan
+    # target_date global yang sama, lalu digabung. Hasil identik dengan
+    # compute_rfm karena tiap pelanggan utuh di satu partisi.
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if target_date is None:
+        target_date = default_target_date(df)
+    if n_jobs <= 1:
+        return compute_rfm(df, target_date)
+
+    parts = partition_by_customer(df, n_jobs)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(parts))) as pool:
+        results = list(pool.map(compute_rfm, parts, [target_date] * len(parts)))
+    return pd.concat(results).sort_index()
+
+
+# --- RFM parsial (mode HLL) ---
+# Hasil per file/mesin: LastPurchase & Monetary per pelanggan + sketch HLL
+# invoice. Beberapa parsial bisa digabung tanpa kembali ke data invoice mentah.
+
+def compute_partial_rfm(df, hll_error=0.05):
+    grouped = df.groupby('Customer ID')
+    partial = pd.DataFrame({
+        'LastPurchase': grouped['InvoiceDate'].max(),
+        'Monetary': grouped['TotalAmount'].sum(),
+    })
+    return partial, HLLSketches.from_transactions(df, error=hll_error)
+
+
+def merge_partial_rfm(left, right):
+    (part_a, sketch_a), (part_b, sketch_b) = left, right
+    both = pd.concat([part_a, part_b])
+    grouped = both.groupby(level=0)
+    partial = pd.DataFrame({
+        'LastPurchase': grouped['LastPurchase'].max(),
+        'Monetary': grouped['Monetary'].sum(),
+    })
+    return partial, sketch_a.merge(sketch_b)
+
+
+def finalize_partial_rfm(partial, sketches, target_date=None):
+    if target_date is None:
+        target_date = partial['LastPurchase'].max() + dt.timedelta(days=1)
+    return pd.DataFrame({
+        'Recency': (target_date - partial['LastPurchase']).dt.days,
+        'Frequency': sketches.estimate().reindex(partial.index),
+        'Monetary': partial['Monetary'],
+    })
+
+
+def save_partial_rfm(partial, sketches, path):
+    # Satu file .npz: cukup kecil untuk dikirim antar mesin
+    np.savez_compressed(
+        path,
+        customer_id=partial.index.to_numpy(),
+        last_purchase=partial['LastPurchase'].to_numpy().astype('datetime64[ns]').view('int64'),
+        monetary=partial['Monetary'].to_numpy(),
+        **sketches.to_arrays(),
+    )
+
+
+def load_partial_rfm(path):
+    with np.load(path) as data:
+        partial = pd.DataFrame({
+            'LastPurchase': data['last_purchase'].view('datetime64[ns]'),
+            'Monetary': data['monetary'],
+        }, index=pd.Index(data['customer_id'], name='Customer ID'))
+        sketches = HLLSketches.from_arrays(data)
+    return partial, sketches
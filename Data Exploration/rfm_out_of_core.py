@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_columns
+from schema import iter_transactions
+from rfm_engine import compute_rfm
+
+# RFM out-of-core: file transaksi dibaca per chunk, baris-barisnya di-spill ke
+# N bucket di disk berdasarkan hash(Customer ID), lalu tiap bucket direduksi
+# sendiri-sendiri. Memori puncak ~ bucket terbesar + 1 chunk, bukan seluruh data.
+#
+# Tiap bucket = 4 file biner kolom (append .tofile), tanpa parsing teks,
+# sehingga nilai float/tanggal kembali persis sama seperti aslinya.
+KOLOM_SPILL = {
+    'Customer ID': 'int32',
+    'Invoice': 'int64',
+    'InvoiceDate': 'int64',   # datetime64[ns] sebagai epoch
+    'TotalAmount': 'float64',
+}
+
+
+def _spill_arrays(chunk):
+    invoice = chunk['Invoice']
+    if pd.api.types.is_integer_dtype(invoice):
+        invoice = invoice.to_numpy().astype('int64')
+    else:
+        # Ada invoice non-angka di chunk ini: invoice angka tetap pakai nilainya
+        # (konsisten dengan chunk lain), sisanya cukup hash 64-bit bertanda negatif
+        # karena yang dihitung hanya nunique
+        numeric = pd.to_numeric(invoice.astype(str), errors='coerce')
+        hashed = pd.util.hash_pandas_object(invoice.astype(str), index=False).to_numpy()
+        hashed = (hashed | np.uint64(1 << 63)).view('int64')
+        invoice = np.where(numeric.notna(), numeric.fillna(0).to_numpy().astype('int64'), hashed)
+    return {
+        'Customer ID': chunk['Customer ID'].to_numpy().astype('int32'),
+        'Invoice': invoice,
+        'InvoiceDate': chunk['InvoiceDate'].to_numpy().astype('datetime64[ns]').view('int64'),
+        'TotalAmount': chunk['TotalAmount'].to_numpy().astype('float64'),
+    }
+
+
+def _bucket_file(spill_dir, bucket, col):
+    return os.path.join(spill_dir, f"bucket_{bucket:04d}_{col.replace(' ', '_')}.bin")
+
+
+def _read_bucket(spill_dir, bucket):
+    data = {}
+    for col, dtype in KOLOM_SPILL.items():
+        path = _bucket_file(spill_dir, bucket, col)
+        data[col] = np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype)
+    data['InvoiceDate'] = data['InvoiceDate'].view('datetime64[ns]')
+    return pd.DataFrame(data)
+
+
+def compute_rfm_out_of_core(name, n_buckets=16, chunksize=500_000, spill_dir=None):
+    has_total = 'TotalAmount' in table_columns(name)
+    columns = ['Customer ID', 'Invoice', 'InvoiceDate']
+    columns += ['TotalAmount'] if has_total else ['Quantity', 'Price']
+
+    with tempfile.TemporaryDirectory(prefix='rfm_spill_', dir=spill_dir) as tmp:
+        # --- Tahap 1: streaming + spill ke bucket ---
+        max_date = None
+        rows = 0
+        for chunk in iter_transactions(name, columns=columns, chunksize=chunksize):
+            if not has_total:
+                chunk = chunk.assign(TotalAmount=chunk['Quantity'] * chunk['Price'])
+            rows += len(chunk)
+
+            chunk_max = chunk['InvoiceDate'].max()
+            if max_date is None or chunk_max > max_date:
+                max_date = chunk_max
+
+            arrays = _spill_arrays(chunk)
+            bucket = pd.util.hash_array(arrays['Customer ID']) % np.uint64(n_buckets)
+            for b, idx in pd.Series(bucket).groupby(bucket).indices.items():
+                for col in KOLOM_SPILL:
+                    with open(_bucket_file(tmp, int(b), col), 'ab') as f:
+                        arrays[col][idx].tofile(f)
+
+        print(f"   - {rows} baris di-spill ke {n_buckets} bucket")
+        if max_date is None:
+            return compute_rfm(_read_bucket(tmp, 0))
+
+        # --- Tahap 2: reduksi per bucket dengan target_date global ---
+        target_date = max_date + dt.timedelta(days=1)
+        results = []
+        largest = 0
+        for b in range(n_buckets):
+            df_bucket = _read_bucket(tmp, b)
+            largest = max(largest, len(df_bucket))
+            if len(df_bucket):
+                results.append(compute_rfm(df_bucket, target_date))
+        print(f"   - Bucket terbesar: {largest} baris")
+
+    rfm = pd.concat(results).sort_index()
+    rfm.index = rfm.index.rename('Customer ID')
+    return rfm
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import format_of, table_columns, table_path, write_table, TableWriter
+from schema import read_transactions
+from snapshots import SNAPSHOT_COLUMN
+from rfm_engine import default_target_date
+from instrument import stage, step
+
+# RFM per akhir bulan (untuk melihat perpindahan segmen dari waktu ke waktu)
+# tanpa menghitung ulang histori untuk setiap tanggal:
+# 1. transaksi diurutkan SEKALI per InvoiceDate, Customer ID di-factorize ke
+#    kode 0..n-1 (array numpy, bukan groupby per snapshot)
+# 2. sweep maju: untuk tiap cutoff hanya transaksi di antara cutoff
+#    sebelumnya dan cutoff ini yang ditambahkan ke state per pelanggan
+#    (LastPurchase = max, Frequency += invoice baru, Monetary += belanja)
+# 3. tiap cutoff menghasilkan tabel RFM seperti create_file_rfm.py dengan
+#    target_date = cutoff (transaksi SEBELUM cutoff saja)
+# Snapshot "akhir bulan X" = target_date tanggal 1 bulan berikutnya; snapshot
+# terakhir = default_target_date (sama dengan rfm_data; Monetary bisa beda di
+# digit float terakhir karena urutan penjumlahan berbeda dari groupby).
+# Output format panjang: SnapshotDate, Customer ID, Recency, Frequency, Monetary
+HARI_NS = 24 * 3600 * 10**9
+
+
+def month_end_cutoffs(df, include_latest=True):
+    first, last = df['InvoiceDate'].min(), df['InvoiceDate'].max()
+    cutoffs = list(pd.date_range(first.normalize() + pd.offsets.MonthBegin(1), last, freq='MS'))
+    if include_latest:
+        cutoffs.append(default_target_date(df))
+    return cutoffs
+
+
+def _to_ns(values):
+    return np.asarray(values).astype('datetime64[ns]').view('int64')
+
+
+def iter_rfm_snapshots(df, cutoffs):
+    # Generator (cutoff, rfm) untuk cutoff yang sudah terurut naik
+    order = np.argsort(_to_ns(df['InvoiceDate']), kind='stable')
+    dates = _to_ns(df['InvoiceDate'])[order]
+    # sort=True: pelanggan terurut per ID, sama dengan index hasil groupby
+    codes, customers = pd.factorize(df['Customer ID'].to_numpy()[order], sort=True)
+    invoices, _ = pd.factorize(df['Invoice'].to_numpy()[order])
+    amounts = df['TotalAmount'].to_numpy('float64')[order]
+    # Invoice dihitung sekali, pada baris pertamanya (paling awal)
+    first_row = ~pd.Series(codes.astype('int64') * (invoices.max() + 1) + invoices).duplicated().to_numpy()
+
+    n = len(customers)
+    last_purchase = np.full(n, np.iinfo('int64').min)
+    frequency = np.zeros(n, dtype='int64')
+    monetary = np.zeros(n, dtype='float64')
+
+    bounds = np.searchsorted(dates, _to_ns(pd.DatetimeIndex(cutoffs)), side='left')
+    start = 0
+    for cutoff, end in zip(cutoffs, bounds):
+        segment = slice(start, end)
+        seg_codes = codes[segment]
+        # Update inkremental: hanya transaksi baru sejak cutoff sebelumnya
+        np.maximum.at(last_purchase, seg_codes, dates[segment])
+        frequency += np.bincount(seg_codes, weights=first_row[segment], minlength=n).astype('int64')
+        monetary += np.bincount(seg_codes, weights=amounts[segment], minlength=n)
+        start = max(start, end)
+
+        active = np.flatnonzero(frequency > 0)
+        rfm = pd.DataFrame({
+            'Recency': (_to_ns([cutoff])[0] - last_purchase[active]) // HARI_NS,
+            'Frequency': frequency[active],
+            'Monetary': monetary[active],
+        }, index=pd.Index(customers[active], name='Customer ID'))
+        yield cutoff, rfm
+
+
+def make_rfm_snapshots(input_name='online_retail_clean_2', output_file=None, cutoffs=None,
+                       include_latest=True):
+    output_file = output_file or table_path('rfm_snapshots')
+    print(f"1. Membaca Data Bersih ({input_name})...")
+    try:
+        columns = ['Customer ID', 'Invoice', 'InvoiceDate', 'TotalAmount']
+        has_total = 'TotalAmount' in table_columns(input_name)
+        if not has_total:
+            columns = columns[:3] + ['Quantity', 'Price']
+        with step('read') as s:
+            df = read_transactions(input_name, columns=columns)
+            s.rows_out = len(df)
+        if not has_total:
+            df['TotalAmount'] = df['Quantity'] * df['Price']
+    except FileNotFoundError:
+        print(f"ERROR: File '{input_name}' tidak ditemukan.")
+        return
+
+    if cutoffs:
+        cutoffs = sorted(pd.Timestamp(c) for c in cutoffs)
+    else:
+        cutoffs = month_end_cutoffs(df, include_latest)
+    print(f"2. Sweep {len(cutoffs)} snapshot ({cutoffs[0]:%Y-%m-%d} s/d {cutoffs[-1]:%Y-%m-%d}), "
+          f"transaksi diurutkan sekali...")
+
+    start = time.perf_counter()
+    n_rows = 0
+    # Feather tidak bisa ditulis per bagian: snapshot dikumpulkan dulu
+    writer = TableWriter(output_file) if format_of(output_file) != 'feather' else None
+    parts = []
+    with step('sweep', rows_in=len(df)) as s:
+        for cutoff, rfm in iter_rfm_snapshots(df, cutoffs):
+            # Filter sama dengan create_file_rfm.py: Monetary > 0
+            rfm = rfm[rfm['Monetary'] > 0]
+            snapshot = rfm.reset_index()
+            # Label = tanggal cutoff saja (jam snapshot terakhir hanya dipakai untuk Recency)
+            snapshot.insert(0, SNAPSHOT_COLUMN, cutoff.normalize())
+            if writer is not None:
+                writer.write(snapshot)
+            else:
+                parts.append(snapshot)
+            n_rows += len(snapshot)
+            print(f"   - {cutoff:%Y-%m-%d}: {len(rfm):>7} pelanggan")
+        s.rows_out = n_rows
+        s.note(snapshots=len(cutoffs))
+    if writer is not None:
+        writer.close()
+    else:
+        with step('write', rows_in=n_rows):
+            write_table(pd.concat(parts, ignore_index=True), output_file)
+
+    print(f"\n3. SUKSES! {n_rows} baris ({len(cutoffs)} snapshot) dalam "
+          f"{time.perf_counter() - start:.3f} s, disimpan ke '{output_file}'")
+    print("   Pakai satu snapshot di tahap berikutnya, contoh:")
+    print(f"   python feature_engginering.py --input rfm_snapshots --snapshot {cutoffs[-1]:%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RFM per akhir bulan (format panjang) dalam satu sweep terurut")
+    parser.add_argument('--input', default='online_retail_clean_2', help="Tabel transaksi bersih")
+    parser.add_argument('--output', default=None, help="File snapshot (default: rfm_snapshots)")
+    parser.add_argument('--dates', nargs='+', default=None,
+                        help="Tanggal snapshot (target_date) sendiri, contoh: 2011-01-01 2011-07-01")
+    parser.add_argument('--no-latest', action='store_true',
+                        help="Tanpa snapshot terakhir (1 hari setelah transaksi terakhir)")
+    args = parser.parse_args()
+    with stage('rfm_snapshots'):
+        make_rfm_snapshots(args.input, args.output, args.dates, include_latest=not args.no_latest)
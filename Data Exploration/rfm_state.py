@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import find_table, format_of, read_table, table_path, write_table
+from schema import apply_schema
+from hll import hash_invoices
+
+# State RFM per pelanggan yang disimpan di disk, supaya transaksi harian
+# cukup di-update ke state tanpa menghitung ulang seluruh histori:
+# - customers    : LastPurchase, Frequency (invoice unik), Monetary (total belanja)
+# - invoice_keys : hash 64-bit (Customer ID, Invoice) yang sudah pernah dihitung,
+#                  untuk memastikan Frequency tetap "invoice unik"
+# Penyimpanan append-only, biaya harian sebanding dengan ukuran batch:
+# - key invoice baru per batch = satu run terurut (keys_<n>.npy); run lama
+#   hanya di-probe lewat searchsorted (memmap), tidak disalin ulang
+# - hanya baris pelanggan yang tersentuh batch ditulis (customers_delta_<n>)
+# - setelah COMPACT_SETIAP batch, base + delta + run digabung sekali
+#   (customers, invoice_keys.npy). Daftar file ada di manifest.json.
+# Key di-hash dari teks (hll.hash_invoices), jadi Invoice int32 maupun category
+# menghasilkan key sama. Versi hash dicatat di manifest (KEY_HASH): state
+# dengan hash lain harus dibangun ulang, bukan dicampur.
+STATE_COLUMNS = ['LastPurchase', 'Frequency', 'Monetary']
+COMPACT_SETIAP = 30
+MANIFEST = 'manifest.json'
+KEY_HASH = 'text-v1'
+# Pengali (golden ratio 64-bit) untuk menggabungkan hash Customer ID & Invoice
+PENGALI_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _invoice_keys(df):
+    customer = hash_invoices(df['Customer ID'])
+    invoice = hash_invoices(df['Invoice'])
+    return (customer * PENGALI_HASH) ^ invoice
+
+
+class RFMState:
+    def __init__(self, customers=None, key_runs=None):
+        if customers is None:
+            customers = pd.DataFrame({
+                'LastPurchase': pd.Series(dtype='datetime64[ns]'),
+                'Frequency': pd.Series(dtype='int64'),
+                'Monetary': pd.Series(dtype='float64'),
+            }, index=pd.Index([], dtype='int32', name='Customer ID'))
+        self.customers = customers
+        # Run key invoice terurut (disjoint satu sama lain)
+        self.key_runs = list(key_runs or [])
+        # Perubahan sejak save() terakhir
+        self._touched = pd.Index([], dtype='int32', name='Customer ID')
+        self._new_runs = []
+
+    @property
+    def n_invoice_keys(self):
+        return sum(len(run) for run in self.key_runs)
+
+    @classmethod
+    def from_transactions(cls, df):
+        state = cls()
+        state.update(df)
+        return state
+
+    def _seen(self, keys):
+        seen = np.zeros(len(keys), dtype=bool)
+        for run in self.key_runs:
+            pos = np.searchsorted(run, keys)
+            inside = pos < len(run)
+            seen[inside] |= run[pos[inside]] == keys[inside]
+        return seen
+
+    def update(self, batch):
+        # Update hanya pelanggan yang muncul di batch. Biaya sebanding dengan
+        # ukuran batch (+ probe searchsorted ke run key yang sudah ada).
+        batch = apply_schema(batch)
+        keys = _invoice_keys(batch)
+
+        # Invoice baru = kemunculan pertama di batch DAN belum ada di state
+        first_in_batch = ~pd.Series(keys).duplicated().to_numpy()
+        is_new_invoice = first_in_batch & ~self._seen(keys)
+
+        grouped = batch.assign(_new_invoice=is_new_invoice).groupby('Customer ID')
+        delta = pd.DataFrame({
+            'LastPurchase': grouped['InvoiceDate'].max(),
+            'Frequency': grouped['_new_invoice'].sum().astype('int64'),
+            'Monetary': grouped['TotalAmount'].sum(),
+        })
+
+        current = self.customers.reindex(delta.index)
+        merged = pd.DataFrame({
+            'LastPurchase': current['LastPurchase'].where(
+                current['LastPurchase'] > delta['LastPurchase'], delta['LastPurchase']),
+            'Frequency': current['Frequency'].fillna(0).astype('int64') + delta['Frequency'],
+            'Monetary': current['Monetary'].fillna(0.0) + delta['Monetary'],
+        })
+
+        is_existing = delta.index.isin(self.customers.index)
+        existing = merged[is_existing]
+        self.customers.loc[existing.index, STATE_COLUMNS] = existing[STATE_COLUMNS]
+        if (~is_existing).any():
+            self.customers = pd.concat([self.customers, merged[~is_existing]])
+
+        # Key baru = run terurut baru (run lama tidak disentuh)
+        new_keys = np.unique(keys[is_new_invoice])
+        if len(new_keys):
+            self.key_runs.append(new_keys)
+            self._new_runs.append(new_keys)
+        self._touched = self._touched.union(delta.index)
+        return int(len(delta)), int(is_new_invoice.sum())
+
+    def default_target_date(self):
+        return self.customers['LastPurchase'].max() + dt.timedelta(days=1)
+
+    def snapshot(self, target_date=None):
+        # Tabel RFM per target_date, dihitung dari state saja (tanpa histori)
+        if target_date is None:
+            target_date = self.default_target_date()
+        rfm = pd.DataFrame({
+            'Recency': (pd.Timestamp(target_date) - self.customers['LastPurchase']).dt.days,
+            'Frequency': self.customers['Frequency'],
+            'Monetary': self.customers['Monetary'],
+        })
+        return rfm.sort_index()
+
+    def save(self, state_dir):
+        manifest = _read_manifest(state_dir)
+        if manifest is None or len(manifest['deltas']) + 1 >= COMPACT_SETIAP:
+            self.compact(state_dir, manifest)
+        else:
+            # Append-only: hanya pelanggan tersentuh + run key baru batch ini
+            n = manifest['next']
+            if len(self._touched):
+                stem = f'customers_delta_{n:05d}'
+                write_table(self.customers.loc[self._touched],
+                            table_path(os.path.join(state_dir, stem)), index=True)
+                manifest['deltas'].append(stem)
+            for run in self._new_runs:
+                name = f'keys_{n:05d}_{len(manifest["key_runs"]):03d}.npy'
+                np.save(os.path.join(state_dir, name), run)
+                manifest['key_runs'].append(name)
+            manifest['next'] = n + 1
+            _write_manifest(state_dir, manifest)
+        self._touched = self._touched[:0]
+        self._new_runs = []
+
+    def compact(self, state_dir, manifest=None):
+        # Tulis ulang base penuh (sesekali), lalu hapus delta & run lama
+        os.makedirs(state_dir, exist_ok=True)
+        write_table(self.customers.sort_index(), table_path(os.path.join(state_dir, 'customers')), index=True)
+        keys = np.sort(np.concatenate(self.key_runs)) if self.key_runs else np.empty(0, dtype='uint64')
+        np.save(os.path.join(state_dir, 'invoice_keys.npy'), keys)
+        _write_manifest(state_dir, {'deltas': [], 'key_runs': [], 'key_hash': KEY_HASH,
+                                    'next': (manifest or {}).get('next', 0) + 1})
+        for stem in (manifest or {}).get('deltas', []):
+            os.remove(find_table(os.path.join(state_dir, stem)))
+        for name in (manifest or {}).get('key_runs', []):
+            os.remove(os.path.join(state_dir, name))
+        self.key_runs = [np.load(os.path.join(state_dir, 'invoice_keys.npy'), mmap_mode='r')]
+
+    @classmethod
+    def load(cls, state_dir):
+        manifest = _read_manifest(state_dir)
+        if manifest is None:
+            # Folder ada tapi state belum pernah disimpan -> state kosong.
+            # Base tanpa manifest = format lama (hash key berbeda).
+            try:
+                find_table(os.path.join(state_dir, 'customers'))
+            except FileNotFoundError:
+                return cls()
+            raise ValueError(f"State '{state_dir}' memakai format lama tanpa manifest, bangun ulang state.")
+        if manifest.get('key_hash') != KEY_HASH:
+            raise ValueError(f"State '{state_dir}' memakai hash key '{manifest.get('key_hash')}' "
+                             f"(butuh '{KEY_HASH}'), bangun ulang state.")
+        customers = _read_customers(os.path.join(state_dir, 'customers'))
+        if manifest['deltas']:
+            # Delta berisi nilai terbaru pelanggan tersentuh: baris terakhir menang
+            parts = [customers] + [_read_customers(os.path.join(state_dir, stem)) for stem in manifest['deltas']]
+            customers = pd.concat(parts)
+            customers = customers[~customers.index.duplicated(keep='last')]
+        key_runs = [np.load(os.path.join(state_dir, 'invoice_keys.npy'), mmap_mode='r')]
+        key_runs += [np.load(os.path.join(state_dir, name), mmap_mode='r') for name in manifest['key_runs']]
+        return cls(customers, [run for run in key_runs if len(run)])
+
+
+def _read_customers(stem):
+    path = find_table(stem)
+    parse_dates = ['LastPurchase'] if format_of(path) == 'csv' else None
+    customers = read_table(path, index_col='Customer ID', parse_dates=parse_dates)
+    customers.index = customers.index.astype('int32')
+    customers['LastPurchase'] = customers['LastPurchase'].astype('datetime64[ns]')
+    return customers
+
+
+def _read_manifest(state_dir):
+    # None = state belum pernah disimpan (atau format lama tanpa manifest)
+    try:
+        with open(os.path.join(state_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(state_dir, manifest):
+    # Ditulis ke file sementara lalu di-rename: manifest tidak pernah setengah jadi
+    path = os.path.join(state_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.replace(path + '.tmp', path)
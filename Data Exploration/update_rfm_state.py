@@ -0,0 +1,56 @@
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_path, write_table
+from schema import read_transactions
+from rfm_state import RFMState
+
+
+def update_rfm_state(batch_file, state_dir='rfm_state', target_date=None):
+    # Job harian: tambahkan transaksi baru (sudah dibersihkan) ke state RFM,
+    # lalu tulis ulang rfm_data dari state tanpa membaca seluruh histori.
+    print(f"1. Membaca batch transaksi baru ({batch_file})...")
+    try:
+        batch = read_transactions(batch_file,
+                                  columns=['Customer ID', 'Invoice', 'InvoiceDate', 'TotalAmount'])
+    except FileNotFoundError:
+        print(f"ERROR: File '{batch_file}' tidak ditemukan.")
+        return
+    print(f"   - {batch.shape[0]} baris transaksi baru")
+
+    if os.path.isdir(state_dir):
+        print(f"2. Memuat state RFM dari '{state_dir}'...")
+        state = RFMState.load(state_dir)
+    else:
+        print(f"2. State '{state_dir}' belum ada, membuat state baru...")
+        state = RFMState()
+    print(f"   - State berisi {state.customers.shape[0]} pelanggan")
+
+    touched, new_invoices = state.update(batch)
+    state.save(state_dir)
+    print(f"   - Diupdate: {touched} pelanggan, {new_invoices} invoice baru")
+
+    print("3. Menghitung RFM dari state...")
+    if target_date is not None:
+        target_date = pd.Timestamp(target_date)
+    rfm = state.snapshot(target_date)
+
+    # Filter kecil: Memastikan Monetary > 0 (sama seperti create_file_rfm.py)
+    rfm = rfm[rfm['Monetary'] > 0]
+
+    output_file = table_path('rfm_data')
+    write_table(rfm, output_file, index=True)
+    print(f"\n   SUKSES! {rfm.shape[0]} pelanggan disimpan ke '{output_file}'.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update state RFM dengan batch transaksi harian")
+    parser.add_argument('batch_file', help="File transaksi baru yang sudah dibersihkan")
+    parser.add_argument('--state-dir', default='rfm_state', help="Folder state RFM")
+    parser.add_argument('--target-date', default=None,
+                        help="Tanggal patokan Recency (default: 1 hari setelah transaksi terakhir)")
+    args = parser.parse_args()
+    update_rfm_state(args.batch_file, args.state_dir, args.target_date)
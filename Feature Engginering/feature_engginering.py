@@ -1,21 +1,28 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
+import os
+import sys
+import argparse
 
-# Setting tampilan grafik
-sns.set(style="whitegrid")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import table_path, write_table
+from feature_transform import ARTIFACT_FILE, RFMTransform
+from distribution import CACHE_DIR_DEFAULT, DistributionCache, plot_distribution
+from instrument import stage, step
+from snapshots import read_rfm
 
-def run_feature_engineering():
-    print("1. Membaca file 'rfm_data.csv'...")
+def run_feature_engineering(input_name='rfm_data', output_file=None, transform_file=ARTIFACT_FILE,
+                            chart_file='grafik_perbandingan_feature.png', snapshot_date=None):
+    print(f"1. Membaca file '{input_name}'...")
     try:
-        rfm = pd.read_csv('rfm_data.csv')
-        # Jadikan Customer ID sebagai Index (agar tidak ikut dihitung rumusnya)
-        if 'Customer ID' in rfm.columns:
-            rfm.set_index('Customer ID', inplace=True)
+        with step('read') as s:
+            # Customer ID dijadikan Index (agar tidak ikut dihitung rumusnya);
+            # rfm_snapshots: hanya satu SnapshotDate yang dipakai (default: terakhir)
+            rfm = read_rfm(input_name, snapshot_date)
+            s.rows_out = len(rfm)
     except FileNotFoundError:
-        print("ERROR: File 'rfm_data.csv' belum ada. Jalankan kode langkah sebelumnya dulu.")
+        print(f"ERROR: File '{input_name}' belum ada. Jalankan kode langkah sebelumnya dulu.")
+        return
+    except ValueError as e:
+        print(f"ERROR: {e}")
         return
 
     print("   Data dimuat. Melakukan transformasi...")
@@ -23,44 +30,71 @@ def run_feature_engineering():
     # --- LANGKAH A: Log Transformation ---
     # Mengatasi masalah skewness (data miring)
     # Kita pakai log1p (logaritma x + 1) untuk antisipasi jika ada angka 0
-    rfm_log = np.log1p(rfm)
-
     # --- LANGKAH B: Scaling (StandardScaler) ---
     # Menyamakan skala data (Mean=0, Std=1) agar K-Means adil
-    scaler = StandardScaler()
-    rfm_scaled_matrix = scaler.fit_transform(rfm_log)
-    
-    # Kembalikan ke bentuk Tabel (DataFrame) dengan nama kolom yang benar
-    rfm_scaled = pd.DataFrame(rfm_scaled_matrix, index=rfm.index, columns=rfm.columns)
+    # Keduanya di-fit SEKALI di sini lalu disimpan sebagai artifact, supaya
+    # PCA, snake plot & scoring pelanggan baru memakai parameter yang sama
+    with step('scaling', rows_in=len(rfm)) as s:
+        transform = RFMTransform.fit(rfm)
+        transform.save(transform_file)
+        print(f"   Transformasi disimpan ke '{transform_file}' (fingerprint {transform.fingerprint})")
+
+        rfm_scaled = transform.transform(rfm)
+        s.rows_out = len(rfm_scaled)
 
     print("   Data berhasil di-transformasi.")
 
     # --- LANGKAH C: Visualisasi Before vs After (PENTING BUAT PPT) ---
-    print("2. Membuat grafik perbandingan...")
+    # chart_file=None: lewati grafik (matplotlib/seaborn tidak di-import sama sekali)
+    if chart_file:
+        print("2. Membuat grafik perbandingan...")
+        with step('chart'):
+            plot_comparison(rfm, rfm_scaled, chart_file)
+        print(f"   Grafik disimpan: '{chart_file}'")
+
+    # --- LANGKAH D: Simpan Data Siap Model ---
+    output_file = output_file or table_path('rfm_siap_model')
+    with step('write', rows_in=len(rfm_scaled)):
+        write_table(rfm_scaled, output_file, index=True)
+    print(f"\n3. SELESAI! Data siap modeling disimpan ke '{output_file}'")
     
+    print("\nContoh 5 baris data yang sudah di-scale:")
+    print(rfm_scaled.head())
+
+
+def plot_comparison(rfm, rfm_scaled, chart_file):
+    # Library grafik baru di-import saat grafik memang dibuat
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Setting tampilan grafik
+    sns.set(style="whitegrid")
+
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+    # Histogram + KDE dihitung sekali per kolom (KDE binned/FFT) dan di-cache
+    dist = DistributionCache(CACHE_DIR_DEFAULT)
     
     # Baris 1: SEBELUM (Data Asli)
-    sns.histplot(rfm['Recency'], ax=axes[0, 0], kde=True, color='red').set_title('SEBELUM: Recency (Miring)')
-    sns.histplot(rfm['Frequency'], ax=axes[0, 1], kde=True, color='red').set_title('SEBELUM: Frequency (Miring)')
-    sns.histplot(rfm['Monetary'], ax=axes[0, 2], kde=True, color='red').set_title('SEBELUM: Monetary (Miring)')
+    plot_distribution(axes[0, 0], dist.get(rfm['Recency']), 'red', 'Recency').set_title('SEBELUM: Recency (Miring)')
+    plot_distribution(axes[0, 1], dist.get(rfm['Frequency']), 'red', 'Frequency').set_title('SEBELUM: Frequency (Miring)')
+    plot_distribution(axes[0, 2], dist.get(rfm['Monetary']), 'red', 'Monetary').set_title('SEBELUM: Monetary (Miring)')
 
     # Baris 2: SESUDAH (Data Log + Scaled)
-    sns.histplot(rfm_scaled['Recency'], ax=axes[1, 0], kde=True, color='blue').set_title('SESUDAH: Recency (Normal)')
-    sns.histplot(rfm_scaled['Frequency'], ax=axes[1, 1], kde=True, color='blue').set_title('SESUDAH: Frequency (Normal)')
-    sns.histplot(rfm_scaled['Monetary'], ax=axes[1, 2], kde=True, color='blue').set_title('SESUDAH: Monetary (Normal)')
+    plot_distribution(axes[1, 0], dist.get(rfm_scaled['Recency']), 'blue', 'Recency').set_title('SESUDAH: Recency (Normal)')
+    plot_distribution(axes[1, 1], dist.get(rfm_scaled['Frequency']), 'blue', 'Frequency').set_title('SESUDAH: Frequency (Normal)')
+    plot_distribution(axes[1, 2], dist.get(rfm_scaled['Monetary']), 'blue', 'Monetary').set_title('SESUDAH: Monetary (Normal)')
 
     plt.tight_layout()
-    plt.savefig('grafik_perbandingan_feature.png')
-    print("   Grafik disimpan: 'grafik_perbandingan_feature.png'")
-
-    # --- LANGKAH D: Simpan Data Siap Model ---
-    output_file = 'rfm_siap_model.csv'
-    rfm_scaled.to_csv(output_file)
-    print(f"\n3. SELESAI! Data siap modeling disimpan ke '{output_file}'")
-    
-    print("\nContoh 5 baris data yang sudah di-scale:")
-    print(rfm_scaled.head())
+    plt.savefig(chart_file)
+    plt.close(fig)
 
 if __name__ == "__main__":
-    run_feature_engineering()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Log + scaling rfm_data menjadi rfm_siap_model")
+    parser.add_argument('--no-charts', action='store_true', help="Lewati grafik perbandingan")
+    parser.add_argument('--input', default='rfm_data', help="Tabel RFM atau rfm_snapshots")
+    parser.add_argument('--snapshot', default=None,
+                        help="Tanggal snapshot jika input rfm_snapshots (default: snapshot terakhir)")
+    args = parser.parse_args()
+    with stage('features'):
+        run_feature_engineering(args.input, chart_file=None if args.no_charts else 'grafik_perbandingan_feature.png',
+                                snapshot_date=args.snapshot)
\ No newline at end of file
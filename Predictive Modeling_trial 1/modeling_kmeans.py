@@ -1,38 +1,45 @@
+import os
+import sys
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.cluster import KMeans
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import read_table, table_path, write_table
+from kmeans_sweep import sweep_kmeans
+from clustering import BACKENDS
+from instrument import stage
 
 # Setting gaya grafik
 sns.set(style="whitegrid")
 
-def run_modeling():
+def run_modeling(n_jobs=0, backend='full', coreset_size=5_000):
     print("1. Membaca Data...")
     try:
         # Load data yang sudah di-scaling (untuk dimakan algoritma)
-        df_scaled = pd.read_csv('rfm_siap_model.csv', index_col=0)
+        df_scaled = read_table('rfm_siap_model', index_col=0)
         
         # Load data RFM asli (untuk ditempel hasil labelnya nanti)
         # Kita butuh angka aslinya (Rupiah/Dollar) biar bisa dibaca manusia
-        df_original = pd.read_csv('rfm_data.csv')
+        df_original = read_table('rfm_data')
         if 'Customer ID' in df_original.columns:
             df_original.set_index('Customer ID', inplace=True)
             
     except FileNotFoundError:
-        print("ERROR: File tidak ditemukan. Pastikan 'rfm_siap_model.csv' dan 'rfm_data.csv' ada.")
+        print("ERROR: File tidak ditemukan. Pastikan 'rfm_siap_model' dan 'rfm_data' ada.")
         return
 
     print("   Data siap. Dimensi: ", df_scaled.shape)
 
     # --- BAGIAN A: ELBOW METHOD (Mencari Jumlah Cluster Optimal) ---
     print("\n2. Menjalankan Elbow Method (Tunggu sebentar)...")
-    inertia = []
     k_range = range(1, 11)  # Coba dari 1 sampai 10 cluster
     
-    for k in k_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(df_scaled)
-        inertia.append(kmeans.inertia_) # Inertia = Total Error
+    # Semua k di-fit paralel, model disimpan untuk dipakai di langkah 3
+    sweep = sweep_kmeans(df_scaled, k_range, n_jobs=n_jobs, silhouette_mode=None,
+                         backend=backend, backend_options={'coreset_size': coreset_size})
+    inertia = [sweep.models[k].inertia_ for k in k_range] # Inertia = Total Error
 
     # Plot Grafik Elbow
     plt.figure(figsize=(10, 6))
@@ -53,8 +60,8 @@ def run_modeling():
     k_pilihan = 3 
     print(f"\n3. Menjalankan K-Means dengan {k_pilihan} Cluster...")
     
-    model = KMeans(n_clusters=k_pilihan, random_state=42, n_init=10)
-    model.fit(df_scaled)
+    # Model k ini sudah di-fit saat Elbow Method, tinggal diambil
+    model = sweep.models[k_pilihan]
     
     # Mendapatkan Label (0, 1, 2)
     labels = model.labels_
@@ -75,8 +82,18 @@ def run_modeling():
     # Tips: Copy tabel yang muncul di terminal ini ke PPT bagian 'Result'
 
     # Simpan hasil final
-    df_original.to_csv('hasil_final_segmentasi.csv')
-    print("\nSUKSES! File hasil akhir disimpan: 'hasil_final_segmentasi.csv'")
+    output_file = table_path('hasil_final_segmentasi')
+    write_table(df_original, output_file, index=True)
+    print(f"\nSUKSES! File hasil akhir disimpan: '{output_file}'")
 
 if __name__ == "__main__":
-    run_modeling()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Elbow method + K-Means pada rfm_siap_model")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="Jumlah proses untuk sweep k (0 = semua core)")
+    parser.add_argument('--backend', choices=BACKENDS, default='full',
+                        help="Algoritma clustering: full (KMeans), minibatch, coreset")
+    parser.add_argument('--coreset-size', type=int, default=5_000,
+                        help="Jumlah titik coreset untuk backend coreset")
+    args = parser.parse_args()
+    with stage('model'):
+        run_modeling(n_jobs=args.jobs, backend=args.backend, coreset_size=args.coreset_size)
\ No newline at end of file
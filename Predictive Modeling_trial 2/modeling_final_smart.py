@@ -1,14 +1,25 @@
+import os
+import sys
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import read_table, table_path, write_table
+from kmeans_sweep import sweep_kmeans
+from silhouette import SILHOUETTE_MODES
+from clustering import BACKENDS
+from feature_transform import ARTIFACT_FILE, RFMTransform
+from segment_model import MODEL_FILE, save_segment_model
+from instrument import stage
 
 # Setting gaya visualisasi
 sns.set(style="whitegrid")
 
-def run_smart_modeling():
+def run_smart_modeling(n_jobs=0, silhouette_mode='auto', sample_size=10_000,
+                       backend='full', coreset_size=5_000):
     print("==============================================")
     print("   MODUL K-MEANS: TRIAL & ERROR AUTOMATION    ")
     print("==============================================")
@@ -17,15 +28,15 @@ def run_smart_modeling():
     print("\n[PHASE 1] Membaca Data...")
     try:
         # Load data scaled (untuk algoritma)
-        df_scaled = pd.read_csv('rfm_siap_model.csv', index_col=0)
+        df_scaled = read_table('rfm_siap_model', index_col=0)
         # Load data asli (untuk label hasil akhir)
-        df_original = pd.read_csv('rfm_data.csv')
+        df_original = read_table('rfm_data')
         if 'Customer ID' in df_original.columns:
             df_original.set_index('Customer ID', inplace=True)
             
         print(f"   > Data berhasil dimuat. Total Pelanggan: {df_scaled.shape[0]}")
     except FileNotFoundError:
-        print("   > ERROR: File tidak ditemukan. Pastikan 'rfm_siap_model.csv' & 'rfm_data.csv' ada.")
+        print("   > ERROR: File tidak ditemukan. Pastikan 'rfm_siap_model' & 'rfm_data' ada.")
         return
 
     # --- 2. TRIAL & ERROR (Mencari K Terbaik) ---
@@ -41,14 +52,18 @@ def run_smart_modeling():
     best_score = -1
     best_k = 0
 
+    # Semua k di-fit paralel (satu proses per k), model hasil fit disimpan
+    sweep = sweep_kmeans(df_scaled, k_range, n_jobs=n_jobs,
+                         backend=backend, backend_options={'coreset_size': coreset_size},
+                         silhouette_mode=silhouette_mode, sample_size=sample_size)
+    print(f"   > Backend clustering: {backend}")
+    print(f"   > Mode silhouette: {', '.join(sweep.silhouette_modes)} (diminta: {silhouette_mode})")
+
     for k in k_range:
-        # Jalankan K-Means
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(df_scaled)
-        
-        # Hitung Metrik
-        inertia = kmeans.inertia_
-        score = silhouette_score(df_scaled, kmeans.labels_)
+        # Ambil Metrik dari hasil sweep
+        inertia = sweep.models[k].inertia_
+        score = sweep.silhouette[k]
+        score_info = sweep.silhouette_results[k].describe()
         
         # Simpan hasil
         inertia_list.append(inertia)
@@ -59,7 +74,7 @@ def run_smart_modeling():
             best_score = score
             best_k = k
             
-        print(f"   [TRIAL] Testing k={k} cluster... | Inertia: {inertia:.0f} | Silhouette Score: {score:.4f}")
+        print(f"   [TRIAL] Testing k={k} cluster... | Inertia: {inertia:.0f} | Silhouette Score: {score_info}")
 
     print("-" * 60)
     print(f"   > HASIL TRIAL: Jumlah cluster terbaik adalah k={best_k} (Score: {best_score:.4f})")
@@ -91,9 +106,8 @@ def run_smart_modeling():
     # --- 4. FINAL MODELING ---
     print(f"\n[PHASE 4] Membuat Model Final dengan {best_k} Cluster...")
     
-    # Jalankan ulang K-Means dengan k pemenang
-    final_model = KMeans(n_clusters=best_k, random_state=42, n_init=10)
-    final_model.fit(df_scaled)
+    # Tidak perlu fit ulang: model k ini sudah di-fit saat trial
+    final_model = sweep.models[best_k]
     
     # Ambil labelnya
     df_original['Cluster'] = final_model.labels_
@@ -112,10 +126,34 @@ def run_smart_modeling():
     print(summary)
     
     # Simpan File Akhir
-    output_csv = 'hasil_segmentasi_final.csv'
-    df_original.to_csv(output_csv)
-    print(f"\n   > SUKSES! Data hasil segmentasi disimpan ke '{output_csv}'")
+    output_file = table_path('hasil_segmentasi_final')
+    write_table(df_original, output_file, index=True)
+    print(f"\n   > SUKSES! Data hasil segmentasi disimpan ke '{output_file}'")
+
+    # Simpan centroid + fingerprint transform agar pelanggan baru bisa di-scoring
+    # (Scoring/) tanpa menjalankan ulang modeling
+    try:
+        transform = RFMTransform.load(ARTIFACT_FILE)
+    except FileNotFoundError:
+        transform = None
+        print(f"   > PERINGATAN: '{ARTIFACT_FILE}' tidak ada, model disimpan tanpa fingerprint transform.")
+    save_segment_model(final_model, MODEL_FILE, transform, backend)
+    print(f"   > Model segmentasi (centroid) disimpan ke '{MODEL_FILE}'")
     print("==============================================")
 
 if __name__ == "__main__":
-    run_smart_modeling()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Trial & error K-Means pada rfm_siap_model")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="Jumlah proses untuk sweep k (0 = semua core)")
+    parser.add_argument('--silhouette', choices=SILHOUETTE_MODES, default='auto',
+                        help="Mode silhouette: exact (per blok), sampled (sampel berstrata + CI), auto")
+    parser.add_argument('--sample-size', type=int, default=10_000,
+                        help="Jumlah sampel untuk mode silhouette sampled")
+    parser.add_argument('--backend', choices=BACKENDS, default='full',
+                        help="Algoritma clustering: full (KMeans), minibatch, coreset")
+    parser.add_argument('--coreset-size', type=int, default=5_000,
+                        help="Jumlah titik coreset untuk backend coreset")
+    args = parser.parse_args()
+    with stage('model'):
+        run_smart_modeling(n_jobs=args.jobs, silhouette_mode=args.silhouette, sample_size=args.sample_size,
+                           backend=args.backend, coreset_size=args.coreset_size)
\ No newline at end of file
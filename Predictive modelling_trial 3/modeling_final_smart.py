@@ -1,31 +1,61 @@
+import os
+import sys
+import argparse
+from itertools import zip_longest
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
 
-# Setting gaya visualisasi
-sns.set(style="whitegrid")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import find_table, format_of, iter_table, read_table, table_path, write_table, TableWriter
+from kmeans_sweep import sweep_kmeans, sweep_kmeans_stream
+from silhouette import SILHOUETTE_MODES
+from clustering import BACKENDS
+from feature_transform import ARTIFACT_FILE, RFMTransform
+from segment_model import MODEL_FILE, save_segment_model
+from instrument import stage, step
+from snapshots import iter_rfm, read_rfm
 
-def run_smart_modeling():
+def run_smart_modeling(n_jobs=0, silhouette_mode='auto', sample_size=10_000,
+                       backend='full', coreset_size=5_000,
+                       scaled_name='rfm_siap_model', rfm_name='rfm_data', output_file=None,
+                       transform_file=ARTIFACT_FILE, model_file=MODEL_FILE,
+                       chart_file='grafik_evaluasi_trial.png', snapshot_date=None,
+                       chunksize=100_000):
     print("==============================================")
     print("   MODUL K-MEANS: TRIAL & ERROR (FORCE k=3)   ")
     print("==============================================")
     
+    # Backend coreset = streaming: rfm_siap_model & RFM asli tidak pernah
+    # dimuat utuh, keduanya dibaca per chunk (iter_table) di PHASE 2 & 4
+    streaming = backend == 'coreset'
+
     # --- 1. MEMBACA DATA ---
     print("\n[PHASE 1] Membaca Data...")
     try:
-        # Load data scaled (untuk algoritma)
-        df_scaled = pd.read_csv('rfm_siap_model.csv', index_col=0)
-        # Load data asli (untuk label hasil akhir)
-        df_original = pd.read_csv('rfm_data.csv')
-        if 'Customer ID' in df_original.columns:
-            df_original.set_index('Customer ID', inplace=True)
-            
-        print(f"   > Data berhasil dimuat. Total Pelanggan: {df_scaled.shape[0]}")
+        if streaming:
+            find_table(scaled_name)
+            find_table(rfm_name)
+            print(f"   > Mode streaming (backend coreset): data dibaca per {chunksize} baris.")
+        else:
+            with step('read') as s:
+                # Load data scaled (untuk algoritma)
+                df_scaled = read_table(scaled_name, index_col=0)
+                # Load data asli (untuk label hasil akhir); dari rfm_snapshots
+                # diambil snapshot yang sama dengan input feature engineering
+                df_original = read_rfm(rfm_name, snapshot_date)
+                s.rows_out = len(df_scaled)
+            if len(df_original) != len(df_scaled):
+                print(f"   > ERROR: '{rfm_name}' ({len(df_original)} pelanggan) tidak cocok dengan "
+                      f"'{scaled_name}' ({len(df_scaled)}). Pakai snapshot yang sama dengan feature engineering.")
+                return
+
+            print(f"   > Data berhasil dimuat. Total Pelanggan: {df_scaled.shape[0]}")
     except FileNotFoundError:
-        print("   > ERROR: File tidak ditemukan. Pastikan 'rfm_siap_model.csv' & 'rfm_data.csv' ada.")
+        print(f"   > ERROR: File tidak ditemukan. Pastikan '{scaled_name}' & '{rfm_name}' ada.")
+        return
+    except ValueError as e:
+        print(f"   > ERROR: {e}")
         return
 
     # --- 2. TRIAL & ERROR (Mencari K Terbaik) ---
@@ -40,14 +70,28 @@ def run_smart_modeling():
     math_best_score = -1
     math_best_k = 0
 
+    # Semua k di-fit paralel (satu proses per k), model hasil fit disimpan
+    # (fit & silhouette tiap k tercatat sebagai langkah sweep/fit_k*, sweep/silhouette_k*)
+    with step('sweep') as s:
+        if streaming:
+            # Satu coreset dari iter_table untuk semua k (lihat sweep_kmeans_stream)
+            sweep = sweep_kmeans_stream(lambda: scaled_chunks(scaled_name, chunksize), k_range,
+                                        coreset_size=coreset_size, silhouette_mode=silhouette_mode,
+                                        sample_size=sample_size)
+        else:
+            s.rows_in = len(df_scaled)
+            sweep = sweep_kmeans(df_scaled, k_range, n_jobs=n_jobs,
+                                 backend=backend, backend_options={'coreset_size': coreset_size},
+                                 silhouette_mode=silhouette_mode, sample_size=sample_size)
+        s.note(backend=backend, k_values=list(k_range))
+    print(f"   > Backend clustering: {backend}")
+    print(f"   > Mode silhouette: {', '.join(sweep.silhouette_modes)} (diminta: {silhouette_mode})")
+
     for k in k_range:
-        # Jalankan K-Means
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(df_scaled)
-        
-        # Hitung Metrik
-        inertia = kmeans.inertia_
-        score = silhouette_score(df_scaled, kmeans.labels_)
+        # Ambil Metrik dari hasil sweep
+        inertia = sweep.models[k].inertia_
+        score = sweep.silhouette[k]
+        score_info = sweep.silhouette_results[k].describe()
         
         # Simpan hasil
         inertia_list.append(inertia)
@@ -58,7 +102,7 @@ def run_smart_modeling():
             math_best_score = score
             math_best_k = k
             
-        print(f"   [TRIAL] Testing k={k} cluster... | Inertia: {inertia:.0f} | Silhouette Score: {score:.4f}")
+        print(f"   [TRIAL] Testing k={k} cluster... | Inertia: {inertia:.0f} | Silhouette Score: {score_info}")
 
     print("-" * 60)
     print(f"   > INFO MATEMATIS: Secara murni statistik, k terbaik adalah {math_best_k} (Score: {math_best_score:.4f})")
@@ -69,7 +113,115 @@ def run_smart_modeling():
     print(f"   > KEPUTUSAN BISNIS: Kita memilih k={best_k} untuk segmentasi yang lebih actionable.")
 
     # --- 3. VISUALISASI PROSES TRIAL (GRAFIK) ---
-    print("\n[PHASE 3] Menyimpan Grafik Evaluasi...")
+    if chart_file:
+        print("\n[PHASE 3] Menyimpan Grafik Evaluasi...")
+        with step('chart'):
+            plot_evaluation(k_range, inertia_list, silhouette_list, best_k, chart_file)
+        print(f"   > Grafik disimpan: '{chart_file}'")
+
+    # --- 4. FINAL MODELING ---
+    print(f"\n[PHASE 4] Membuat Model Final dengan {best_k} Cluster...")
+    
+    # Tidak perlu fit ulang: model k ini sudah di-fit saat trial
+    final_model = sweep.models[best_k]
+    
+    output_file = output_file or table_path('hasil_segmentasi_final')
+    if streaming:
+        # Label tidak disimpan saat sweep: RFM asli & rfm_siap_model dibaca
+        # berpasangan per chunk, di-predict, lalu langsung ditulis
+        try:
+            summary = write_segments_stream(final_model, scaled_name, rfm_name, snapshot_date,
+                                            output_file, chunksize)
+        except ValueError as e:
+            print(f"   > ERROR: {e}")
+            return
+        cluster_sizes = summary['Jumlah Anggota'].reindex(range(best_k), fill_value=0).tolist()
+        print("\n[PHASE 5] Ringkasan Profil Pelanggan:")
+        print(summary)
+    else:
+        # Ambil labelnya
+        df_original['Cluster'] = final_model.labels_
+
+        # --- 5. REPORTING HASIL ---
+        print("\n[PHASE 5] Ringkasan Profil Pelanggan:")
+
+        # Hitung rata-rata per cluster
+        summary = df_original.groupby('Cluster').agg({
+            'Recency': 'mean',
+            'Frequency': 'mean',
+            'Monetary': 'mean',
+            'Cluster': 'count'
+        }).rename(columns={'Cluster': 'Jumlah Anggota'})
+
+        print(summary)
+
+        # Simpan File Akhir
+        with step('write', rows_in=len(df_original)):
+            write_table(df_original, output_file, index=True)
+        cluster_sizes = None
+    print(f"\n   > SUKSES! Data hasil segmentasi disimpan ke '{output_file}'")
+
+    # Simpan centroid + fingerprint transform agar pelanggan baru bisa di-scoring
+    # (Scoring/) tanpa menjalankan ulang modeling
+    try:
+        transform = RFMTransform.load(transform_file)
+    except FileNotFoundError:
+        transform = None
+        print(f"   > PERINGATAN: '{transform_file}' tidak ada, model disimpan tanpa fingerprint transform.")
+    save_segment_model(final_model, model_file, transform, backend, cluster_sizes)
+    print(f"   > Model segmentasi (centroid) disimpan ke '{model_file}'")
+    print("==============================================")
+
+
+def scaled_chunks(scaled_name, chunksize):
+    # rfm_siap_model per chunk sebagai array fitur (kolom pertama = Customer ID)
+    for chunk in iter_table(scaled_name, chunksize):
+        yield chunk.drop(columns=chunk.columns[0]).to_numpy(dtype='float64')
+
+
+def write_segments_stream(model, scaled_name, rfm_name, snapshot_date, output_file, chunksize):
+    # hasil_segmentasi_final per chunk; ringkasan per cluster diakumulasi
+    # (jumlah & count) lalu dibagi di akhir
+    totals = None
+    rows = 0
+    # Feather tidak bisa ditulis per bagian: chunk dikumpulkan dulu
+    writer = TableWriter(output_file) if format_of(output_file) != 'feather' else None
+    parts = []
+    with step('write') as s:
+        pairs = zip_longest(iter_table(scaled_name, chunksize), iter_rfm(rfm_name, chunksize, snapshot_date))
+        for scaled, original in pairs:
+            if scaled is None or original is None or len(scaled) != len(original) or \
+                    not (scaled.iloc[:, 0].to_numpy() == original.index.to_numpy()).all():
+                raise ValueError(f"'{rfm_name}' tidak cocok dengan '{scaled_name}' (baris ke-{rows}). "
+                                 f"Pakai snapshot yang sama dengan feature engineering.")
+            original = original.assign(Cluster=model.predict(scaled.drop(columns=scaled.columns[0])))
+            part = original.groupby('Cluster')[['Recency', 'Frequency', 'Monetary']].sum()
+            part['Jumlah Anggota'] = original.groupby('Cluster').size()
+            totals = part if totals is None else totals.add(part, fill_value=0)
+            if writer is not None:
+                writer.write(original.reset_index())
+            else:
+                parts.append(original)
+            rows += len(original)
+        s.rows_in = s.rows_out = rows
+    if writer is not None:
+        writer.close()
+    else:
+        write_table(pd.concat(parts), output_file, index=True)
+
+    summary = totals[['Recency', 'Frequency', 'Monetary']].div(totals['Jumlah Anggota'], axis=0)
+    summary['Jumlah Anggota'] = totals['Jumlah Anggota'].astype('int64')
+    return summary
+
+
+def plot_evaluation(k_range, inertia_list, silhouette_list, best_k, chart_file):
+    # Library grafik baru di-import saat grafik memang dibuat
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Setting gaya visualisasi
+    sns.set(style="whitegrid")
+
     fig, ax1 = plt.subplots(figsize=(10, 6))
 
     # Grafik Elbow (Inertia) - Garis Biru
@@ -91,37 +243,28 @@ def run_smart_modeling():
 
     plt.title(f'Evaluasi Cluster (Dipilih: k={best_k})')
     fig.tight_layout()
-    plt.savefig('grafik_evaluasi_trial.png')
-    print("   > Grafik disimpan: 'grafik_evaluasi_trial.png'")
-
-    # --- 4. FINAL MODELING ---
-    print(f"\n[PHASE 4] Membuat Model Final dengan {best_k} Cluster...")
-    
-    # Jalankan ulang K-Means dengan k=3
-    final_model = KMeans(n_clusters=best_k, random_state=42, n_init=10)
-    final_model.fit(df_scaled)
-    
-    # Ambil labelnya
-    df_original['Cluster'] = final_model.labels_
-    
-    # --- 5. REPORTING HASIL ---
-    print("\n[PHASE 5] Ringkasan Profil Pelanggan:")
-    
-    # Hitung rata-rata per cluster
-    summary = df_original.groupby('Cluster').agg({
-        'Recency': 'mean',
-        'Frequency': 'mean',
-        'Monetary': 'mean',
-        'Cluster': 'count'
-    }).rename(columns={'Cluster': 'Jumlah Anggota'})
-    
-    print(summary)
-    
-    # Simpan File Akhir
-    output_csv = 'hasil_segmentasi_final.csv'
-    df_original.to_csv(output_csv)
-    print(f"\n   > SUKSES! Data hasil segmentasi disimpan ke '{output_csv}'")
-    print("==============================================")
+    plt.savefig(chart_file)
+    plt.close(fig)
 
 if __name__ == "__main__":
-    run_smart_modeling()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Trial & error K-Means pada rfm_siap_model")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="Jumlah proses untuk sweep k (0 = semua core)")
+    parser.add_argument('--silhouette', choices=SILHOUETTE_MODES, default='auto',
+                        help="Mode silhouette: exact (per blok), sampled (sampel berstrata + CI), auto")
+    parser.add_argument('--sample-size', type=int, default=10_000,
+                        help="Jumlah sampel untuk mode silhouette sampled")
+    parser.add_argument('--backend', choices=BACKENDS, default='full',
+                        help="Algoritma clustering: full (KMeans), minibatch, coreset (streaming)")
+    parser.add_argument('--coreset-size', type=int, default=5_000,
+                        help="Jumlah titik coreset untuk backend coreset")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="Baris per chunk untuk backend coreset (streaming)")
+    parser.add_argument('--rfm', default='rfm_data', help="Tabel RFM asli atau rfm_snapshots")
+    parser.add_argument('--snapshot', default=None,
+                        help="Tanggal snapshot jika --rfm rfm_snapshots (default: snapshot terakhir)")
+    args = parser.parse_args()
+    with stage('model'):
+        run_smart_modeling(n_jobs=args.jobs, silhouette_mode=args.silhouette, sample_size=args.sample_size,
+                           backend=args.backend, coreset_size=args.coreset_size,
+                           rfm_name=args.rfm, snapshot_date=args.snapshot, chunksize=args.chunksize)
\ No newline at end of file
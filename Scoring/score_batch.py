@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import iter_table, table_path, write_table, TableWriter
+from feature_transform import ARTIFACT_FILE
+from segment_model import MODEL_FILE, SegmentScorer
+from instrument import stage, step
+
+# Scoring batch: file RFM (Customer ID, Recency, Frequency, Monetary) ->
+# file yang sama + kolom Cluster & DistanceToCentroid, per chunk.
+# Transform & centroid dimuat sekali; tidak ada fit ulang.
+# Baris dengan R/F/M NaN atau negatif tidak di-scoring: dilaporkan dan
+# disimpan ke tabel terpisah (default: hasil_scoring_ditolak).
+
+
+def score_file(input_file='rfm_data', output_file=None, transform_file=ARTIFACT_FILE,
+               model_file=MODEL_FILE, chunksize=100_000, reject_file=None):
+    output_file = output_file or table_path('hasil_scoring')
+    reject_file = reject_file or table_path('hasil_scoring_ditolak')
+    print("1. Memuat transform & model segmentasi...")
+    try:
+        scorer = SegmentScorer.load(transform_file, model_file)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}. Jalankan feature_engginering.py & modeling dulu.")
+        return
+    print(f"   - {len(scorer.centroids)} segment, transform {scorer.transform.fingerprint}")
+
+    print(f"2. Scoring '{input_file}' per {chunksize} baris...")
+    rows = 0
+    rejected = []
+    start = time.perf_counter()
+    with step('score') as s, TableWriter(output_file) as writer:
+        for chunk in iter_table(input_file, chunksize):
+            rows += len(chunk)
+            bad = scorer.invalid_rows(chunk)
+            if bad.any():
+                rejected.append(chunk[bad])
+                chunk = chunk[~bad]
+            writer.write(scorer.score(chunk))
+        n_rejected = sum(len(r) for r in rejected)
+        s.rows_in, s.rows_out = rows, rows - n_rejected
+        s.note(rejected=n_rejected)
+    elapsed = time.perf_counter() - start
+
+    print(f"   - {rows} pelanggan dalam {elapsed:.3f} detik "
+          f"({rows / max(elapsed, 1e-9):,.0f} pelanggan/detik)")
+    if rejected:
+        rejected = pd.concat(rejected)
+        write_table(rejected, reject_file)
+        label = rejected['Customer ID'] if 'Customer ID' in rejected.columns else rejected.index
+        print(f"   - PERINGATAN: {n_rejected} baris tidak di-scoring (R/F/M NaN atau negatif), "
+              f"contoh: {list(label[:5])}")
+        print(f"     Baris bermasalah disimpan ke '{reject_file}'")
+    print(f"\nSUKSES! Hasil scoring disimpan ke '{output_file}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Menempatkan pelanggan ke segment yang sudah ada")
+    parser.add_argument('input', nargs='?', default='rfm_data', help="File RFM yang akan di-scoring")
+    parser.add_argument('output', nargs='?', default=None, help="File hasil (default: hasil_scoring)")
+    parser.add_argument('--transform', default=ARTIFACT_FILE, help="Artifact transform dari feature engineering")
+    parser.add_argument('--model', default=MODEL_FILE, help="Artifact centroid dari modeling")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Baris per chunk")
+    parser.add_argument('--rejects', default=None,
+                        help="File baris yang ditolak (default: hasil_scoring_ditolak)")
+    args = parser.parse_args()
+    with stage('score'):
+        score_file(args.input, args.output, args.transform, args.model, args.chunksize, args.rejects)
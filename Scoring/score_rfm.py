@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import iter_table, table_path, TableWriter
+from feature_transform import ARTIFACT_FILE, FITUR
+from segment_model import MODEL_FILE, SegmentScorer
+from tdigest import SKETCH_FILE, digests_from_frame, load_digests, merge_digests, save_digests
+from instrument import stage, step
+
+# Skor RFM klasik 1-5 (kuintil) di samping Cluster K-Means, tanpa sort penuh:
+# 1. SATU pass streaming per partisi/file RFM -> sketch t-digest per kolom,
+#    sketch antar partisi digabung (bisa juga dari file sketch hasil mesin lain)
+# 2. pass kedua per chunk: skor = kuintil posisi pelanggan di sketch
+#    (R dibalik: Recency kecil = skor 5), RFM_Code = gabungan 'RFM', mis. '545'
+# Sketch disimpan ke rfm_quantiles.json; Visual memakai sketch yang sama
+# untuk batas sumbu persentil 95/98.
+JUMLAH_KELAS = 5
+
+
+def build_sketches(input_names, chunksize=500_000):
+    # Sketch per partisi (satu pass per file), lalu digabung
+    parts = []
+    rows = 0
+    for name in input_names:
+        digests = None
+        for chunk in iter_table(name, chunksize, columns=FITUR):
+            digests = digests_from_frame(chunk, FITUR, digests=digests)
+            rows += len(chunk)
+        if digests is not None:
+            parts.append(digests)
+    return merge_digests(parts), rows
+
+
+def quintile_scores(rfm, digests):
+    # Posisi (cdf) di sketch -> kelas 1..5; Recency dibalik (baru beli = bagus)
+    scores = {}
+    for col in FITUR:
+        position = digests[col].cdf(rfm[col].to_numpy())
+        score = np.clip(np.floor(position * JUMLAH_KELAS).astype('int64') + 1, 1, JUMLAH_KELAS)
+        scores[col] = JUMLAH_KELAS + 1 - score if col == 'Recency' else score
+    code = scores['Recency'] * 100 + scores['Frequency'] * 10 + scores['Monetary']
+    return rfm.assign(R_Score=scores['Recency'], F_Score=scores['Frequency'],
+                      M_Score=scores['Monetary'], RFM_Code=code.astype(str))
+
+
+def score_rfm_file(input_names=('rfm_data',), output_file=None, sketch_file=SKETCH_FILE,
+                   sketch_inputs=None, transform_file=ARTIFACT_FILE, model_file=MODEL_FILE,
+                   chunksize=500_000, sketch_only=False):
+    output_file = output_file or table_path('hasil_rfm_score')
+    input_names = list(input_names) or ['rfm_data']
+
+    print("1. Membangun sketch kuantil (t-digest) R/F/M...")
+    start = time.perf_counter()
+    with step('sketch') as s:
+        if sketch_inputs:
+            # Sketch partisi yang sudah dibuat sebelumnya (mis. per mesin) cukup digabung
+            digests = merge_digests(load_digests(path) for path in sketch_inputs)
+            rows = int(max(d.count for d in digests.values()))
+            print(f"   - {len(sketch_inputs)} file sketch digabung")
+        else:
+            try:
+                digests, rows = build_sketches(input_names, chunksize)
+            except FileNotFoundError as e:
+                print(f"ERROR: {e}. Jalankan create_file_rfm.py dulu.")
+                return
+        s.rows_in = rows
+    if digests is None:
+        print("ERROR: Tidak ada data RFM untuk dibuat sketch.")
+        return
+    save_digests(digests, sketch_file)
+    print(f"   - {rows} pelanggan dari {len(input_names)} partisi "
+          f"({time.perf_counter() - start:.3f} s), sketch disimpan ke '{sketch_file}'")
+    for col in FITUR:
+        edges = digests[col].quantile([0.2, 0.4, 0.6, 0.8])
+        print(f"   - {col:<9} batas kuintil: {', '.join(f'{e:,.1f}' for e in edges)}")
+    if sketch_only:
+        # Untuk partisi di mesin lain: sketch digabung nanti lewat --merge-sketches
+        return
+
+    # Cluster K-Means ikut ditempel jika model segmentasi tersedia
+    try:
+        scorer = SegmentScorer.load(transform_file, model_file)
+    except FileNotFoundError:
+        scorer = None
+        print("   - Model segmentasi tidak ada, kolom Cluster dilewati")
+
+    print(f"2. Memberi skor R/F/M per {chunksize} baris...")
+    scored_rows = 0
+    with step('score', rows_in=rows) as s, TableWriter(output_file) as writer:
+        for name in input_names:
+            for chunk in iter_table(name, chunksize):
+                if scorer is not None and 'Cluster' not in chunk.columns:
+                    chunk = chunk.assign(Cluster=scorer.assign(chunk)[0])
+                writer.write(quintile_scores(chunk, digests))
+                scored_rows += len(chunk)
+        s.rows_out = scored_rows
+
+    print(f"\nSUKSES! {scored_rows} pelanggan diberi skor RFM, disimpan ke '{output_file}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Skor RFM kuintil (1-5) dengan sketch t-digest")
+    parser.add_argument('inputs', nargs='*', default=['rfm_data'],
+                        help="File/partisi RFM (default: rfm_data)")
+    parser.add_argument('--output', default=None, help="File hasil (default: hasil_rfm_score)")
+    parser.add_argument('--sketch-file', default=SKETCH_FILE, help="File sketch hasil (JSON)")
+    parser.add_argument('--merge-sketches', nargs='+', default=None,
+                        help="Pakai & gabung file sketch partisi ini (tanpa pass pembuatan sketch)")
+    parser.add_argument('--sketch-only', action='store_true',
+                        help="Hanya buat sketch partisi (skor dihitung setelah semua sketch digabung)")
+    parser.add_argument('--transform', default=ARTIFACT_FILE, help="Artifact transform dari feature engineering")
+    parser.add_argument('--model', default=MODEL_FILE, help="Artifact centroid dari modeling")
+    parser.add_argument('--chunksize', type=int, default=500_000, help="Baris per chunk")
+    args = parser.parse_args()
+    with stage('rfm_score'):
+        score_rfm_file(args.inputs, args.output, args.sketch_file, args.merge_sketches,
+                       args.transform, args.model, args.chunksize, args.sketch_only)
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from feature_transform import ARTIFACT_FILE
+from segment_model import MODEL_FILE, SegmentScorer
+
+# Service scoring lokal (tanpa dependensi web framework):
+#   POST /score    body: {"customers": [{"Customer ID": .., "Recency": .., "Frequency": .., "Monetary": ..}]}
+#                  (atau langsung list / satu object)  -> segment per pelanggan
+#   GET  /metrics  jumlah request, throughput, latency p50/p95/p99
+#   GET  /health
+# Transform & centroid dimuat sekali saat server start.
+JENDELA_LATENCY = 1000
+
+
+class ScoringMetrics:
+    def __init__(self, window=JENDELA_LATENCY):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.started = time.time()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+
+    def record(self, seconds, rows):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+            self.rows += rows
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            uptime = time.time() - self.started
+            result = {
+                'requests': self.requests,
+                'rows': self.rows,
+                'errors': self.errors,
+                'uptime_s': round(uptime, 3),
+                'rows_per_s': round(self.rows / max(uptime, 1e-9), 2),
+            }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            result['latency_ms'] = {'p50': round(p50, 3), 'p95': round(p95, 3),
+                                    'p99': round(p99, 3), 'max': round(latencies.max(), 3),
+                                    'window': len(latencies)}
+        return result
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.server.metrics.snapshot())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'segments': len(self.server.scorer.centroids)})
+        else:
+            self._send_json(404, {'error': f"Path '{self.path}' tidak dikenal"})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send_json(404, {'error': f"Path '{self.path}' tidak dikenal"})
+            return
+        start = time.perf_counter()
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'null')
+            if isinstance(payload, dict):
+                payload = payload.get('customers', [payload])
+            if not isinstance(payload, list) or not payload:
+                raise ValueError("Body harus berisi list pelanggan")
+            segments = self.server.scorer.score_records(payload)
+        except (ValueError, TypeError, KeyError) as e:
+            self.server.metrics.record_error()
+            self._send_json(400, {'error': str(e)})
+            return
+        elapsed = time.perf_counter() - start
+        self.server.metrics.record(elapsed, len(segments))
+        self._send_json(200, {'segments': segments, 'latency_ms': round(elapsed * 1000, 3)})
+
+    def log_message(self, format, *args):
+        # Log per request dimatikan agar tidak menambah latency; lihat /metrics
+        pass
+
+
+def make_server(host='127.0.0.1', port=8000, transform_file=ARTIFACT_FILE, model_file=MODEL_FILE):
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.scorer = SegmentScorer.load(transform_file, model_file)
+    server.metrics = ScoringMetrics()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP service scoring segment pelanggan")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--transform', default=ARTIFACT_FILE, help="Artifact transform dari feature engineering")
+    parser.add_argument('--model', default=MODEL_FILE, help="Artifact centroid dari modeling")
+    args = parser.parse_args()
+
+    try:
+        server = make_server(args.host, args.port, args.transform, args.model)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}. Jalankan feature_engginering.py & modeling dulu.")
+        sys.exit(1)
+    print(f"Server scoring aktif di http://{args.host}:{args.port} "
+          f"({len(server.scorer.centroids)} segment). Ctrl+C untuk berhenti.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServer dihentikan.")
+        server.server_close()
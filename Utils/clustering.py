@@ -0,0 +1,122 @@
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+# Backend clustering untuk modeling (semua menghasilkan objek dengan
+# labels_, inertia_, cluster_centers_ dan predict(), jadi kontrak output
+# hasil_segmentasi_final tetap sama):
+# - 'full'      : KMeans biasa pada seluruh matriks (perilaku lama)
+# - 'minibatch' : MiniBatchKMeans, update centroid per batch kecil
+# - 'coreset'   : satu kali lewat data per chunk, dibangun coreset berbobot
+#                 kecil (lightweight coreset + merge-and-reduce), lalu KMeans
+#                 berbobot dijalankan pada coreset saja. Label & inertia
+#                 dihitung ulang ke seluruh data per chunk.
+BACKENDS = ('full', 'minibatch', 'coreset')
+UKURAN_CORESET = 5_000
+UKURAN_CHUNK = 100_000
+UKURAN_BATCH = 4_096
+
+
+def _lightweight_coreset(X, weights, size, rng):
+    # Sampling proporsional 1/2 bobot + 1/2 (bobot x jarak^2 ke rata-rata),
+    # bobot baru = bobot / (size * peluang) -> estimasi biaya tetap tak bias
+    if len(X) <= size:
+        return X, weights
+    mean = np.average(X, axis=0, weights=weights)
+    dist = weights * ((X - mean) ** 2).sum(axis=1)
+    prob = 0.5 * weights / weights.sum()
+    if dist.sum() > 0:
+        prob += 0.5 * dist / dist.sum()
+    else:
+        prob *= 2
+    idx = rng.choice(len(X), size=size, replace=True, p=prob)
+    return X[idx], weights[idx] / (size * prob[idx])
+
+
+class StreamingCoreset:
+    # Merge-and-reduce: coreset per chunk ditumpuk, dan jika tumpukan melewati
+    # 2 x size direduksi lagi jadi size titik. Memori ~ 2 x size x fitur.
+    def __init__(self, size=UKURAN_CORESET, random_state=42):
+        self.size = size
+        self.rng = np.random.default_rng(random_state)
+        self.points = None
+        self.weights = None
+        self.n_seen = 0
+
+    def add(self, chunk):
+        chunk = np.asarray(chunk, dtype='float64')
+        self.n_seen += len(chunk)
+        points, weights = _lightweight_coreset(chunk, np.ones(len(chunk)), self.size, self.rng)
+        if self.points is None:
+            self.points, self.weights = points, weights
+        else:
+            self.points = np.vstack([self.points, points])
+            self.weights = np.concatenate([self.weights, weights])
+        if len(self.points) > 2 * self.size:
+            self.points, self.weights = _lightweight_coreset(self.points, self.weights,
+                                                             self.size, self.rng)
+        return self
+
+
+class CoresetKMeans:
+    def __init__(self, n_clusters, coreset_size=UKURAN_CORESET, chunksize=UKURAN_CHUNK,
+                 random_state=42, n_init=10):
+        self.n_clusters = n_clusters
+        self.coreset_size = coreset_size
+        self.chunksize = chunksize
+        self.random_state = random_state
+        self.n_init = n_init
+
+    def fit_stream(self, chunks):
+        # Lewat pertama: bangun coreset dari iterator chunk (array / DataFrame)
+        coreset = StreamingCoreset(self.coreset_size, self.random_state)
+        for chunk in chunks:
+            coreset.add(chunk)
+        return self.fit_coreset(coreset)
+
+    def fit_coreset(self, coreset):
+        # KMeans berbobot pada coreset yang sudah jadi (satu coreset bisa
+        # dipakai bersama oleh beberapa k, lihat kmeans_sweep.sweep_kmeans_stream)
+        self.coreset_ = coreset
+        self._model = KMeans(n_clusters=self.n_clusters, random_state=self.random_state,
+                             n_init=self.n_init)
+        self._model.fit(coreset.points, sample_weight=coreset.weights)
+        self.cluster_centers_ = self._model.cluster_centers_
+        return self
+
+    def predict(self, X):
+        return self._model.predict(np.asarray(X, dtype='float64'))
+
+    def score_stream(self, chunks):
+        # Lewat kedua: label + inertia terhadap seluruh data
+        labels, inertia = [], 0.0
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype='float64')
+            lab = self.predict(chunk)
+            inertia += ((chunk - self.cluster_centers_[lab]) ** 2).sum()
+            labels.append(lab)
+        return (np.concatenate(labels) if labels else np.empty(0, dtype='int32')), inertia
+
+    def fit(self, X):
+        X = np.asarray(X, dtype='float64')
+        chunks = lambda: (X[i:i + self.chunksize] for i in range(0, len(X), self.chunksize))
+        self.fit_stream(chunks())
+        self.labels_, self.inertia_ = self.score_stream(chunks())
+        return self
+
+
+def make_model(k, backend='full', random_state=42, n_init=10, **options):
+    # options: batch_size (minibatch), coreset_size & chunksize (coreset)
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend clustering '{backend}' tidak dikenal. Pilihan: {BACKENDS}")
+    if backend == 'minibatch':
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=n_init,
+                               batch_size=options.get('batch_size', UKURAN_BATCH))
+    if backend == 'coreset':
+        return CoresetKMeans(k, coreset_size=options.get('coreset_size', UKURAN_CORESET),
+                             chunksize=options.get('chunksize', UKURAN_CHUNK),
+                             random_state=random_state, n_init=n_init)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+
+
+def fit_clusters(X, k, backend='full', random_state=42, n_init=10, **options):
+    return make_model(k, backend, random_state, n_init, **options).fit(X)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+# Parsing InvoiceDate yang cepat:
+# 1. Format dideteksi sekali dari sampel (bukan ditebak per nilai)
+# 2. Hanya string unik yang di-parse -- semua baris satu invoice berbagi
+#    timestamp yang sama, jadi jumlah unik jauh lebih kecil dari jumlah baris
+# 3. Hasil dipetakan balik ke baris lewat kode factorize
+# Tanggal juga bisa disimpan sebagai integer epoch (detik) agar tahap
+# berikutnya tidak perlu parsing teks sama sekali.
+FORMAT_KANDIDAT = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%m/%d/%Y %H:%M',
+    '%d/%m/%Y %H:%M',
+    '%m/%d/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%Y-%m-%d',
+]
+UKURAN_SAMPEL = 1000
+
+
+def detect_format(values, sample_size=UKURAN_SAMPEL):
+    # Format pertama yang bisa mem-parse seluruh sampel; None jika tidak ada
+    sample = pd.Series(values).dropna()
+    if len(sample) > sample_size:
+        sample = sample.sample(sample_size, random_state=0)
+    for fmt in FORMAT_KANDIDAT:
+        try:
+            pd.to_datetime(sample, format=fmt)
+        except (ValueError, TypeError):
+            continue
+        return fmt
+    return None
+
+
+def to_epoch(dates):
+    # datetime -> detik sejak 1970-01-01 (int64)
+    values = pd.Series(dates).to_numpy().astype('datetime64[s]').astype('int64')
+    return pd.Series(values, index=getattr(dates, 'index', None), name=getattr(dates, 'name', None))
+
+
+def from_epoch(values):
+    return pd.to_datetime(values, unit='s').astype('datetime64[ns]')
+
+
+class InvoiceDateParser:
+    # Menyimpan format yang sudah terdeteksi, sehingga saat dipakai per chunk
+    # deteksi format hanya terjadi di chunk pertama
+    def __init__(self, fmt=None):
+        self.fmt = fmt
+
+    def parse(self, series):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.astype('datetime64[ns]')
+        if pd.api.types.is_integer_dtype(series):
+            return pd.Series(from_epoch(series.to_numpy()), index=series.index, name=series.name)
+
+        codes, uniques = pd.factorize(series)
+        if self.fmt is None:
+            self.fmt = detect_format(uniques)
+        if self.fmt is not None:
+            # Format chunk pertama belum tentu berlaku untuk semua chunk:
+            # nilai yang gagal (NaT) di-parse ulang di bawah, bukan error
+            parsed = pd.to_datetime(uniques, format=self.fmt, errors='coerce')
+        else:
+            parsed = pd.to_datetime(uniques, format='mixed')
+        parsed = np.asarray(parsed, dtype='datetime64[ns]')
+        failed = np.flatnonzero(np.isnat(parsed))
+        if len(failed):
+            parsed[failed] = self._reparse(uniques[failed])
+
+        values = parsed[codes] if len(parsed) else np.empty(len(codes), dtype='datetime64[ns]')
+        values[codes < 0] = np.datetime64('NaT')
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def _reparse(self, values):
+        # Hanya string unik yang gagal: deteksi ulang format dari nilai itu
+        # sendiri, sisanya ditebak per nilai. Error hanya jika memang tidak
+        # bisa dibaca sebagai tanggal.
+        values = pd.Index(values)
+        fmt = detect_format(values)
+        parsed = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+        if fmt is not None:
+            parsed[:] = np.asarray(pd.to_datetime(values, format=fmt, errors='coerce'), dtype='datetime64[ns]')
+        rest = np.flatnonzero(np.isnat(parsed))
+        if len(rest):
+            try:
+                parsed[rest] = np.asarray(pd.to_datetime(values[rest], format='mixed'), dtype='datetime64[ns]')
+            except (ValueError, TypeError) as e:
+                bad = pd.to_datetime(values[rest], format='mixed', errors='coerce').isna()
+                raise ValueError(f"InvoiceDate tidak bisa dibaca: {list(values[rest][bad][:5])}") from e
+        return parsed
+
+
+def parse_invoice_dates(series, fmt=None):
+    return InvoiceDateParser(fmt).parse(series)
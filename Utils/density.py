@@ -0,0 +1,63 @@
+import numpy as np
+from matplotlib.patches import Patch
+
+# Mode density untuk scatter besar: titik tidak digambar satu per satu, tetapi
+# dihitung dulu ke grid 2D per cluster (np.bincount, sekali jalan), lalu
+# digambar sebagai SATU gambar (imshow). Waktu render & ukuran PNG tergantung
+# ukuran grid, bukan jumlah pelanggan.
+GRID_DEFAULT = (400, 300)
+BATAS_TITIK = 50_000   # mode 'auto': di atas ini pakai density
+
+
+def use_density(mode, n_points):
+    if mode not in ('auto', 'points', 'density'):
+        raise ValueError(f"Mode plot '{mode}' tidak dikenal. Pilihan: auto, points, density")
+    return mode == 'density' or (mode == 'auto' and n_points > BATAS_TITIK)
+
+
+def density_grid(x, y, groups, n_groups, bins=GRID_DEFAULT, extent=None):
+    # Hitungan titik per (cluster, baris, kolom) -> array (n_groups, ny, nx).
+    # Titik di luar extent dibuang (sama seperti xlim/ylim pada scatter biasa).
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    groups = np.asarray(groups, dtype='int64')
+    nx, ny = bins
+    if extent is None:
+        extent = (x.min(), x.max(), y.min(), y.max())
+    x0, x1, y0, y1 = extent
+
+    ix = np.floor((x - x0) / max(x1 - x0, 1e-12) * nx).astype('int64')
+    iy = np.floor((y - y0) / max(y1 - y0, 1e-12) * ny).astype('int64')
+    # Titik tepat di batas kanan/atas masuk sel terakhir
+    ix[x == x1] = nx - 1
+    iy[y == y1] = ny - 1
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+
+    flat = (groups[inside] * ny + iy[inside]) * nx + ix[inside]
+    counts = np.bincount(flat, minlength=n_groups * ny * nx)
+    return counts.reshape(n_groups, ny, nx), extent
+
+
+def blend_density(counts, colors, blend=True):
+    # Grid hitungan -> gambar RGBA.
+    # blend=True : warna sel = rata-rata warna cluster berbobot jumlah titik
+    # blend=False: warna sel = cluster dengan titik terbanyak
+    # Transparansi mengikuti log(1 + total titik) agar area jarang tetap terlihat.
+    colors = np.asarray(colors, dtype='float64')[:, :3]
+    total = counts.sum(axis=0)
+    if blend:
+        rgb = np.einsum('gyx,gc->yxc', counts, colors) / np.maximum(total, 1)[..., None]
+    else:
+        rgb = colors[counts.argmax(axis=0)]
+    alpha = np.log1p(total) / max(np.log1p(total.max()), 1e-12)
+    return np.dstack([rgb, alpha])
+
+
+def plot_density(ax, x, y, clusters, palette, bins=GRID_DEFAULT, extent=None, blend=True):
+    # Ganti sns.scatterplot(hue=Cluster) dengan gambar density per cluster
+    labels, groups = np.unique(np.asarray(clusters), return_inverse=True)
+    counts, extent = density_grid(x, y, groups, len(labels), bins, extent)
+    image = blend_density(counts, palette[:len(labels)], blend)
+    ax.imshow(image, extent=extent, origin='lower', aspect='auto', interpolation='nearest')
+    handles = [Patch(color=palette[i], label=str(label)) for i, label in enumerate(labels)]
+    return handles
@@ -0,0 +1,71 @@
+import json
+import hashlib
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+# Transformasi fitur RFM (log1p + StandardScaler) yang di-fit SEKALI di
+# feature_engginering.py lalu disimpan sebagai artifact JSON. Modeling, PCA,
+# snake plot, dan scoring pelanggan baru memuat artifact ini dan hanya
+# memanggil transform(), sehingga semuanya memakai ruang fitur yang sama.
+ARTIFACT_VERSION = 1
+ARTIFACT_FILE = 'rfm_transform.json'
+FITUR = ['Recency', 'Frequency', 'Monetary']
+
+
+class RFMTransform:
+    def __init__(self, features, mean, scale, fitted_at=None, n_samples=None):
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype='float64')
+        self.scale = np.asarray(scale, dtype='float64')
+        self.fitted_at = fitted_at
+        self.n_samples = n_samples
+
+    @classmethod
+    def fit(cls, rfm, features=FITUR):
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler().fit(np.log1p(rfm[features]))
+        return cls(features, scaler.mean_, scaler.scale_,
+                   fitted_at=dt.datetime.now().isoformat(timespec='seconds'),
+                   n_samples=int(len(rfm)))
+
+    def transform(self, rfm):
+        # Sama persis dengan StandardScaler.transform: (log1p(x) - mean) / scale
+        values = np.log1p(rfm[self.features].to_numpy(dtype='float64'))
+        values -= self.mean
+        values /= self.scale
+        return pd.DataFrame(values, index=rfm.index, columns=self.features)
+
+    @property
+    def fingerprint(self):
+        # Identitas parameter transform (bukan waktu fit), untuk dicatat di
+        # artifact turunan seperti model segmentasi
+        payload = json.dumps([self.features, self.mean.tolist(), self.scale.tolist()])
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def save(self, path=ARTIFACT_FILE):
+        artifact = {
+            'version': ARTIFACT_VERSION,
+            'fingerprint': self.fingerprint,
+            'fitted_at': self.fitted_at,
+            'n_samples': self.n_samples,
+            'features': self.features,
+            'log1p': True,
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+        }
+        with open(path, 'w') as f:
+            json.dump(artifact, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path=ARTIFACT_FILE):
+        with open(path) as f:
+            artifact = json.load(f)
+        if artifact.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Versi artifact '{path}' ({artifact.get('version')}) tidak didukung, "
+                             f"harap jalankan ulang feature_engginering.py")
+        return cls(artifact['features'], artifact['mean'], artifact['scale'],
+                   fitted_at=artifact.get('fitted_at'), n_samples=artifact.get('n_samples'))
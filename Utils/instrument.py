@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import socket
+import resource
+import cProfile
+import threading
+from contextlib import contextmanager
+
+# Instrumentasi per tahap & sub-langkah pipeline. Setiap blok
+#     with step('dedup', rows_in=len(df)) as s:
+#         ...
+#         s.rows_out = len(df_clean)
+# dicatat sebagai SATU baris JSON: wall time, waktu CPU, puncak RSS blok itu
+# saja, baris masuk/keluar, dan path langkah ('clean/read', 'model/fit_k3', ...).
+# Aktif hanya jika MARKET_PULSE_METRICS berisi path file JSON lines; tanpa itu
+# step() hampir tanpa biaya (tidak ada baca /proc, tidak ada tulis file).
+# Environment ikut diwariskan ke proses worker, jadi fit KMeans paralel juga
+# tercatat (file dibuka mode append, satu write per baris).
+#
+# Puncak RSS per langkah TANPA mereset penghitung kernel (VmHWM/ru_maxrss
+# tetap utuh untuk market_pulse --metrics & bench_suite):
+# - thread sampler membaca VmRSS tiap SAMPLING_DETIK selama ada langkah terbuka
+# - jika VmHWM proses naik selama langkah, puncak baru itu pasti terjadi di
+#   langkah tersebut -> dipakai apa adanya (peak_scope='exact')
+# - selain itu puncak = maksimum sampel VmRSS (peak_scope='sampled'), bisa
+#   sedikit di bawah puncak sebenarnya untuk lonjakan < SAMPLING_DETIK
+# Puncak langkah dalam juga dinaikkan ke semua langkah yang sedang terbuka.
+#
+# cProfile opsional per tahap: MARKET_PULSE_PROFILE=model (atau 'clean,rfm' /
+# 'all') -> <MARKET_PULSE_PROFILE_DIR>/<tahap>.prof, buka dengan snakeviz/pstats.
+METRICS_ENV = 'MARKET_PULSE_METRICS'
+PROFILE_ENV = 'MARKET_PULSE_PROFILE'
+PROFILE_DIR_ENV = 'MARKET_PULSE_PROFILE_DIR'
+RUN_ID_ENV = 'MARKET_PULSE_RUN_ID'
+SAMPLING_DETIK = 0.01
+
+_open_steps = []
+_process_peak_kb = 0
+_sampler = None
+_profiling = False
+
+
+class Step:
+    def __init__(self, name, path, rows_in=None):
+        self.name = name
+        self.path = path
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.extra = {}
+        self.peak_kb = 0
+        self.hwm_start_kb = None
+
+    def note(self, **values):
+        # Info tambahan untuk baris JSON (mis. k=3, mode='sampled')
+        self.extra.update(values)
+
+
+def metrics_file():
+    return os.environ.get(METRICS_ENV) or None
+
+
+def _read_status_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _hwm_kb():
+    peak = _read_status_kb('VmHWM:')
+    if peak is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak
+
+
+def process_peak_kb():
+    # Puncak RSS proses: VmHWM kernel, minimal setinggi sampel yang pernah terbaca
+    return max(_hwm_kb(), _process_peak_kb)
+
+
+def _raise_open_peaks(rss_kb=None):
+    # Satu pembacaan RSS berlaku untuk semua langkah yang sedang terbuka
+    global _process_peak_kb
+    rss_kb = rss_kb if rss_kb is not None else _read_status_kb('VmRSS:')
+    if rss_kb is None:
+        return
+    _process_peak_kb = max(_process_peak_kb, rss_kb)
+    for open_step in list(_open_steps):
+        open_step.peak_kb = max(open_step.peak_kb, rss_kb)
+
+
+def _sample_loop(stop):
+    while not stop.wait(SAMPLING_DETIK):
+        if _open_steps:
+            _raise_open_peaks()
+
+
+def _ensure_sampler():
+    # Satu thread daemon per proses, hidup selama proses (hanya jika metrik
+    # aktif); worker hasil fork memulai thread sendiri
+    global _sampler
+    if _sampler is None or not _sampler.is_alive():
+        _sampler = threading.Thread(target=_sample_loop, args=(threading.Event(),),
+                                    name='instrument-rss', daemon=True)
+        _sampler.start()
+
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def write_record(record, path=None):
+    path = path or metrics_file()
+    if not path:
+        return
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+@contextmanager
+def step(name, rows_in=None):
+    path = '/'.join([s.name for s in _open_steps] + [name])
+    current = Step(name, path, rows_in)
+    if not metrics_file():
+        # Nonaktif: tetap memberi objek Step agar kode pemanggil tidak bercabang
+        yield current
+        return
+
+    _raise_open_peaks()
+    current.hwm_start_kb = _hwm_kb()
+    _open_steps.append(current)
+    _ensure_sampler()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    children_start = _children_cpu()
+    status = 'ok'
+    try:
+        yield current
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start + _children_cpu() - children_start
+        _raise_open_peaks()
+        _open_steps.pop()
+        hwm_kb = _hwm_kb()
+        peak_scope = 'sampled'
+        if hwm_kb > current.hwm_start_kb:
+            # Puncak proses yang baru tercapai di dalam langkah ini
+            current.peak_kb = max(current.peak_kb, hwm_kb)
+            peak_scope = 'exact'
+        for open_step in _open_steps:
+            open_step.peak_kb = max(open_step.peak_kb, current.peak_kb)
+        rss_kb = _read_status_kb('VmRSS:')
+        record = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'run_id': os.environ.get(RUN_ID_ENV),
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'step': path,
+            'status': status,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_rss_mb': round(current.peak_kb / 1024, 1),
+            'peak_scope': peak_scope,
+            'rss_mb': round(rss_kb / 1024, 1) if rss_kb is not None else None,
+            'rows_in': current.rows_in,
+            'rows_out': current.rows_out,
+        }
+        record.update(current.extra)
+        write_record(record)
+
+
+def _profile_enabled(name):
+    wanted = os.environ.get(PROFILE_ENV, '')
+    names = {w.strip() for w in wanted.split(',') if w.strip()}
+    return 'all' in names or name in names
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    # Langkah tingkat atas (satu skrip / subcommand) + cProfile opsional.
+    # Tahap bersarang (mis. market_pulse -> skrip) tidak diprofil dua kali.
+    global _profiling
+    with step(name, rows_in) as current:
+        if _profiling or not _profile_enabled(name):
+            yield current
+            return
+        profiler = cProfile.Profile()
+        profile_dir = os.environ.get(PROFILE_DIR_ENV) or '.'
+        os.makedirs(profile_dir, exist_ok=True)
+        profile_file = os.path.join(profile_dir, f'{name}.prof')
+        _profiling = True
+        profiler.enable()
+        try:
+            yield current
+        finally:
+            profiler.disable()
+            _profiling = False
+            profiler.dump_stats(profile_file)
+            current.note(profile=profile_file)
+            print(f"   [profil] cProfile tahap '{name}' disimpan ke '{profile_file}'")
@@ -0,0 +1,157 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from clustering import make_model, CoresetKMeans, StreamingCoreset, UKURAN_CORESET
+from silhouette import (silhouette, BATAS_EXACT, ReservoirSample, StreamingSilhouette,
+                        sample_distance_blocks)
+from instrument import step
+
+# Sweep K-Means untuk banyak kandidat k sekaligus:
+# - tiap k di-fit di proses worker terpisah (ProcessPoolExecutor)
+# - thread BLAS/OpenMP per worker dibatasi agar total thread = jumlah core
+# - SEMUA model hasil fit disimpan, jadi model final cukup diambil dari sini
+#   (tidak perlu fit ulang k yang sama)
+# Algoritma per k dipilih lewat backend (lihat clustering.py).
+# Silhouette dihitung lewat silhouette.py (mode exact per blok / sampled),
+# modenya dipilih lewat silhouette_mode.
+# sweep_kmeans_stream: varian backend coreset untuk data yang tidak muat di
+# RAM, input berupa fungsi yang mengembalikan iterator chunk (iter_table).
+
+
+def _fit_one(X, k, random_state, n_init, backend, backend_options,
+             silhouette_mode, silhouette_kwargs, threads):
+    with step(f'fit_k{k}', rows_in=len(X)) as s, threadpool_limits(limits=threads):
+        model = make_model(k, backend, random_state, n_init, **backend_options).fit(X)
+        s.note(k=k, backend=backend, inertia=float(model.inertia_))
+    if silhouette_mode is None or k < 2:
+        return k, model, None
+    # Silhouette memparalelkan blok dengan thread sendiri, BLAS cukup 1 thread
+    with step(f'silhouette_k{k}', rows_in=len(X)) as s, threadpool_limits(limits=1):
+        result = silhouette(X, model.labels_, mode=silhouette_mode, n_jobs=threads,
+                            random_state=random_state, **silhouette_kwargs)
+        s.note(k=k, mode=result.mode, n_evaluated=result.n_evaluated)
+    return k, model, result
+
+
+class KMeansSweep:
+    def __init__(self, models, silhouette_results):
+        self.models = models                        # {k: model yang sudah di-fit}
+        self.silhouette_results = silhouette_results  # {k: SilhouetteResult atau None}
+
+    @property
+    def silhouette(self):
+        return {k: (r.score if r is not None else None) for k, r in self.silhouette_results.items()}
+
+    @property
+    def silhouette_modes(self):
+        return sorted({r.mode for r in self.silhouette_results.values() if r is not None})
+
+    @property
+    def k_values(self):
+        return sorted(self.models)
+
+    @property
+    def inertia(self):
+        return {k: self.models[k].inertia_ for k in self.k_values}
+
+    def best_k(self):
+        # k dengan silhouette tertinggi (k terkecil jika seri)
+        scored = [k for k in self.k_values if self.silhouette.get(k) is not None]
+        if not scored:
+            raise ValueError("Silhouette tidak dihitung pada sweep ini")
+        return max(scored, key=lambda k: (self.silhouette[k], -k))
+
+    def labels(self, k):
+        return self.models[k].labels_
+
+
+def sweep_kmeans(X, k_values, n_jobs=None, random_state=42, n_init=10,
+                 backend='full', backend_options=None,
+                 silhouette_mode='auto', **silhouette_kwargs):
+    # backend_options diteruskan ke clustering.make_model (batch_size, coreset_size, ...)
+    # silhouette_mode: 'auto' / 'exact' / 'sampled', atau None jika tidak perlu
+    # silhouette_kwargs diteruskan ke silhouette() (sample_size, memory_mb, ...)
+    X = np.asarray(X, dtype='float64')
+    k_values = list(k_values)
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(k_values)))
+    threads = max(1, (os.cpu_count() or 1) // n_jobs)
+
+    args = [(X, k, random_state, n_init, backend, backend_options or {},
+             silhouette_mode, silhouette_kwargs, threads) for k in k_values]
+    if n_jobs == 1:
+        results = [_fit_one(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_fit_one, *zip(*args)))
+
+    models = {k: model for k, model, _ in results}
+    silhouette_results = {k: result for k, _, result in results}
+    return KMeansSweep(models, silhouette_results)
+
+
+def sweep_kmeans_stream(chunks, k_values, random_state=42, n_init=10,
+                        coreset_size=UKURAN_CORESET, silhouette_mode='auto',
+                        sample_size=10_000, confidence=0.95, memory_mb=256):
+    # chunks: fungsi tanpa argumen -> iterator chunk baru (dipanggil 2x)
+    # Lewat 1: SATU coreset (tidak bergantung k) + reservoir sampel silhouette
+    # Fit    : KMeans berbobot per k pada coreset (kecil, cukup satu proses)
+    # Lewat 2: label per chunk untuk semua k -> inertia & ukuran cluster, dan
+    #          jarak sampel x chunk (dihitung sekali, dipakai semua k)
+    # Label per pelanggan tidak disimpan: model.labels_ tidak ada, scoring
+    # hasil akhir dilakukan per chunk lewat model.predict().
+    k_values = list(k_values)
+    if silhouette_mode == 'exact':
+        # Exact = simpan SEMUA titik di reservoir (kuadratik, seluruh data di
+        # RAM) -> bertentangan dengan streaming. Diperlakukan sebagai 'auto':
+        # tetap exact selama data <= BATAS_EXACT, di atas itu sampled.
+        print(f"   > Silhouette 'exact' tidak didukung mode streaming, dipakai 'auto' "
+              f"(exact hingga {BATAS_EXACT} baris).")
+        silhouette_mode = 'auto'
+    reservoir_size = BATAS_EXACT if silhouette_mode == 'auto' else sample_size
+    with step('coreset') as s:
+        coreset = StreamingCoreset(coreset_size, random_state)
+        reservoir = ReservoirSample(reservoir_size, random_state) if silhouette_mode else None
+        for chunk in chunks():
+            chunk = np.asarray(chunk, dtype='float64')
+            coreset.add(chunk)
+            if reservoir is not None:
+                reservoir.add(chunk)
+        s.rows_in = coreset.n_seen
+        s.note(coreset_points=len(coreset.points))
+
+    models = {}
+    for k in k_values:
+        with step(f'fit_k{k}', rows_in=len(coreset.points)) as s:
+            models[k] = CoresetKMeans(k, coreset_size, random_state=random_state,
+                                      n_init=n_init).fit_coreset(coreset)
+            models[k].inertia_ = 0.0
+            s.note(k=k, backend='coreset')
+
+    sample = None
+    if reservoir is not None:
+        sample = reservoir.points
+        if silhouette_mode == 'auto' and coreset.n_seen > BATAS_EXACT:
+            sample = reservoir.subsample(sample_size)
+        trackers = {k: StreamingSilhouette(models[k].predict(sample), k) for k in k_values if k >= 2}
+
+    with step('score', rows_in=coreset.n_seen):
+        for chunk in chunks():
+            chunk = np.asarray(chunk, dtype='float64')
+            labels = {}
+            for k in k_values:
+                labels[k] = models[k].predict(chunk)
+                models[k].inertia_ += float(((chunk - models[k].cluster_centers_[labels[k]]) ** 2).sum())
+            if sample is None:
+                continue
+            for cols, distances in sample_distance_blocks(sample, chunk, memory_mb):
+                for k, tracker in trackers.items():
+                    tracker.add(distances, labels[k][cols])
+
+    silhouette_results = {k: None for k in k_values}
+    if sample is not None:
+        for k, tracker in trackers.items():
+            silhouette_results[k] = tracker.result(confidence)
+    return KMeansSweep(models, silhouette_results)
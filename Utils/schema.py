@@ -0,0 +1,102 @@
+import pandas as pd
+
+from storage import format_of, find_table, iter_table, read_table
+from dates import InvoiceDateParser
+
+# Skema tabel transaksi (hasil cleaning) yang dipakai semua loader.
+# - Teks berulang (StockCode, Description, Country) -> category (dictionary encoding)
+# - Kunci pelanggan & invoice -> int32 (cukup untuk ID 5-7 digit)
+# - InvoiceDate -> datetime64[ns] (disimpan sebagai int64 epoch di memori)
+TRANSACTION_SCHEMA = {
+    'Invoice': 'int32',
+    'StockCode': 'category',
+    'Description': 'category',
+    'Quantity': 'int32',
+    'InvoiceDate': 'datetime64[ns]',
+    'Price': 'float64',
+    'Customer ID': 'int32',
+    'Country': 'category',
+    'TotalAmount': 'float64',
+}
+
+# Tipe saat membaca file mentah online_retail_II.csv: Invoice masih berisi
+# pembatalan 'C...' dan Customer ID masih ada yang kosong (NaN).
+RAW_DTYPES = {
+    'Invoice': 'category',
+    'StockCode': 'category',
+    'Description': 'category',
+    'Quantity': 'int32',
+    'Price': 'float64',
+    'Customer ID': 'float32',
+    'Country': 'category',
+}
+
+
+def csv_dtypes(columns=None):
+    # dtype untuk pd.read_csv pada file transaksi bersih. InvoiceDate (teks atau
+    # epoch) dan Invoice dibiarkan diinfer lalu dirapikan di apply_schema.
+    skip = ('InvoiceDate', 'Invoice')
+    return {col: dtype for col, dtype in TRANSACTION_SCHEMA.items()
+            if col not in skip and (columns is None or col in columns)}
+
+
+def apply_schema(df, date_parser=None):
+    # Ubah kolom yang ada di df ke tipe TRANSACTION_SCHEMA (kolom lain dibiarkan).
+    # date_parser bisa dipakai ulang antar chunk agar format tanggal dideteksi sekali.
+    converted = {}
+    for col, dtype in TRANSACTION_SCHEMA.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if col == 'Invoice':
+            # Setelah cleaning semua invoice berupa angka; jika masih ada
+            # kode huruf, simpan sebagai category saja
+            invoice = pd.to_numeric(df[col].astype(str), errors='coerce')
+            if invoice.isna().any():
+                converted[col] = df[col].astype('category')
+            else:
+                converted[col] = invoice.astype('int32')
+        elif dtype == 'datetime64[ns]':
+            converted[col] = (date_parser or InvoiceDateParser()).parse(df[col])
+        else:
+            converted[col] = df[col].astype(dtype)
+    return df.assign(**converted) if converted else df
+
+
+def read_transactions(name, columns=None):
+    # Loader tabel transaksi bersih dengan skema ringkas, untuk format apa pun
+    if format_of(find_table(name)) == 'csv':
+        df = read_table(name, columns=columns, dtype=csv_dtypes(columns))
+    else:
+        df = read_table(name, columns=columns)
+    return apply_schema(df)
+
+
+def iter_transactions(name, columns=None, chunksize=500_000):
+    # Versi per chunk dari read_transactions
+    if format_of(find_table(name)) == 'csv':
+        chunks = iter_table(name, chunksize, columns=columns, dtype=csv_dtypes(columns))
+    else:
+        chunks = iter_table(name, chunksize, columns=columns)
+    date_parser = InvoiceDateParser()
+    for chunk in chunks:
+        yield apply_schema(chunk, date_parser)
+
+
+def memory_report(df):
+    # Laporan byte per kolom (termasuk isi string, deep=True)
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': usage,
+        'bytes_per_row': usage / max(len(df), 1),
+    })
+    report.loc['TOTAL'] = ['', usage.sum(), usage.sum() / max(len(df), 1)]
+    return report
+
+
+def print_memory_report(df, title="Memori per kolom"):
+    print(f"   - {title}:")
+    report = memory_report(df)
+    for col, row in report.iterrows():
+        print(f"       {str(col):<12} {row['dtype']:<15} {row['bytes'] / 1024 ** 2:10.2f} MB"
+              f"  ({row['bytes_per_row']:.1f} B/baris)")
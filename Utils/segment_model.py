@@ -0,0 +1,92 @@
+import json
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from feature_transform import ARTIFACT_FILE, RFMTransform
+
+# Artifact model segmentasi: centroid cluster (di ruang fitur hasil
+# RFMTransform) + fingerprint transform yang dipakai saat modeling.
+# SegmentScorer memuat keduanya SEKALI, lalu menempatkan pelanggan baru ke
+# segment dengan centroid terdekat (vektor, per batch) tanpa fit ulang.
+MODEL_VERSION = 1
+MODEL_FILE = 'segment_model.json'
+
+
+def save_segment_model(model, path=MODEL_FILE, transform=None, backend='full', cluster_sizes=None):
+    # cluster_sizes: wajib jika model tidak punya labels_ (scoring streaming)
+    if cluster_sizes is None:
+        cluster_sizes = np.bincount(model.labels_, minlength=len(model.cluster_centers_)).tolist()
+    artifact = {
+        'version': MODEL_VERSION,
+        'fitted_at': dt.datetime.now().isoformat(timespec='seconds'),
+        'backend': backend,
+        'n_clusters': int(len(model.cluster_centers_)),
+        'transform_fingerprint': transform.fingerprint if transform is not None else None,
+        'features': transform.features if transform is not None else None,
+        'centroids': np.asarray(model.cluster_centers_, dtype='float64').tolist(),
+        'cluster_sizes': [int(n) for n in cluster_sizes],
+    }
+    with open(path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+    return path
+
+
+def load_segment_model(path=MODEL_FILE):
+    with open(path) as f:
+        artifact = json.load(f)
+    if artifact.get('version') != MODEL_VERSION:
+        raise ValueError(f"Versi model '{path}' ({artifact.get('version')}) tidak didukung, "
+                         f"harap jalankan ulang modeling")
+    return artifact
+
+
+class SegmentScorer:
+    def __init__(self, transform, centroids):
+        self.transform = transform
+        self.centroids = np.asarray(centroids, dtype='float64')
+        self._centroid_sq = (self.centroids ** 2).sum(axis=1)
+
+    @classmethod
+    def load(cls, transform_file=ARTIFACT_FILE, model_file=MODEL_FILE):
+        transform = RFMTransform.load(transform_file)
+        model = load_segment_model(model_file)
+        expected = model.get('transform_fingerprint')
+        if expected is not None and expected != transform.fingerprint:
+            raise ValueError(f"Transform '{transform_file}' ({transform.fingerprint}) tidak sama dengan "
+                             f"yang dipakai saat modeling ({expected})")
+        return cls(transform, model['centroids'])
+
+    def invalid_rows(self, rfm):
+        # Mask baris yang tidak bisa di-scoring: R/F/M kosong (NaN), bukan
+        # angka, tak hingga, atau negatif (log1p negatif -> NaN / -inf)
+        values = rfm[self.transform.features].apply(pd.to_numeric, errors='coerce').to_numpy('float64')
+        return ~(np.isfinite(values) & (values >= 0)).all(axis=1)
+
+    def assign(self, rfm):
+        bad = self.invalid_rows(rfm)
+        if bad.any():
+            sample = list(rfm.index[bad][:5])
+            raise ValueError(f"{int(bad.sum())} baris dengan {'/'.join(self.transform.features)} "
+                             f"NaN atau negatif (baris {sample})")
+        # Nearest centroid: |x|^2 - 2 x.c + |c|^2, argmin per baris
+        X = self.transform.transform(rfm).to_numpy()
+        dist = self._centroid_sq[None, :] - 2.0 * (X @ self.centroids.T)
+        dist += (X ** 2).sum(axis=1)[:, None]
+        labels = dist.argmin(axis=1)
+        return labels, np.sqrt(np.maximum(dist[np.arange(len(X)), labels], 0))
+
+    def score(self, rfm):
+        # DataFrame RFM -> salinan dengan kolom Cluster & DistanceToCentroid
+        labels, distance = self.assign(rfm)
+        return rfm.assign(Cluster=labels, DistanceToCentroid=distance)
+
+    def score_records(self, records):
+        # Untuk HTTP: list of dict -> list of dict
+        df = pd.DataFrame.from_records(records)
+        missing = [c for c in self.transform.features if c not in df.columns]
+        if missing:
+            raise ValueError(f"Kolom wajib tidak ada: {missing}")
+        scored = self.score(df)
+        return scored.to_dict(orient='records')
@@ -0,0 +1,220 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+# Silhouette yang bisa dipakai untuk jumlah pelanggan besar.
+# sklearn.silhouette_score membangun matriks jarak n x n sekaligus; di sini
+# jarak dihitung per BLOK baris (blok x n) lalu langsung direduksi jadi jumlah
+# jarak per cluster (blok x K), sehingga memori dibatasi memory_mb.
+#
+# Mode:
+# - 'exact'   : semua baris dievaluasi, blok dikerjakan paralel (thread;
+#               numpy melepas GIL saat perkalian matriks)
+# - 'sampled' : sampel berstrata per cluster, tiap titik sampel tetap dihitung
+#               terhadap SELURUH data -> estimasi tak bias + confidence interval
+# - 'auto'    : exact jika n <= BATAS_EXACT, selain itu sampled
+SILHOUETTE_MODES = ('auto', 'exact', 'sampled')
+BATAS_EXACT = 50_000
+
+
+class SilhouetteResult:
+    def __init__(self, score, mode, n_evaluated, ci=None):
+        self.score = score
+        self.mode = mode
+        self.n_evaluated = n_evaluated
+        self.ci = ci              # (bawah, atas) untuk mode sampled
+
+    def describe(self):
+        if self.ci is None:
+            return f"{self.score:.4f} ({self.mode}, n={self.n_evaluated})"
+        return (f"{self.score:.4f} ({self.mode}, n={self.n_evaluated}, "
+                f"CI [{self.ci[0]:.4f}, {self.ci[1]:.4f}])")
+
+
+def _block_rows(n, memory_mb, n_jobs):
+    # Tiap blok butuh ~2 matriks float64 (blok x n) sekaligus, per thread
+    return max(1, int(memory_mb * 1024 ** 2 // (16 * max(n, 1) * n_jobs)))
+
+
+def _cluster_distance_sums(X, sq_norms, onehot, rows):
+    # Jumlah jarak euclid dari tiap baris `rows` ke semua titik, per cluster
+    d = sq_norms[rows, None] + sq_norms[None, :] - 2.0 * (X[rows] @ X.T)
+    np.maximum(d, 0, out=d)
+    np.sqrt(d, out=d)
+    d[np.arange(len(rows)), rows] = 0.0   # jarak ke diri sendiri persis 0
+    return d @ onehot
+
+
+def _silhouette_values(sums, labels, counts):
+    idx = np.arange(len(labels))
+    own_size = counts[labels]
+    a = sums[idx, labels] / np.maximum(own_size - 1, 1)
+
+    mean_other = sums / counts
+    mean_other[idx, labels] = np.inf
+    b = mean_other.min(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = (b - a) / np.maximum(a, b)
+    s[own_size == 1] = 0.0                 # konvensi sklearn untuk cluster 1 anggota
+    return np.nan_to_num(s)
+
+
+def silhouette_samples_blocked(X, labels, rows=None, memory_mb=256, n_jobs=None):
+    # Nilai silhouette per baris untuk `rows` (default semua baris)
+    X = np.ascontiguousarray(X, dtype='float64')
+    _, labels = np.unique(labels, return_inverse=True)
+    counts = np.bincount(labels).astype('float64')
+    if len(counts) < 2:
+        raise ValueError("Silhouette butuh minimal 2 cluster")
+
+    rows = np.arange(len(X)) if rows is None else np.asarray(rows)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    onehot = np.zeros((len(X), len(counts)))
+    onehot[np.arange(len(X)), labels] = 1.0
+    sq_norms = np.einsum('ij,ij->i', X, X)
+
+    step = _block_rows(len(X), memory_mb, n_jobs)
+    blocks = [rows[i:i + step] for i in range(0, len(rows), step)]
+
+    def work(block):
+        return _silhouette_values(_cluster_distance_sums(X, sq_norms, onehot, block),
+                                  labels[block], counts)
+
+    if n_jobs == 1 or len(blocks) == 1:
+        parts = [work(b) for b in blocks]
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(work, blocks))
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def silhouette_exact(X, labels, memory_mb=256, n_jobs=None):
+    values = silhouette_samples_blocked(X, labels, memory_mb=memory_mb, n_jobs=n_jobs)
+    return SilhouetteResult(float(values.mean()), 'exact', len(values))
+
+
+def silhouette_sampled(X, labels, sample_size=10_000, confidence=0.95,
+                       memory_mb=256, n_jobs=None, random_state=42):
+    # Sampel berstrata: tiap cluster dapat jatah sebanding ukurannya (min 2 titik),
+    # skor = rata-rata berbobot per cluster, CI dari varians berstrata (dengan
+    # koreksi populasi terbatas)
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(random_state)
+    n = len(labels)
+    clusters, inverse = np.unique(labels, return_inverse=True)
+    members = [np.flatnonzero(inverse == c) for c in range(len(clusters))]
+
+    picks = []
+    for idx in members:
+        m = min(len(idx), max(2, round(sample_size * len(idx) / n)))
+        picks.append(np.sort(rng.choice(idx, size=m, replace=False)))
+    rows = np.concatenate(picks)
+    values = silhouette_samples_blocked(X, labels, rows=rows, memory_mb=memory_mb, n_jobs=n_jobs)
+
+    score, variance, start = 0.0, 0.0, 0
+    for idx, pick in zip(members, picks):
+        v = values[start:start + len(pick)]
+        start += len(pick)
+        w = len(idx) / n
+        score += w * v.mean()
+        if len(pick) > 1:
+            fpc = 1 - len(pick) / len(idx)
+            variance += w ** 2 * v.var(ddof=1) / len(pick) * fpc
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half = z * variance ** 0.5
+    return SilhouetteResult(float(score), 'sampled', len(rows), ci=(score - half, score + half))
+
+
+def silhouette(X, labels, mode='auto', sample_size=10_000, confidence=0.95,
+               memory_mb=256, n_jobs=None, random_state=42):
+    if mode not in SILHOUETTE_MODES:
+        raise ValueError(f"Mode silhouette '{mode}' tidak dikenal. Pilihan: {SILHOUETTE_MODES}")
+    if mode == 'auto':
+        mode = 'exact' if len(labels) <= BATAS_EXACT else 'sampled'
+    if mode == 'exact':
+        return silhouette_exact(X, labels, memory_mb=memory_mb, n_jobs=n_jobs)
+    return silhouette_sampled(X, labels, sample_size=sample_size, confidence=confidence,
+                              memory_mb=memory_mb, n_jobs=n_jobs, random_state=random_state)
+
+
+class ReservoirSample:
+    # Sampel acak sederhana berukuran tetap dari data yang datang per chunk:
+    # tiap baris dapat kunci acak, yang disimpan = `size` kunci terkecil.
+    # size=None -> semua baris disimpan.
+    def __init__(self, size, random_state=42):
+        self.size = size
+        self.rng = np.random.default_rng(random_state)
+        self.points = None
+        self.keys = np.empty(0)
+        self.n_seen = 0
+
+    def add(self, chunk):
+        chunk = np.asarray(chunk, dtype='float64')
+        self.n_seen += len(chunk)
+        keys = np.concatenate([self.keys, self.rng.random(len(chunk))])
+        points = chunk if self.points is None else np.vstack([self.points, chunk])
+        if self.size is not None and len(keys) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size)[:self.size])
+            points, keys = points[keep], keys[keep]
+        self.points, self.keys = points, keys
+        return self
+
+    def subsample(self, size):
+        # `size` kunci terkecil tetap sampel acak sederhana dari seluruh data
+        if len(self.keys) <= size:
+            return self.points
+        return self.points[np.sort(np.argpartition(self.keys, size)[:size])]
+
+
+def sample_distance_blocks(sample, chunk, memory_mb=256):
+    # Jarak euclid sampel x chunk, per blok kolom (memori ~memory_mb):
+    # generator (slice kolom chunk, matriks jarak)
+    sample = np.ascontiguousarray(sample, dtype='float64')
+    chunk = np.ascontiguousarray(chunk, dtype='float64')
+    sq_sample = np.einsum('ij,ij->i', sample, sample)
+    step = _block_rows(len(sample), memory_mb, 1)
+    for i in range(0, len(chunk), step):
+        block = chunk[i:i + step]
+        d = sq_sample[:, None] + np.einsum('ij,ij->i', block, block)[None, :] - 2.0 * (sample @ block.T)
+        np.maximum(d, 0, out=d)
+        np.sqrt(d, out=d)
+        yield slice(i, i + len(block)), d
+
+
+class StreamingSilhouette:
+    # Silhouette titik sampel terhadap SELURUH data yang dibaca per chunk:
+    # jarak sampel x chunk langsung direduksi jadi jumlah per cluster, jadi
+    # data lengkap tidak pernah ada di memori. Matriks jarak yang sama bisa
+    # dipakai untuk beberapa k (add dipanggil sekali per k per blok).
+    def __init__(self, sample_labels, n_clusters):
+        self.sample_labels = np.asarray(sample_labels)
+        self.n_clusters = n_clusters
+        self.sums = np.zeros((len(self.sample_labels), n_clusters))
+        self.counts = np.zeros(n_clusters)
+
+    def add(self, distances, labels):
+        onehot = np.zeros((len(labels), self.n_clusters))
+        onehot[np.arange(len(labels)), labels] = 1.0
+        self.sums += distances @ onehot
+        self.counts += np.bincount(labels, minlength=self.n_clusters)
+
+    def result(self, confidence=0.95):
+        # Cluster kosong dibuang; skor = rata-rata sampel, CI sampel acak
+        # sederhana (dengan koreksi populasi terbatas)
+        used = np.flatnonzero(self.counts > 0)
+        if len(used) < 2:
+            raise ValueError("Silhouette butuh minimal 2 cluster")
+        remap = np.full(self.n_clusters, -1)
+        remap[used] = np.arange(len(used))
+        values = _silhouette_values(self.sums[:, used], remap[self.sample_labels], self.counts[used])
+        n, m = int(self.counts.sum()), len(values)
+        if m >= n:
+            return SilhouetteResult(float(values.mean()), 'exact', m)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half = z * (values.var(ddof=1) / m * (1 - m / n)) ** 0.5 if m > 1 else 0.0
+        score = float(values.mean())
+        return SilhouetteResult(score, 'sampled', m, ci=(score - half, score + half))
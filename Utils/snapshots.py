@@ -0,0 +1,70 @@
+import pandas as pd
+
+from storage import iter_table, read_table, table_columns
+
+# RFM per tanggal snapshot (rfm_snapshots, format panjang: satu baris per
+# SnapshotDate x pelanggan, dibuat oleh Data Exploration/rfm_snapshots.py).
+# Tahap feature & modeling memakai satu snapshot saja lewat read_rfm();
+# tabel RFM biasa (rfm_data, tanpa kolom SnapshotDate) tetap dibaca apa adanya.
+# iter_rfm() = versi per chunk (chunk berukuran tetap, untuk scoring streaming).
+SNAPSHOT_COLUMN = 'SnapshotDate'
+
+
+def select_snapshot(rfm, snapshot_date=None):
+    # snapshot_date=None -> snapshot terakhir
+    dates = pd.to_datetime(rfm[SNAPSHOT_COLUMN])
+    target = dates.max() if snapshot_date is None else pd.Timestamp(snapshot_date).normalize()
+    mask = (dates == target).to_numpy()
+    if not mask.any():
+        available = ', '.join(d.strftime('%Y-%m-%d') for d in dates.drop_duplicates().sort_values())
+        raise ValueError(f"Snapshot {target:%Y-%m-%d} tidak ada. Pilihan: {available}")
+    return rfm[mask].drop(columns=SNAPSHOT_COLUMN), target
+
+
+def read_rfm(name, snapshot_date=None):
+    # Tabel RFM (index: Customer ID) dari rfm_data atau satu snapshot rfm_snapshots
+    rfm = read_table(name)
+    if SNAPSHOT_COLUMN in rfm.columns:
+        rfm, target = select_snapshot(rfm, snapshot_date)
+        print(f"   - Snapshot RFM per {target:%Y-%m-%d}: {len(rfm)} pelanggan")
+    elif snapshot_date is not None:
+        raise ValueError(f"'{name}' bukan tabel snapshot (tidak ada kolom {SNAPSHOT_COLUMN}).")
+    if 'Customer ID' in rfm.columns:
+        rfm = rfm.set_index('Customer ID')
+    return rfm
+
+
+def _rechunk(chunks, chunksize):
+    # Potong ulang iterator DataFrame jadi chunk tepat `chunksize` baris
+    buffer, n = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        n += len(chunk)
+        while n >= chunksize:
+            merged = pd.concat(buffer)
+            yield merged.iloc[:chunksize]
+            buffer, n = [merged.iloc[chunksize:]], n - chunksize
+    if n:
+        yield pd.concat(buffer)
+
+
+def iter_rfm(name, chunksize=100_000, snapshot_date=None):
+    columns = table_columns(name)
+    if SNAPSHOT_COLUMN in columns:
+        if snapshot_date is None:
+            # Snapshot terakhir: satu lewat kolom SnapshotDate saja
+            target = max(pd.to_datetime(c[SNAPSHOT_COLUMN]).max()
+                         for c in iter_table(name, chunksize, columns=[SNAPSHOT_COLUMN]))
+        else:
+            target = pd.Timestamp(snapshot_date).normalize()
+        chunks = (c[(pd.to_datetime(c[SNAPSHOT_COLUMN]) == target).to_numpy()].drop(columns=SNAPSHOT_COLUMN)
+                  for c in iter_table(name, chunksize))
+        print(f"   - Snapshot RFM per {target:%Y-%m-%d} (per chunk)")
+    elif snapshot_date is not None:
+        raise ValueError(f"'{name}' bukan tabel snapshot (tidak ada kolom {SNAPSHOT_COLUMN}).")
+    else:
+        chunks = iter_table(name, chunksize)
+    for chunk in _rechunk(chunks, chunksize):
+        if 'Customer ID' in chunk.columns:
+            chunk = chunk.set_index('Customer ID')
+        yield chunk
@@ -0,0 +1,116 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+# Cache tahap pipeline berbasis hash isi (content-addressed):
+# - tiap file output disimpan SEKALI di store/objects/<hash>, apa pun nama
+#   folder atau tahapnya (tidak ada lagi salinan rfm_data.csv per folder)
+# - fingerprint tahap = hash(nama tahap + isi kode + parameter + hash input);
+#   store/stages/<fingerprint>.json mencatat output -> hash objek
+# - jika fingerprint sudah ada, tahap dilewati dan output cukup dipulihkan
+# Hash file diingat per (path, ukuran, mtime) di store/digests.json agar file
+# besar yang tidak berubah tidak di-hash ulang tiap run.
+STORE_DEFAULT = '.mp_store'
+UKURAN_BLOK_HASH = 1 << 20
+
+
+class StageCache:
+    def __init__(self, store_dir=STORE_DEFAULT):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.stages_dir = os.path.join(store_dir, 'stages')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.stages_dir, exist_ok=True)
+        self._digest_file = os.path.join(store_dir, 'digests.json')
+        self._digests = {}
+        if os.path.exists(self._digest_file):
+            with open(self._digest_file) as f:
+                self._digests = json.load(f)
+
+    # --- hash file ---
+    def file_digest(self, path):
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        cached = self._digests.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(UKURAN_BLOK_HASH), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self._digests[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def save_digests(self):
+        tmp = self._digest_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._digests, f)
+        os.replace(tmp, self._digest_file)
+
+    # --- fingerprint & manifest tahap ---
+    @staticmethod
+    def fingerprint(name, code_digests, params, input_digests):
+        payload = json.dumps({'stage': name, 'code': code_digests, 'params': params,
+                              'inputs': input_digests}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _manifest_path(self, fingerprint):
+        return os.path.join(self.stages_dir, fingerprint + '.json')
+
+    def lookup(self, fingerprint):
+        # Manifest {nama_output: hash} jika tahap ini pernah dijalankan dan
+        # semua objeknya masih ada di store; None jika belum
+        path = self._manifest_path(fingerprint)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            manifest = json.load(f)
+        if not all(os.path.exists(self._object_path(d)) for d in manifest['outputs'].values()):
+            return None
+        return manifest
+
+    # --- objek ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def store(self, fingerprint, stage_name, outputs):
+        # outputs: {nama_output: path file di workdir}
+        manifest = {'stage': stage_name, 'outputs': {}}
+        for name, path in outputs.items():
+            digest = self.file_digest(path)
+            obj = self._object_path(digest)
+            if not os.path.exists(obj):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                # Salin ke file sementara lalu rename agar objek tidak pernah setengah jadi
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(obj))
+                os.close(fd)
+                shutil.copyfile(path, tmp)
+                os.replace(tmp, obj)
+            manifest['outputs'][name] = digest
+        with open(self._manifest_path(fingerprint), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def restore(self, manifest, paths):
+        # Pulihkan output ke workdir; file yang isinya sudah sama tidak disalin
+        restored = 0
+        for name, digest in manifest['outputs'].items():
+            path = paths[name]
+            if os.path.exists(path) and self.file_digest(path) == digest:
+                continue
+            shutil.copyfile(self._object_path(digest), path)
+            stat = os.stat(path)
+            self._digests[os.path.abspath(path)] = {'size': stat.st_size,
+                                                    'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+            restored += 1
+        return restored
+
+    def disk_bytes(self):
+        total = 0
+        for root, _, files in os.walk(self.objects_dir):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
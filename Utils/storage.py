@@ -0,0 +1,221 @@
+import os
+import sys
+
+import pandas as pd
+
+# Format file antar tahap pipeline. CSV tetap default (dan tetap bisa dipakai
+# untuk export), Parquet/Feather menyimpan tipe data (datetime, int) apa adanya
+# sehingga tahap berikutnya tidak perlu parsing ulang.
+# Pilih format lewat environment variable, contoh: MARKET_PULSE_FORMAT=parquet
+FORMAT_ENV = 'MARKET_PULSE_FORMAT'
+EKSTENSI = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+
+def output_format(fmt=None):
+    fmt = (fmt or os.environ.get(FORMAT_ENV) or 'csv').lower()
+    if fmt not in EKSTENSI:
+        raise ValueError(f"Format '{fmt}' tidak dikenal. Pilihan: {', '.join(EKSTENSI)}")
+    return fmt
+
+
+def format_of(path):
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in EKSTENSI.items():
+        if ext == fmt_ext:
+            return fmt
+    return None
+
+
+def table_path(stem, fmt=None):
+    # 'rfm_data' -> 'rfm_data.csv' / 'rfm_data.parquet' sesuai format output
+    return stem + EKSTENSI[output_format(fmt)]
+
+
+def find_table(name):
+    # Terima nama file lengkap ('rfm_data.csv') atau stem ('rfm_data').
+    # Jika ada beberapa format untuk stem yang sama, ambil yang paling baru
+    # agar file CSV lama tidak menutupi hasil Parquet terbaru (dan sebaliknya).
+    if format_of(name) and os.path.exists(name):
+        return name
+    stem = os.path.splitext(name)[0] if format_of(name) else name
+    candidates = [stem + ext for ext in EKSTENSI.values() if os.path.exists(stem + ext)]
+    if not candidates:
+        raise FileNotFoundError(f"File '{name}' tidak ditemukan (csv/parquet/feather).")
+    return max(candidates, key=os.path.getmtime)
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(f"Format {fmt} butuh pyarrow. Install dengan: pip install pyarrow") from e
+
+
+def table_columns(name):
+    # Nama kolom tanpa membaca isi file
+    path = find_table(name)
+    fmt = format_of(path)
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    _require_pyarrow(fmt)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    import pyarrow.feather as feather
+    return list(feather.read_table(path, memory_map=True).schema.names)
+
+
+def read_table(name, columns=None, index_col=None, parse_dates=None, **csv_kwargs):
+    # Baca tabel dari format apa pun. `columns` = proyeksi kolom (hanya kolom
+    # ini yang dibaca dari disk), `parse_dates` hanya berlaku untuk CSV karena
+    # format kolumnar sudah menyimpan datetime.
+    path = find_table(name)
+    fmt = format_of(path)
+
+    if fmt == 'csv':
+        if columns is not None and isinstance(index_col, str) and index_col not in columns:
+            columns = [index_col] + list(columns)
+        return pd.read_csv(path, usecols=columns, index_col=index_col,
+                           parse_dates=parse_dates, **csv_kwargs)
+
+    _require_pyarrow(fmt)
+    if isinstance(index_col, str) and columns is not None and index_col not in columns:
+        columns = [index_col] + list(columns)
+    if fmt == 'parquet':
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_feather(path, columns=columns)
+
+    if index_col is not None:
+        if isinstance(index_col, int):
+            index_col = df.columns[index_col]
+        df = df.set_index(index_col)
+    return df
+
+
+def iter_table(name, chunksize=500_000, columns=None, parse_dates=None, **csv_kwargs):
+    # Baca tabel per chunk (untuk file yang lebih besar dari RAM)
+    path = find_table(name)
+    fmt = format_of(path)
+
+    if fmt == 'csv':
+        yield from pd.read_csv(path, usecols=columns, parse_dates=parse_dates,
+                               chunksize=chunksize, **csv_kwargs)
+        return
+
+    _require_pyarrow(fmt)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        import pyarrow as pa
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        df = batch.to_pandas()
+        yield df[columns] if columns is not None else df
+
+
+def write_table(df, path, index=False):
+    # Index disimpan sebagai kolom biasa di format kolumnar, supaya bentuk
+    # file sama dengan CSV (kolom pertama = 'Customer ID').
+    fmt = format_of(path)
+    if fmt is None:
+        raise ValueError(f"Ekstensi file '{path}' tidak dikenal.")
+
+    if fmt == 'csv':
+        df.to_csv(path, index=index)
+        return path
+
+    _require_pyarrow(fmt)
+    df_out = df.reset_index() if index else df.reset_index(drop=True)
+    if fmt == 'parquet':
+        df_out.to_parquet(path, index=False)
+    else:
+        df_out.to_feather(path)
+    return path
+
+
+def _normalise_dictionaries(table):
+    # Kolom category -> dictionary dengan index int32 di SEMUA chunk. Pandas
+    # memilih int8/int16 sesuai jumlah kategori per chunk, sehingga chunk
+    # berikutnya dengan kategori lebih banyak tidak bisa di-cast ke skema chunk 1.
+    import pyarrow as pa
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type) and field.type.index_type != pa.int32():
+            field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type, field.type.ordered))
+        fields.append(field)
+    schema = pa.schema(fields, metadata=table.schema.metadata)
+    return table if schema == table.schema else table.cast(schema)
+
+
+def _unify_schema(writer_schema, chunk_schema, path):
+    # Skema file parquet sudah tetap sejak chunk pertama: chunk baru harus bisa
+    # disatukan ke skema itu (mis. kolom null di satu chunk), bukan sebaliknya
+    import pyarrow as pa
+    try:
+        unified = pa.unify_schemas([writer_schema, chunk_schema], promote_options='permissive')
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Skema chunk tidak cocok dengan '{path}': {e}") from e
+    if not unified.equals(writer_schema):
+        raise ValueError(f"Tipe kolom chunk berubah dan tidak muat di skema '{path}':\n"
+                         f"{chunk_schema}\nvs\n{writer_schema}")
+    return writer_schema
+
+
+class TableWriter:
+    # Penulis tabel per chunk (streaming). CSV: append dengan header sekali.
+    # Parquet: satu file dengan banyak row group. Feather tidak mendukung append.
+    def __init__(self, path):
+        self.path = path
+        self.fmt = format_of(path)
+        if self.fmt == 'feather':
+            raise ValueError("Mode streaming tidak mendukung Feather, gunakan csv atau parquet.")
+        if self.fmt is None:
+            raise ValueError(f"Ekstensi file '{path}' tidak dikenal.")
+        self._writer = None
+        self._n_chunk = 0
+
+    def write(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self.path, mode='w' if self._n_chunk == 0 else 'a',
+                      header=(self._n_chunk == 0), index=False)
+        else:
+            _require_pyarrow(self.fmt)
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = _normalise_dictionaries(pa.Table.from_pandas(df, preserve_index=False))
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            elif table.schema != self._writer.schema:
+                table = table.cast(_unify_schema(self._writer.schema, table.schema, self.path))
+            self._writer.write_table(table)
+        self._n_chunk += 1
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Konversi/export antar format, contoh:
+    #   python storage.py rfm_data.parquet rfm_data.csv
+    if len(sys.argv) != 3:
+        print("Pemakaian: python storage.py <file_input> <file_output>")
+        sys.exit(1)
+    src, dst = sys.argv[1], sys.argv[2]
+    parse_dates = ['InvoiceDate'] if 'InvoiceDate' in table_columns(src) else None
+    write_table(read_table(src, parse_dates=parse_dates), dst)
+    print(f"SUKSES! '{src}' diekspor ke '{dst}'")
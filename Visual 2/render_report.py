@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Backend non-interaktif HARUS dipasang sebelum pyplot di-import (termasuk
+# lewat modul visualisasi di bawah), supaya tidak ada jendela yang memblokir
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from feature_transform import ARTIFACT_FILE, RFMTransform
+from instrument import stage, step
+from tdigest import SKETCH_FILE
+from visualisasi_hasil import (load_segmentation, plot_cluster_size, plot_profiling,
+                               plot_snake, plot_scatter, rfm_sketches)
+from visualisasi_pca import plot_pca
+from visualisasi_3D import plot_3d
+
+# Render semua grafik Visual sekaligus (mode headless):
+# - hasil_segmentasi_final & transform dimuat SEKALI, lalu dikirim sekali ke
+#   tiap worker lewat initializer (bukan per grafik)
+# - sketch kuantil R/F/M (batas sumbu) juga dibuat/dimuat sekali di proses utama
+# - tiap grafik dirender di proses worker, figure langsung ditutup
+# - waktu render per grafik dilaporkan
+# - output_dir: folder tujuan PNG (default: folder kerja)
+FIGURES = {
+    'cluster_size': lambda df, t, o: plot_cluster_size(df, _out('vis_1_cluster_size.png')),
+    'profiling': lambda df, t, o: plot_profiling(df, _out('vis_2_profiling_boxplot.png'), _sketches),
+    'snake': lambda df, t, o: plot_snake(df, t, _out('vis_3_snake_plot.png')),
+    'scatter': lambda df, t, o: plot_scatter(df, _out('vis_4_scatter.png'), sketches=_sketches, **o),
+    'pca': lambda df, t, o: plot_pca(df, t, _out('vis_pca_2d.png'), **o),
+    '3d': lambda df, t, o: plot_3d(df, _out('visualisasi_3d.png')),
+}
+
+_df = None
+_transform = None
+_options = {}
+_output_dir = ''
+_sketches = None
+
+
+def _out(name):
+    return os.path.join(_output_dir, name)
+
+
+def _init_worker(df, transform, options, output_dir='', sketches=None):
+    global _df, _transform, _options, _output_dir, _sketches
+    _df, _transform, _options, _output_dir = df, transform, options, output_dir
+    _sketches = sketches
+
+
+def _render(name):
+    # Gaya grafik di-reset per figure agar style satu grafik tidak bocor ke grafik lain
+    plt.rcdefaults()
+    start = time.perf_counter()
+    with step(name, rows_in=len(_df)):
+        FIGURES[name](_df, _transform, _options)
+    return name, time.perf_counter() - start
+
+
+def render_report(n_jobs=None, figures=None, plot_mode='auto', blend=True,
+                  input_name='hasil_segmentasi_final', transform_file=ARTIFACT_FILE, output_dir='',
+                  sketch_file=SKETCH_FILE):
+    figures = list(figures or FIGURES)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    print("1. Membaca Data Hasil Segmentasi (sekali untuk semua grafik)...")
+    try:
+        df = load_segmentation(input_name)
+        transform = RFMTransform.load(transform_file)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}. Jalankan feature engineering & modeling dulu.")
+        return None
+    sketches = rfm_sketches(df, sketch_file)
+
+    # Opsi scatter/PCA: titik per pelanggan atau density grid (lihat density.py)
+    options = {'mode': plot_mode, 'blend': blend}
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(figures)))
+    print(f"2. Merender {len(figures)} grafik dengan {n_jobs} proses...")
+    start = time.perf_counter()
+    timings = {}
+    if n_jobs == 1:
+        _init_worker(df, transform, options, output_dir, sketches)
+        for name in figures:
+            name, elapsed = _render(name)
+            timings[name] = elapsed
+            print(f"   > {name:<13} {elapsed:7.3f} s")
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(df, transform, options, output_dir, sketches)) as pool:
+            futures = [pool.submit(_render, name) for name in figures]
+            for future in as_completed(futures):
+                name, elapsed = future.result()
+                timings[name] = elapsed
+                print(f"   > {name:<13} {elapsed:7.3f} s")
+    total = time.perf_counter() - start
+
+    print(f"\nSELESAI! {len(figures)} grafik dalam {total:.3f} s "
+          f"(jumlah waktu render {sum(timings.values()):.3f} s)")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render semua grafik hasil segmentasi secara paralel")
+    parser.add_argument('--jobs', type=int, default=0, help="Jumlah proses render (0 = semua core)")
+    parser.add_argument('--figures', nargs='*', choices=list(FIGURES), default=None,
+                        help="Grafik yang dirender (default: semua)")
+    parser.add_argument('--plot-mode', choices=['auto', 'points', 'density'], default='auto',
+                        help="Scatter & PCA per titik atau density grid (auto: density jika data besar)")
+    parser.add_argument('--no-blend', action='store_true',
+                        help="Mode density: warna sel = cluster dominan (tanpa campuran warna)")
+    parser.add_argument('--sketch-file', default=SKETCH_FILE,
+                        help="Sketch kuantil R/F/M untuk batas sumbu (dibuat dari data jika tidak cocok)")
+    args = parser.parse_args()
+    with stage('visualize'):
+        render_report(args.jobs, args.figures, args.plot_mode, blend=not args.no_blend,
+                      sketch_file=args.sketch_file)
@@ -1,27 +1,28 @@
+import os
+import sys
+import argparse
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import seaborn as sns
 
-def show_3d_cluster():
-    print("Membaca data hasil segmentasi...")
-    try:
-        df = pd.read_csv('hasil_segmentasi_final.csv')
-    except FileNotFoundError:
-        print("File hasil segmentasi tidak ditemukan.")
-        return
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import read_table
+from instrument import stage, step
 
-    print("Membuat Plot 3D...")
+KOLOM = ['Recency', 'Frequency', 'Monetary', 'Cluster']
+
+
+def plot_3d(df, output_file='visualisasi_3d.png', show=False):
     fig = plt.figure(figsize=(10, 8))
     ax = fig.add_subplot(111, projection='3d')
 
     # Tentukan warna untuk tiap cluster
     colors = {0: 'red', 1: 'blue', 2: 'green', 3: 'orange', 4: 'purple'}
-    
+
     # Plot setiap titik
     # Kita pakai log agar grafik tidak gepeng (karena outlier)
-    import numpy as np
-    
     # Mengambil sampel data saja (misal 1000 titik) agar grafik tidak terlalu berat/penuh
     # Jika komputer kuat, hapus .sample(1000)
     if len(df) > 1000:
@@ -30,11 +31,11 @@ def show_3d_cluster():
         df_sample = df
 
     # Plotting
-    scatter = ax.scatter(np.log1p(df_sample['Recency']), 
-                         np.log1p(df_sample['Frequency']), 
-                         np.log1p(df_sample['Monetary']), 
-                         c=df_sample['Cluster'], 
-                         cmap='viridis', 
+    scatter = ax.scatter(np.log1p(df_sample['Recency']),
+                         np.log1p(df_sample['Frequency']),
+                         np.log1p(df_sample['Monetary']),
+                         c=df_sample['Cluster'],
+                         cmap='viridis',
                          s=40, alpha=0.6)
 
     # Label Sumbu
@@ -47,9 +48,31 @@ def show_3d_cluster():
     legend1 = ax.legend(*scatter.legend_elements(), title="Clusters")
     ax.add_artist(legend1)
 
-    plt.savefig('visualisasi_3d.png')
-    print("Grafik 3D disimpan sebagai 'visualisasi_3d.png'")
-    plt.show()
+    plt.savefig(output_file)
+    # Jendela interaktif (bisa diputar) hanya jika diminta, karena plt.show()
+    # memblokir proses sampai jendela ditutup
+    if show:
+        plt.show()
+    plt.close(fig)
+    return output_file
+
+
+def show_3d_cluster(show=False):
+    print("Membaca data hasil segmentasi...")
+    try:
+        df = read_table('hasil_segmentasi_final', columns=KOLOM)
+    except FileNotFoundError:
+        print("File hasil segmentasi tidak ditemukan.")
+        return
+
+    print("Membuat Plot 3D...")
+    with step('plot_3d', rows_in=len(df)):
+        output_file = plot_3d(df, show=show)
+    print(f"Grafik 3D disimpan sebagai '{output_file}'")
 
 if __name__ == "__main__":
-    show_3d_cluster()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Plot 3D cluster RFM")
+    parser.add_argument('--show', action='store_true', help="Tampilkan jendela interaktif setelah disimpan")
+    args = parser.parse_args()
+    with stage('visual_3d'):
+        show_3d_cluster(show=args.show)
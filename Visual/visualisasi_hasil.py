@@ -1,97 +1,186 @@
+import os
+import sys
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
 
-# Setting gaya visualisasi agar terlihat profesional
-plt.style.use('ggplot') 
-sns.set(style="whitegrid")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import read_table
+from feature_transform import ARTIFACT_FILE, RFMTransform
+from density import GRID_DEFAULT, plot_density, use_density
+from instrument import stage, step
+from tdigest import SKETCH_FILE, digests_from_frame, load_digests
 
-def run_visualization():
-    print("1. Membaca Data Hasil Segmentasi...")
-    try:
-        df = pd.read_csv('hasil_segmentasi_final.csv')
-        # Pastikan Customer ID jadi Index jika perlu
-        if 'Customer ID' in df.columns:
-            df.set_index('Customer ID', inplace=True)
-    except FileNotFoundError:
-        print("ERROR: File 'hasil_segmentasi_final.csv' tidak ditemukan. Jalankan modeling dulu.")
-        return
+KOLOM = ['Customer ID', 'Recency', 'Frequency', 'Monetary', 'Cluster']
 
-    print("   Data dimuat. Membuat grafik...")
 
-    # --- GRAFIK 1: PERSEBARAN JUMLAH PELANGGAN (Pie Chart) ---
-    print("2. Membuat Grafik Cluster Size...")
+def set_style():
+    # Setting gaya visualisasi agar terlihat profesional
+    plt.style.use('ggplot')
+    sns.set(style="whitegrid")
+
+
+# --- GRAFIK 1: PERSEBARAN JUMLAH PELANGGAN (Pie Chart) ---
+def plot_cluster_size(df, output_file='vis_1_cluster_size.png'):
+    set_style()
     cluster_counts = df['Cluster'].value_counts().sort_index()
-    
-    plt.figure(figsize=(7, 7))
-    plt.pie(cluster_counts, labels=[f'Cluster {i}' for i in cluster_counts.index], 
+
+    fig = plt.figure(figsize=(7, 7))
+    plt.pie(cluster_counts, labels=[f'Cluster {i}' for i in cluster_counts.index],
             autopct='%1.1f%%', startangle=140, colors=sns.color_palette('pastel'))
     plt.title('Proporsi Jumlah Pelanggan per Cluster')
-    plt.savefig('vis_1_cluster_size.png')
-    print("   > Saved: vis_1_cluster_size.png")
+    plt.savefig(output_file)
+    plt.close(fig)
+    return output_file
 
-    # --- GRAFIK 2: PROFILING (Boxplot R, F, M) ---
-    # Ini untuk melihat "Siapa yang paling kaya?" "Siapa yang paling sering datang?"
-    print("3. Membuat Grafik Profiling (Boxplot)...")
+
+# --- GRAFIK 2: PROFILING (Boxplot R, F, M) ---
+# Ini untuk melihat "Siapa yang paling kaya?" "Siapa yang paling sering datang?"
+def plot_profiling(df, output_file='vis_2_profiling_boxplot.png', sketches=None):
+    sketches = sketches or rfm_sketches(df)
+    set_style()
     fig, axes = plt.subplots(1, 3, figsize=(18, 6))
 
     sns.boxplot(x='Cluster', y='Recency', data=df, ax=axes[0], palette="Set2")
     axes[0].set_title('Recency (Semakin Kecil = Semakin Bagus)')
-    
+
     # Zoom in sedikit jika ada outlier ekstrem agar kotak terbaca
-    axes[0].set_ylim(0, df['Recency'].quantile(0.95)) 
+    axes[0].set_ylim(0, sketches['Recency'].quantile(0.95))
 
     sns.boxplot(x='Cluster', y='Frequency', data=df, ax=axes[1], palette="Set2")
     axes[1].set_title('Frequency (Semakin Besar = Semakin Bagus)')
-    axes[1].set_ylim(0, df['Frequency'].quantile(0.95))
+    axes[1].set_ylim(0, sketches['Frequency'].quantile(0.95))
 
     sns.boxplot(x='Cluster', y='Monetary', data=df, ax=axes[2], palette="Set2")
     axes[2].set_title('Monetary (Semakin Besar = Semakin Bagus)')
-    axes[2].set_ylim(0, df['Monetary'].quantile(0.95))
+    axes[2].set_ylim(0, sketches['Monetary'].quantile(0.95))
 
     plt.tight_layout()
-    plt.savefig('vis_2_profiling_boxplot.png')
-    print("   > Saved: vis_2_profiling_boxplot.png")
+    plt.savefig(output_file)
+    plt.close(fig)
+    return output_file
 
-    # --- GRAFIK 3: SNAKE PLOT (Pola Perilaku) ---
-    # Grafik ini butuh data yang di-scale lagi agar bisa digabung dalam satu grafik
-    print("4. Membuat Snake Plot...")
-    
-    # Scaling sementara hanya untuk visualisasi ini
-    scaler = StandardScaler()
-    df_scaled = pd.DataFrame(scaler.fit_transform(df[['Recency', 'Frequency', 'Monetary']]),
-                             index=df.index, columns=['Recency', 'Frequency', 'Monetary'])
+
+# --- GRAFIK 3: SNAKE PLOT (Pola Perilaku) ---
+# Grafik ini butuh data yang di-scale lagi agar bisa digabung dalam satu grafik
+def plot_snake(df, transform, output_file='vis_3_snake_plot.png'):
+    set_style()
+    # Pakai transformasi (Log + Scale) yang sama dengan saat modeling
+    df_scaled = transform.transform(df)
     df_scaled['Cluster'] = df['Cluster']
-    
+
     # Melt data (mengubah bentuk tabel melebar jadi memanjang ke bawah)
-    df_melt = pd.melt(df_scaled.reset_index(), 
+    df_melt = pd.melt(df_scaled.reset_index(),
                       id_vars=['Customer ID', 'Cluster'],
                       value_vars=['Recency', 'Frequency', 'Monetary'],
                       var_name='Metric', value_name='Value')
 
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=df_melt, x='Metric', y='Value', hue='Cluster', 
+    fig = plt.figure(figsize=(10, 6))
+    sns.lineplot(data=df_melt, x='Metric', y='Value', hue='Cluster',
                  palette='bright', marker='o', linewidth=2.5)
     plt.title('Snake Plot: Pola Perilaku Tiap Cluster')
     plt.xlabel('Metric (RFM)')
     plt.ylabel('Nilai Standar (Z-Score)')
     plt.legend(title='Cluster', loc='upper right')
-    plt.savefig('vis_3_snake_plot.png')
-    print("   > Saved: vis_3_snake_plot.png")
-    
-    # --- GRAFIK 4: SCATTER PLOT 3D (BONUS KEREN) ---
-    # Visualisasi sebaran Monetary vs Frequency
-    print("5. Membuat Scatter Plot (Frequency vs Monetary)...")
-    plt.figure(figsize=(10, 6))
-    sns.scatterplot(data=df, x='Frequency', y='Monetary', hue='Cluster', palette='bright', alpha=0.7)
+    plt.savefig(output_file)
+    plt.close(fig)
+    return output_file
+
+
+# --- GRAFIK 4: SCATTER PLOT 3D (BONUS KEREN) ---
+# Visualisasi sebaran Monetary vs Frequency
+def plot_scatter(df, output_file='vis_4_scatter.png', mode='auto', blend=True, sketches=None):
+    # mode: 'points' (satu titik per pelanggan), 'density' (grid agregat),
+    # 'auto' (density jika pelanggan sangat banyak)
+    sketches = sketches or rfm_sketches(df)
+    set_style()
+    fig = plt.figure(figsize=(10, 6))
+    x_max = sketches['Frequency'].quantile(0.98) # Zoom in biar tidak kejauhan
+    y_max = sketches['Monetary'].quantile(0.98)
+    if use_density(mode, len(df)):
+        # Frequency berupa bilangan bulat: satu kolom grid per nilai agar tidak jadi garis tipis
+        bins, x_range = GRID_DEFAULT, (0, x_max)
+        if pd.api.types.is_integer_dtype(df['Frequency']) and x_max < GRID_DEFAULT[0]:
+            bins, x_range = (int(x_max) + 1, GRID_DEFAULT[1]), (-0.5, x_max + 0.5)
+        handles = plot_density(plt.gca(), df['Frequency'], df['Monetary'], df['Cluster'],
+                               sns.color_palette('bright', df['Cluster'].nunique()),
+                               bins=bins, extent=(*x_range, 0, y_max), blend=blend)
+        plt.legend(handles=handles, title='Cluster')
+        plt.xlabel('Frequency')
+        plt.ylabel('Monetary')
+    else:
+        sns.scatterplot(data=df, x='Frequency', y='Monetary', hue='Cluster', palette='bright', alpha=0.7)
     plt.title('Peta Persebaran: Frequency vs Monetary')
-    plt.xlim(0, df['Frequency'].quantile(0.98)) # Zoom in biar tidak kejauhan
-    plt.ylim(0, df['Monetary'].quantile(0.98))
-    plt.savefig('vis_4_scatter.png')
-    print("   > Saved: vis_4_scatter.png")
+    plt.xlim(0, x_max)
+    plt.ylim(0, y_max)
+    plt.savefig(output_file)
+    plt.close(fig)
+    return output_file
+
+
+def load_segmentation(input_name='hasil_segmentasi_final'):
+    df = read_table(input_name, columns=KOLOM)
+    # Pastikan Customer ID jadi Index jika perlu
+    if 'Customer ID' in df.columns:
+        df.set_index('Customer ID', inplace=True)
+    return df
+
+
+def rfm_sketches(df, sketch_file=SKETCH_FILE):
+    # Batas sumbu persentil 95/98 diambil dari sketch t-digest yang sama dengan
+    # skor RFM (Scoring/score_rfm.py). Sketch dipakai hanya jika sidik isinya
+    # (count, min, max, sum per kolom) cocok dengan data ini; jika tidak,
+    # dibuat dari df (satu pass, tanpa sort).
+    try:
+        sketches = load_digests(sketch_file)
+        if all(sketches[col].matches(df[col].to_numpy()) for col in ('Recency', 'Frequency', 'Monetary')):
+            return sketches
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    return digests_from_frame(df)
+
+
+def run_visualization(plot_mode='auto', blend=True):
+    print("1. Membaca Data Hasil Segmentasi...")
+    try:
+        df = load_segmentation()
+    except FileNotFoundError:
+        print("ERROR: File 'hasil_segmentasi_final' tidak ditemukan. Jalankan modeling dulu.")
+        return
+    try:
+        transform = RFMTransform.load(ARTIFACT_FILE)
+    except FileNotFoundError:
+        print(f"ERROR: File '{ARTIFACT_FILE}' tidak ditemukan. Jalankan feature_engginering.py dulu.")
+        return
+
+    sketches = rfm_sketches(df)
+    print("   Data dimuat. Membuat grafik...")
+
+    print("2. Membuat Grafik Cluster Size...")
+    with step('cluster_size', rows_in=len(df)):
+        print(f"   > Saved: {plot_cluster_size(df)}")
+
+    print("3. Membuat Grafik Profiling (Boxplot)...")
+    with step('profiling', rows_in=len(df)):
+        print(f"   > Saved: {plot_profiling(df, sketches=sketches)}")
+
+    print("4. Membuat Snake Plot...")
+    with step('snake', rows_in=len(df)):
+        print(f"   > Saved: {plot_snake(df, transform)}")
+
+    print("5. Membuat Scatter Plot (Frequency vs Monetary)...")
+    with step('scatter', rows_in=len(df)):
+        print(f"   > Saved: {plot_scatter(df, mode=plot_mode, blend=blend, sketches=sketches)}")
 
     print("\nSELESAI! Silakan cek 4 gambar PNG yang muncul.")
 
 if __name__ == "__main__":
-    run_visualization()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Grafik hasil segmentasi")
+    parser.add_argument('--plot-mode', choices=['auto', 'points', 'density'], default='auto',
+                        help="Scatter per titik atau density grid (auto: density jika data besar)")
+    parser.add_argument('--no-blend', action='store_true',
+                        help="Mode density: warna sel = cluster dominan (tanpa campuran warna)")
+    args = parser.parse_args()
+    with stage('visual'):
+        run_visualization(args.plot_mode, blend=not args.no_blend)
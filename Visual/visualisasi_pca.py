@@ -1,63 +1,93 @@
+import os
+import sys
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 
-def run_pca_visualization():
-    print("1. Membaca Data Hasil Segmentasi...")
-    try:
-        df = pd.read_csv('hasil_segmentasi_final.csv')
-    except FileNotFoundError:
-        print("ERROR: File 'hasil_segmentasi_final.csv' tidak ditemukan.")
-        return
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utils'))
+from storage import read_table
+from feature_transform import ARTIFACT_FILE, RFMTransform
+from density import plot_density, use_density
+from instrument import stage, step
+
+KOLOM = ['Recency', 'Frequency', 'Monetary', 'Cluster']
 
-    print("   Data dimuat. Melakukan Reduksi Dimensi (PCA)...")
 
+def plot_pca(df, transform, output_file='vis_pca_2d.png', mode='auto', blend=True):
     # --- LANGKAH A: Preprocessing (Wajib sama dengan saat Modeling) ---
-    # PCA sangat sensitif terhadap skala, jadi kita harus Log + Scale lagi
-    features = ['Recency', 'Frequency', 'Monetary']
-    
-    # 1. Log Transform
-    df_log = np.log1p(df[features])
-    
-    # 2. Scaling
-    scaler = StandardScaler()
-    df_scaled = scaler.fit_transform(df_log)
+    # PCA sangat sensitif terhadap skala, jadi kita pakai Log + Scale yang
+    # SUDAH di-fit saat feature engineering (tidak di-fit ulang di sini)
+    df_scaled = transform.transform(df)
 
     # --- LANGKAH B: Menjalankan PCA ---
     # Mereduksi dari 3 Fitur -> 2 Komponen Utama (PC1 & PC2)
     pca = PCA(n_components=2)
     pca_result = pca.fit_transform(df_scaled)
-    
+
     # Masukkan hasil koordinat baru ke DataFrame
-    df['PC1'] = pca_result[:, 0]
-    df['PC2'] = pca_result[:, 1]
+    df = df.assign(PC1=pca_result[:, 0], PC2=pca_result[:, 1])
 
     # --- LANGKAH C: Visualisasi Scatter Plot 2D ---
-    print("2. Membuat Grafik PCA 2D...")
-    plt.figure(figsize=(10, 8))
-    
-    # Plotting titik-titik
-    sns.scatterplot(x='PC1', y='PC2', hue='Cluster', data=df, 
-                    palette='bright', s=60, alpha=0.7, edgecolor='k')
-    
+    fig = plt.figure(figsize=(10, 8))
+
+    if use_density(mode, len(df)):
+        # Density grid per cluster (untuk jumlah pelanggan sangat besar)
+        handles = plot_density(plt.gca(), df['PC1'], df['PC2'], df['Cluster'],
+                               sns.color_palette('bright', df['Cluster'].nunique()), blend=blend)
+        plt.legend(handles=handles, title='Cluster', loc='upper right')
+    else:
+        # Plotting titik-titik
+        sns.scatterplot(x='PC1', y='PC2', hue='Cluster', data=df,
+                        palette='bright', s=60, alpha=0.7, edgecolor='k')
+
     # Mempercantik grafik
     plt.title('Visualisasi Cluster 2D menggunakan PCA\n(Reduksi dari Recency, Frequency, Monetary)', fontsize=14)
     plt.xlabel(f'Principal Component 1 ({pca.explained_variance_ratio_[0]*100:.1f}% Variance)', fontsize=12)
     plt.ylabel(f'Principal Component 2 ({pca.explained_variance_ratio_[1]*100:.1f}% Variance)', fontsize=12)
     plt.grid(True, linestyle='--', alpha=0.5)
-    plt.legend(title='Cluster', loc='upper right')
-    
+    if not use_density(mode, len(df)):
+        plt.legend(title='Cluster', loc='upper right')
+
     plt.tight_layout()
-    plt.savefig('vis_pca_2d.png')
+    plt.savefig(output_file)
+    plt.close(fig)
+
+    # Persentase informasi (variance) yang terwakili grafik 2D
+    return np.sum(pca.explained_variance_ratio_) * 100
+
+
+def run_pca_visualization(plot_mode='auto', blend=True):
+    print("1. Membaca Data Hasil Segmentasi...")
+    try:
+        df = read_table('hasil_segmentasi_final', columns=KOLOM)
+    except FileNotFoundError:
+        print("ERROR: File 'hasil_segmentasi_final' tidak ditemukan.")
+        return
+    try:
+        transform = RFMTransform.load(ARTIFACT_FILE)
+    except FileNotFoundError:
+        print(f"ERROR: File '{ARTIFACT_FILE}' tidak ditemukan. Jalankan feature_engginering.py dulu.")
+        return
+
+    print("   Data dimuat. Melakukan Reduksi Dimensi (PCA)...")
+    print("2. Membuat Grafik PCA 2D...")
+    with step('pca', rows_in=len(df)):
+        total_var = plot_pca(df, transform, mode=plot_mode, blend=blend)
     print("   > GRAFIK DISIMPAN: 'vis_pca_2d.png'")
-    
+
     # Penjelasan Variance
-    total_var = np.sum(pca.explained_variance_ratio_) * 100
     print(f"\nINFO: Grafik 2D ini merepresentasikan {total_var:.2f}% informasi dari data asli.")
     print("      (Semakin mendekati 100%, semakin akurat gambarnya).")
 
 if __name__ == "__main__":
-    run_pca_visualization()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Visualisasi cluster 2D dengan PCA")
+    parser.add_argument('--plot-mode', choices=['auto', 'points', 'density'], default='auto',
+                        help="Scatter per titik atau density grid (auto: density jika data besar)")
+    parser.add_argument('--no-blend', action='store_true',
+                        help="Mode density: warna sel = cluster dominan (tanpa campuran warna)")
+    args = parser.parse_args()
+    with stage('visual_pca'):
+        run_pca_visualization(args.plot_mode, blend=not args.no_blend)
@@ -0,0 +1,311 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import importlib.util
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'Utils'))
+from instrument import METRICS_ENV, PROFILE_DIR_ENV, PROFILE_ENV, RUN_ID_ENV, process_peak_kb, stage
+
+# Satu pintu masuk untuk semua tahap market-pulse:
+#   python market_pulse.py clean | rfm | snapshots | features | model | visualize | score | rfm-score [opsi]
+# Skrip tahap (dan library berat di dalamnya: pandas, sklearn, matplotlib,
+# seaborn) baru di-import setelah subcommand dipilih, jadi `--help` dan tahap
+# tanpa grafik tidak ikut membayar waktu import matplotlib/seaborn.
+# Waktu cold-start (interpreter + import tahap) dilaporkan di akhir.
+# Nama tanpa ekstensi = tabel (csv/parquet/feather sesuai --format).
+COMMANDS = {
+    'clean': ('Data Cleaning/cleaning_data_2.py', 'clean_retail_data'),
+    'rfm': ('Data Exploration/create_file_rfm.py', 'make_rfm_file'),
+    'snapshots': ('Data Exploration/rfm_snapshots.py', 'make_rfm_snapshots'),
+    'features': ('Feature Engginering/feature_engginering.py', 'run_feature_engineering'),
+    'model': ('Predictive modelling_trial 3/modeling_final_smart.py', 'run_smart_modeling'),
+    'visualize': ('Visual 2/render_report.py', 'render_report'),
+    'score': ('Scoring/score_batch.py', 'score_file'),
+    'rfm-score': ('Scoring/score_rfm.py', 'score_rfm_file'),
+}
+LIBRARY_BERAT = ['pandas', 'sklearn', 'matplotlib', 'seaborn']
+
+
+def process_age():
+    # Umur proses (detik) sejak dibuat oleh OS, dari /proc (Linux). Ini mencakup
+    # start interpreter + import modul bawaan sebelum main() berjalan.
+    try:
+        with open('/proc/self/stat') as f:
+            stat = f.read()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+    except OSError:
+        return None
+    # Field ke-22 = starttime (clock tick sejak boot). Nama proses (field 2)
+    # bisa berisi spasi, jadi hitung dari setelah tanda ')'
+    start_ticks = int(stat.rsplit(')', 1)[1].split()[19])
+    return max(uptime - start_ticks / os.sysconf('SC_CLK_TCK'), 0.0)
+
+
+def load_stage(command):
+    script, function = COMMANDS[command]
+    path = os.path.join(ROOT, script)
+    # Folder skrip masuk sys.path (seperti saat dijalankan langsung) agar modul
+    # tetangga (cleaning_core, rfm_engine, visualisasi_hasil, ...) ikut ketemu
+    folder = os.path.dirname(path)
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Didaftarkan di sys.modules supaya fungsi worker bisa di-pickle (ProcessPoolExecutor)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return getattr(module, function)
+
+
+def _options(args, **names):
+    # Opsi yang tidak diisi (None) tidak dikirim -> default fungsi tahap yang dipakai
+    return {param: getattr(args, attr) for param, attr in names.items()
+            if getattr(args, attr) is not None}
+
+
+def _chart(args):
+    # '' = grafik dilewati (fungsi tahap hanya menggambar jika chart_file terisi)
+    return '' if args.no_charts else args.chart
+
+
+def clean_options(args):
+    return {'streaming': args.streaming, 'epoch_dates': args.epoch_dates,
+            **_options(args, input_file='input', output_file='output',
+                       memory_budget_mb='memory_budget_mb', spill_dir='spill_dir')}
+
+
+def rfm_options(args):
+    return {'out_of_core': args.out_of_core,
+            **_options(args, input_name='input', output_file='output', frequency='frequency',
+                       hll_error='hll_error', partial_file='partial_file', n_jobs='jobs',
+                       n_buckets='buckets', chunksize='chunksize')}
+
+
+def snapshots_options(args):
+    return {'include_latest': not args.no_latest,
+            **_options(args, input_name='input', output_file='output', cutoffs='dates')}
+
+
+def features_options(args):
+    options = _options(args, input_name='input', output_file='output', transform_file='transform',
+                       snapshot_date='snapshot')
+    if _chart(args) is not None:
+        options['chart_file'] = _chart(args)
+    return options
+
+
+def model_options(args):
+    options = _options(args, scaled_name='scaled', rfm_name='rfm', output_file='output',
+                       transform_file='transform', model_file='model', n_jobs='jobs',
+                       silhouette_mode='silhouette', sample_size='sample_size',
+                       backend='backend', coreset_size='coreset_size', snapshot_date='snapshot',
+                       chunksize='chunksize')
+    if _chart(args) is not None:
+        options['chart_file'] = _chart(args)
+    return options
+
+
+def visualize_options(args):
+    return {'blend': not args.no_blend,
+            **_options(args, input_name='input', transform_file='transform', output_dir='output_dir',
+                       n_jobs='jobs', figures='figures', plot_mode='plot_mode',
+                       sketch_file='sketch_file')}
+
+
+def score_options(args):
+    return _options(args, input_file='input', output_file='output', transform_file='transform',
+                    model_file='model', chunksize='chunksize', reject_file='rejects')
+
+
+def rfm_score_options(args):
+    return {'sketch_only': args.sketch_only,
+            **_options(args, input_names='inputs', output_file='output', sketch_file='sketch_file',
+                       sketch_inputs='merge_sketches', transform_file='transform', model_file='model',
+                       chunksize='chunksize')}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='market_pulse', description="Pipeline segmentasi pelanggan market-pulse")
+    parser.add_argument('--workdir', default=None, help="Folder kerja (semua path relatif terhadap folder ini)")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default=None,
+                        help="Format tabel antar tahap (default: MARKET_PULSE_FORMAT atau csv)")
+    parser.add_argument('--no-timing', action='store_true', help="Jangan tampilkan laporan waktu cold-start")
+    parser.add_argument('--metrics', default=None,
+                        help="Simpan waktu & puncak memori tahap ke file JSON (dipakai bench_suite.py)")
+    parser.add_argument('--trace', default=None,
+                        help="Tulis metrik per langkah (wall, CPU, RSS, baris) ke file JSON lines")
+    parser.add_argument('--profile', action='store_true', help="Simpan cProfile tahap ke <profile-dir>/<tahap>.prof")
+    parser.add_argument('--profile-dir', default=None, help="Folder file cProfile (default: folder kerja)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('clean', help="online_retail_II.csv -> online_retail_clean_2")
+    p.add_argument('--input', default=None, help="File transaksi mentah (default: online_retail_II.csv)")
+    p.add_argument('--output', default=None, help="File data bersih (default: online_retail_clean_2)")
+    p.add_argument('--streaming', action='store_true',
+                   help="Baca file per chunk (untuk file yang lebih besar dari RAM)")
+    p.add_argument('--memory-budget-mb', type=int, default=None,
+                   help="Batas memori (RSS) untuk mode streaming, dalam MB")
+    p.add_argument('--spill-dir', default=None,
+                   help="Folder untuk spill fingerprint deduplikasi ke disk (opsional)")
+    p.add_argument('--epoch-dates', action='store_true',
+                   help="Simpan InvoiceDate sebagai epoch detik")
+    p.set_defaults(options=clean_options)
+
+    p = sub.add_parser('rfm', help="online_retail_clean_2 -> rfm_data")
+    p.add_argument('--input', default=None, help="Tabel data bersih (default: online_retail_clean_2)")
+    p.add_argument('--output', default=None, help="File RFM (default: rfm_data)")
+    p.add_argument('--frequency', choices=['exact', 'hll'], default=None,
+                   help="Mode Frequency: exact (nunique) atau hll (perkiraan HyperLogLog)")
+    p.add_argument('--hll-error', type=float, default=None, help="Batas error relatif sketch HLL")
+    p.add_argument('--partial-file', default=None,
+                   help="Simpan RFM parsial + sketch HLL (.npz) untuk digabung nanti")
+    p.add_argument('--jobs', type=int, default=None, help="Jumlah proses agregasi paralel (0 = semua core)")
+    p.add_argument('--out-of-core', action='store_true',
+                   help="Stream file transaksi dan spill ke bucket di disk (file > RAM)")
+    p.add_argument('--buckets', type=int, default=None, help="Jumlah bucket untuk mode out-of-core")
+    p.add_argument('--chunksize', type=int, default=None, help="Baris per chunk untuk mode out-of-core")
+    p.set_defaults(options=rfm_options)
+
+    p = sub.add_parser('snapshots', help="online_retail_clean_2 -> rfm_snapshots (RFM per akhir bulan)")
+    p.add_argument('--input', default=None, help="Tabel data bersih (default: online_retail_clean_2)")
+    p.add_argument('--output', default=None, help="File snapshot (default: rfm_snapshots)")
+    p.add_argument('--dates', nargs='+', default=None,
+                   help="Tanggal snapshot (target_date) sendiri (default: setiap awal bulan)")
+    p.add_argument('--no-latest', action='store_true',
+                   help="Tanpa snapshot terakhir (1 hari setelah transaksi terakhir)")
+    p.set_defaults(options=snapshots_options)
+
+    p = sub.add_parser('features', help="rfm_data -> rfm_siap_model + rfm_transform.json")
+    p.add_argument('--input', default=None, help="Tabel RFM atau rfm_snapshots (default: rfm_data)")
+    p.add_argument('--snapshot', default=None, help="Tanggal snapshot jika input rfm_snapshots (default: terakhir)")
+    p.add_argument('--output', default=None, help="File data siap model (default: rfm_siap_model)")
+    p.add_argument('--transform', default=None, help="Artifact transform (default: rfm_transform.json)")
+    p.add_argument('--chart', default=None, help="File grafik perbandingan (default: grafik_perbandingan_feature.png)")
+    p.add_argument('--no-charts', action='store_true', help="Lewati grafik (matplotlib tidak di-import)")
+    p.set_defaults(options=features_options)
+
+    p = sub.add_parser('model', help="rfm_siap_model -> hasil_segmentasi_final + segment_model.json")
+    p.add_argument('--scaled', default=None, help="Tabel data siap model (default: rfm_siap_model)")
+    p.add_argument('--rfm', default=None, help="Tabel RFM asli atau rfm_snapshots (default: rfm_data)")
+    p.add_argument('--snapshot', default=None, help="Tanggal snapshot jika --rfm rfm_snapshots (default: terakhir)")
+    p.add_argument('--output', default=None, help="File hasil segmentasi (default: hasil_segmentasi_final)")
+    p.add_argument('--transform', default=None, help="Artifact transform (default: rfm_transform.json)")
+    p.add_argument('--model', default=None, help="Artifact centroid (default: segment_model.json)")
+    p.add_argument('--chart', default=None, help="File grafik evaluasi (default: grafik_evaluasi_trial.png)")
+    p.add_argument('--no-charts', action='store_true', help="Lewati grafik (matplotlib tidak di-import)")
+    p.add_argument('--jobs', type=int, default=None, help="Jumlah proses untuk sweep k (0 = semua core)")
+    p.add_argument('--silhouette', choices=['auto', 'exact', 'sampled'], default=None,
+                   help="Mode silhouette: exact (per blok), sampled (sampel berstrata + CI), auto")
+    p.add_argument('--sample-size', type=int, default=None, help="Jumlah sampel untuk mode silhouette sampled")
+    p.add_argument('--backend', choices=['full', 'minibatch', 'coreset'], default=None,
+                   help="Algoritma clustering: full (KMeans), minibatch, coreset (streaming)")
+    p.add_argument('--coreset-size', type=int, default=None, help="Jumlah titik coreset untuk backend coreset")
+    p.add_argument('--chunksize', type=int, default=None,
+                   help="Baris per chunk untuk backend coreset (data dibaca per chunk)")
+    p.set_defaults(options=model_options)
+
+    p = sub.add_parser('visualize', help="hasil_segmentasi_final -> grafik PNG (headless)")
+    p.add_argument('--input', default=None, help="Tabel hasil segmentasi (default: hasil_segmentasi_final)")
+    p.add_argument('--transform', default=None, help="Artifact transform (default: rfm_transform.json)")
+    p.add_argument('--output-dir', default=None, help="Folder tujuan PNG (default: folder kerja)")
+    p.add_argument('--jobs', type=int, default=None, help="Jumlah proses render (0 = semua core)")
+    p.add_argument('--figures', nargs='*', default=None,
+                   help="Grafik yang dirender: cluster_size profiling snake scatter pca 3d (default: semua)")
+    p.add_argument('--plot-mode', choices=['auto', 'points', 'density'], default=None,
+                   help="Scatter & PCA per titik atau density grid (auto: density jika data besar)")
+    p.add_argument('--no-blend', action='store_true',
+                   help="Mode density: warna sel = cluster dominan (tanpa campuran warna)")
+    p.add_argument('--sketch-file', default=None,
+                   help="Sketch kuantil R/F/M untuk batas sumbu (default: rfm_quantiles.json)")
+    p.set_defaults(options=visualize_options)
+
+    p = sub.add_parser('score', help="File RFM baru -> Cluster + DistanceToCentroid")
+    p.add_argument('input', nargs='?', default=None, help="File RFM yang akan di-scoring (default: rfm_data)")
+    p.add_argument('output', nargs='?', default=None, help="File hasil (default: hasil_scoring)")
+    p.add_argument('--transform', default=None, help="Artifact transform (default: rfm_transform.json)")
+    p.add_argument('--model', default=None, help="Artifact centroid (default: segment_model.json)")
+    p.add_argument('--chunksize', type=int, default=None, help="Baris per chunk")
+    p.add_argument('--rejects', default=None,
+                   help="File baris R/F/M NaN/negatif (default: hasil_scoring_ditolak)")
+    p.set_defaults(options=score_options)
+
+    p = sub.add_parser('rfm-score', help="RFM (boleh beberapa partisi) -> skor kuintil R/F/M + RFM_Code")
+    p.add_argument('inputs', nargs='*', default=None, help="File/partisi RFM (default: rfm_data)")
+    p.add_argument('--output', default=None, help="File hasil (default: hasil_rfm_score)")
+    p.add_argument('--sketch-file', default=None, help="File sketch hasil (default: rfm_quantiles.json)")
+    p.add_argument('--merge-sketches', nargs='+', default=None,
+                   help="Pakai & gabung file sketch partisi ini (tanpa pass pembuatan sketch)")
+    p.add_argument('--sketch-only', action='store_true', help="Hanya buat sketch partisi, tanpa skor")
+    p.add_argument('--transform', default=None, help="Artifact transform (default: rfm_transform.json)")
+    p.add_argument('--model', default=None, help="Artifact centroid (default: segment_model.json)")
+    p.add_argument('--chunksize', type=int, default=None, help="Baris per chunk")
+    p.set_defaults(options=rfm_score_options)
+    return parser
+
+
+def peak_rss_mb():
+    # Puncak RSS proses ini (VmHWM: hanya image setelah exec, tidak ikut
+    # terhitung memori proses induk) dan proses worker yang sudah selesai
+    peak_kb = process_peak_kb()
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(peak_kb, children_kb) / 1024
+
+
+def report_timing(command, metrics):
+    print(f"\n[market_pulse {command}] waktu:")
+    if metrics['startup_s'] is not None:
+        print(f"   - start interpreter     : {metrics['startup_s']:7.3f} s")
+    print(f"   - import tahap          : {metrics['import_s']:7.3f} s")
+    if metrics['startup_s'] is not None:
+        print(f"   - cold-start total      : {metrics['startup_s'] + metrics['import_s']:7.3f} s")
+    print(f"   - eksekusi              : {metrics['run_s']:7.3f} s")
+    print(f"   - puncak memori (RSS)   : {metrics['peak_rss_mb']:7.1f} MB")
+    print(f"   - library berat dimuat  : {', '.join(metrics['libraries']) or '-'}")
+
+
+def main(argv=None):
+    startup = process_age()
+    args = build_parser().parse_args(argv)
+    if args.format:
+        # Sama dengan storage.FORMAT_ENV (storage tidak di-import di sini karena memuat pandas)
+        os.environ['MARKET_PULSE_FORMAT'] = args.format
+    # Lewat environment supaya proses worker (sweep k, render grafik) ikut tercatat
+    if args.trace:
+        os.environ[METRICS_ENV] = os.path.abspath(args.trace)
+        os.environ.setdefault(RUN_ID_ENV, time.strftime('%Y%m%dT%H%M%S'))
+    if args.profile:
+        os.environ[PROFILE_ENV] = args.command
+    if args.profile_dir:
+        os.environ[PROFILE_DIR_ENV] = os.path.abspath(args.profile_dir)
+    # Path --trace/--profile-dir/--metrics relatif terhadap folder pemanggil, bukan --workdir
+    metrics_file = os.path.abspath(args.metrics) if args.metrics else None
+    if args.workdir:
+        os.chdir(args.workdir)
+
+    start = time.perf_counter()
+    run = load_stage(args.command)
+    import_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with stage(args.command):
+        run(**args.options(args))
+    run_time = time.perf_counter() - start
+
+    metrics = {'command': args.command, 'startup_s': startup, 'import_s': import_time,
+               'run_s': run_time, 'peak_rss_mb': peak_rss_mb(),
+               'libraries': [name for name in LIBRARY_BERAT if name in sys.modules]}
+    if not args.no_timing:
+        report_timing(args.command, metrics)
+    if metrics_file:
+        with open(metrics_file, 'w') as f:
+            json.dump(metrics, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
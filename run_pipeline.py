@@ -0,0 +1,208 @@
+import os
+import ast
+import sys
+import time
+import shlex
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'Utils'))
+from storage import EKSTENSI, FORMAT_ENV, find_table, output_format, table_path
+from stage_cache import STORE_DEFAULT, StageCache
+from instrument import METRICS_ENV, RUN_ID_ENV
+
+# Runner pipeline market-pulse:
+#   online_retail_II.csv -> clean -> rfm -> features -> model -> rfm_score -> visual
+#                                 \-> explore, rfm_snapshots
+# Semua tahap berjalan di SATU folder kerja (--workdir). Tiap tahap punya
+# fingerprint dari isi kode, parameter & hash input; jika fingerprint sudah
+# ada di store (.mp_store), tahap dilewati dan outputnya dipulihkan dari store.
+# Nama tanpa ekstensi = tabel (csv/parquet/feather sesuai --format).
+# Kode yang ikut fingerprint TIDAK ditulis manual: import script tahap
+# ditelusuri (ast, rekursif, termasuk import di dalam fungsi) dan setiap
+# modul yang ada di folder script atau Utils/ ikut di-hash. Library luar
+# (pandas, sklearn, ...) tidak ikut.
+
+
+def local_modules(script):
+    # Script + semua modul lokal yang di-import (langsung / tidak langsung),
+    # dicari dengan urutan sys.path script: folder script lalu Utils/
+    utils_dir = os.path.join(ROOT, 'Utils')
+    found = []
+    stack = [os.path.join(ROOT, script)]
+    while stack:
+        path = stack.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                names.add(node.module.split('.')[0])
+        for name in sorted(names):
+            for folder in (os.path.dirname(path), os.path.dirname(os.path.join(ROOT, script)), utils_dir):
+                candidate = os.path.join(folder, name + '.py')
+                if os.path.exists(candidate):
+                    stack.append(candidate)
+                    break
+    return sorted(os.path.relpath(p, ROOT) for p in found)
+
+
+class Stage:
+    def __init__(self, name, script, inputs, outputs):
+        self.name = name
+        self.script = script
+        self.inputs = inputs
+        self.outputs = outputs
+
+    @property
+    def code(self):
+        return local_modules(self.script)
+
+
+STAGES = [
+    Stage('clean', 'Data Cleaning/cleaning_data_2.py',
+          inputs=['online_retail_II.csv'], outputs=['online_retail_clean_2']),
+    Stage('rfm', 'Data Exploration/create_file_rfm.py',
+          inputs=['online_retail_clean_2'], outputs=['rfm_data']),
+    Stage('explore', 'Data Exploration/data_exploration.py',
+          inputs=['online_retail_clean_2'],
+          outputs=['grafik_1_distribusi.png', 'grafik_2_outliers.png', 'grafik_3_korelasi.png']),
+    Stage('rfm_snapshots', 'Data Exploration/rfm_snapshots.py',
+          inputs=['online_retail_clean_2'], outputs=['rfm_snapshots']),
+    Stage('features', 'Feature Engginering/feature_engginering.py',
+          inputs=['rfm_data'],
+          outputs=['rfm_siap_model', 'rfm_transform.json', 'grafik_perbandingan_feature.png']),
+    Stage('model', 'Predictive modelling_trial 3/modeling_final_smart.py',
+          inputs=['rfm_siap_model', 'rfm_data', 'rfm_transform.json'],
+          outputs=['hasil_segmentasi_final', 'segment_model.json', 'grafik_evaluasi_trial.png']),
+    Stage('rfm_score', 'Scoring/score_rfm.py',
+          inputs=['rfm_data', 'rfm_transform.json', 'segment_model.json'],
+          outputs=['hasil_rfm_score', 'rfm_quantiles.json']),
+    Stage('visual', 'Visual 2/visualisasi_hasil.py',
+          inputs=['hasil_segmentasi_final', 'rfm_transform.json', 'rfm_quantiles.json'],
+          outputs=['vis_1_cluster_size.png', 'vis_2_profiling_boxplot.png',
+                   'vis_3_snake_plot.png', 'vis_4_scatter.png']),
+    Stage('visual_pca', 'Visual 2/visualisasi_pca.py',
+          inputs=['hasil_segmentasi_final', 'rfm_transform.json'], outputs=['vis_pca_2d.png']),
+    Stage('visual_3d', 'Visual 2/visualisasi_3D.py',
+          inputs=['hasil_segmentasi_final'], outputs=['visualisasi_3d.png']),
+]
+
+
+def _is_table(name):
+    return '.' not in name
+
+
+def _output_path(workdir, name, fmt):
+    path = os.path.join(workdir, name)
+    return table_path(path, fmt) if _is_table(name) else path
+
+
+def _input_path(workdir, name):
+    path = os.path.join(workdir, name)
+    return find_table(path) if _is_table(name) else path
+
+
+def select_stages(targets=None, until=None):
+    # Tahap yang diminta + semua tahap hulunya (urutan STAGES sudah topologis)
+    names = [s.name for s in STAGES]
+    if until is not None:
+        targets = names[:names.index(until) + 1]
+    if not targets:
+        return list(STAGES)
+    producer = {out: s for s in STAGES for out in s.outputs}
+    needed = set()
+    stack = [next(s for s in STAGES if s.name == t) for t in targets]
+    while stack:
+        stage = stack.pop()
+        if stage.name in needed:
+            continue
+        needed.add(stage.name)
+        stack.extend(producer[i] for i in stage.inputs if i in producer)
+    return [s for s in STAGES if s.name in needed]
+
+
+def run_pipeline(workdir='.', fmt=None, store_dir=None, targets=None, until=None,
+                 force=(), stage_args=None, trace=None):
+    fmt = output_format(fmt)
+    stage_args = stage_args or {}
+    cache = StageCache(store_dir or os.path.join(workdir, STORE_DEFAULT))
+    env = dict(os.environ, MPLBACKEND='Agg', **{FORMAT_ENV: fmt})
+    if trace:
+        # Metrik per langkah (JSON lines) dari semua tahap yang dijalankan,
+        # dikelompokkan dengan satu run_id per pemanggilan pipeline
+        env[METRICS_ENV] = os.path.abspath(trace)
+        env.setdefault(RUN_ID_ENV, time.strftime('%Y%m%dT%H%M%S'))
+
+    print(f"Pipeline di '{os.path.abspath(workdir)}' (format {fmt}, store '{cache.store_dir}')")
+    total_start = time.perf_counter()
+    try:
+        for stage in select_stages(targets, until):
+            start = time.perf_counter()
+            try:
+                inputs = {name: cache.file_digest(_input_path(workdir, name)) for name in stage.inputs}
+            except FileNotFoundError as e:
+                print(f"ERROR [{stage.name}]: input tidak ada -> {e}")
+                return False
+            code = {path: cache.file_digest(os.path.join(ROOT, path)) for path in stage.code}
+            args = stage_args.get(stage.name, [])
+            fp = cache.fingerprint(stage.name, code, {'format': fmt, 'args': args}, inputs)
+            outputs = {name: _output_path(workdir, name, fmt) for name in stage.outputs}
+
+            manifest = None if stage.name in force else cache.lookup(fp)
+            if manifest is not None:
+                restored = cache.restore(manifest, outputs)
+                print(f"  [CACHE] {stage.name:<13} {fp[:12]}  ({restored} file dipulihkan, "
+                      f"{time.perf_counter() - start:.2f} s)")
+                continue
+
+            result = subprocess.run([sys.executable, os.path.join(ROOT, stage.script), *args],
+                                    cwd=workdir, env=env, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"ERROR [{stage.name}]: script gagal (exit {result.returncode})\n{result.stderr}")
+                return False
+            missing = [p for p in outputs.values() if not os.path.exists(p)]
+            if missing:
+                print(f"ERROR [{stage.name}]: output tidak dibuat: {missing}\n{result.stdout[-2000:]}")
+                return False
+            cache.store(fp, stage.name, outputs)
+            print(f"  [RUN]   {stage.name:<13} {fp[:12]}  ({time.perf_counter() - start:.2f} s)")
+    finally:
+        cache.save_digests()
+
+    print(f"SELESAI dalam {time.perf_counter() - total_start:.2f} s "
+          f"(store: {cache.disk_bytes() / 1024 ** 2:.1f} MB)")
+    return True
+
+
+if __name__ == "__main__":
+    names = [s.name for s in STAGES]
+    parser = argparse.ArgumentParser(description="Menjalankan pipeline market-pulse dengan cache per tahap")
+    parser.add_argument('stages', nargs='*', default=[],
+                        help=f"Tahap yang dijalankan beserta hulunya ({', '.join(names)}). Default: semua")
+    parser.add_argument('--until', choices=names, default=None, help="Jalankan sampai tahap ini")
+    parser.add_argument('--workdir', default='.', help="Folder kerja (berisi online_retail_II.csv)")
+    parser.add_argument('--format', choices=sorted(EKSTENSI), default=None,
+                        help=f"Format tabel output (default: ${FORMAT_ENV} atau csv)")
+    parser.add_argument('--store', default=None, help=f"Folder store cache (default: <workdir>/{STORE_DEFAULT})")
+    parser.add_argument('--force', nargs='*', choices=names, default=[],
+                        help="Paksa jalankan ulang tahap ini walau ada di cache")
+    parser.add_argument('--args', nargs=2, action='append', metavar=('TAHAP', 'ARGUMEN'), default=[],
+                        help='Argumen tambahan untuk script tahap, contoh: --args model "--jobs 4"')
+    parser.add_argument('--trace', default=None,
+                        help="Tulis metrik per tahap & langkah (wall, CPU, RSS, baris) ke file JSON lines")
+    args = parser.parse_args()
+    unknown = [s for s in args.stages + [name for name, _ in args.args] if s not in names]
+    if unknown:
+        parser.error(f"Tahap tidak dikenal: {unknown}. Pilihan: {', '.join(names)}")
+
+    stage_args = {name: shlex.split(value) for name, value in args.args}
+    ok = run_pipeline(args.workdir, args.format, args.store, args.stages, args.until,
+                      set(args.force), stage_args, args.trace)
+    sys.exit(0 if ok else 1)